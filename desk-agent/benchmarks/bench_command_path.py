@@ -0,0 +1,220 @@
+# benchmarks/bench_command_path.py
+#
+# Replays a corpus of commands (benchmarks/data/commands.jsonl) through the real
+# command path - CommandPipeline, parse_intent / stream_intent, the model router,
+# JSON extraction, route_action and the tools - against the stub LLM server, and
+# reports from the traces it writes:
+#   - p50 / p99 latency per stage (command, parse, intent.*, llm.call, json.extract,
+#     execute, route, tool)
+#   - throughput (commands per second, each round submitted as one burst)
+#   - memory (peak traced Python allocations over one round, and peak RSS)
+# Corpus entries with "reply": null are expected to be caught by the fast path; the
+# others are answered by the stub with that reply. "{n}" is replaced by the round
+# number, so later rounds aren't answered from the intent cache.
+# Tools really run, inside a temporary directory, which is also where the intent
+# cache, memory and traces of the run go.
+#
+# To catch regressions, save a baseline and compare later runs against it:
+#     python -m benchmarks.bench_command_path --save baseline.json
+#     python -m benchmarks.bench_command_path --compare baseline.json
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_command_path [--rounds N] [--streaming] [--save F] [--compare F]
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from src.memory.logs import AppendOnlyLog, SpanExporter
+from src.processing.command_pipeline import CommandPipeline
+from src.processing.intent_parser import parse_intent, stream_intent
+from src.processing.action_router import route_action
+from src.processing.tool_registry import get_tool_registry
+from src.routing import model_router
+from src.routing.model_router import ModelRouter
+from tests.stub_server import StubLLMServer
+from src.utils import tracing
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "commands.jsonl")
+STAGES = ["command", "parse", "intent.fast_path", "intent.cache", "intent.prompt", "intent.llm", "llm.call",
+          "json.extract", "execute", "route", "tool"]
+# A stage this much slower than the baseline is flagged.
+REGRESSION_RATIO = 1.2
+
+
+def load_corpus() -> list[dict]:
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def render(entry: dict, n: int) -> tuple[str, str | None]:
+    text = entry["text"].replace("{n}", str(n))
+    reply = None if entry["reply"] is None else json.dumps(entry["reply"]).replace("{n}", str(n))
+    return text, reply
+
+
+class Replay:
+    """Feeds one round of the corpus through a CommandPipeline and waits for it to drain."""
+
+    def __init__(self, corpus: list[dict], streaming: bool):
+        self.corpus = corpus
+        self.replies = {}       # command text -> what the stub answers
+        self.stub_misses = 0
+        self.pipeline = CommandPipeline(
+            parse=self.parse_streaming if streaming else self.parse,
+            execute=route_action,
+            notify=lambda message: None,
+            max_pending=len(corpus),
+        )
+
+    def respond(self, payload: dict) -> str:
+        content = payload["messages"][-1]["content"]
+        # The longest match, in case one command's text contains another's.
+        matches = [text for text in self.replies if text in content]
+        if not matches:
+            self.stub_misses += 1
+            return "{}"
+        return self.replies[max(matches, key=len)]
+
+    async def parse(self, text: str, allow_early_dispatch: bool):
+        return await parse_intent(text)
+
+    async def parse_streaming(self, text: str, allow_early_dispatch: bool):
+        intent = None
+        async for kind, _, value in stream_intent(text):
+            if kind == "intent":
+                intent = value
+        return intent
+
+    async def run_round(self, n: int):
+        for entry in self.corpus:
+            text, reply = render(entry, n)
+            if reply is not None:
+                self.replies[text] = reply
+            await self.pipeline.submit(text, time.perf_counter_ns())
+        while self.pipeline.queue:
+            await asyncio.sleep(0.001)
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+def stage_stats(trace_path: str) -> dict:
+    durations = {}
+    for record in AppendOnlyLog(trace_path).read():
+        if record.get("duration_ms") is not None:
+            durations.setdefault(record["name"], []).append(record["duration_ms"])
+    return {
+        name: {"count": len(values), "p50_ms": statistics.median(values), "p99_ms": percentile(values, 99)}
+        for name, values in durations.items()
+    }
+
+
+def report(results: dict, baseline: dict | None):
+    print(f"{'stage':18s} {'count':>6s} {'p50 ms':>9s} {'p99 ms':>9s}")
+    for name in STAGES + sorted(set(results["stages"]) - set(STAGES)):
+        stats = results["stages"].get(name)
+        if not stats:
+            continue
+        line = f"{name:18s} {stats['count']:6d} {stats['p50_ms']:9.3f} {stats['p99_ms']:9.3f}"
+        old = (baseline or {}).get("stages", {}).get(name)
+        if old and old["p50_ms"] > 0:
+            ratio = stats["p50_ms"] / old["p50_ms"]
+            line += f"   p50 {ratio:5.2f}x baseline" + ("  ⚠️ slower" if ratio > REGRESSION_RATIO else "")
+        print(line)
+    print(f"Throughput: {results['commands_per_s']:.1f} commands/s "
+          f"({results['commands']} commands in {results['wall_s']:.2f} s)")
+    print(f"Memory: peak traced allocations {results['peak_traced_kb']:.0f} KiB per round, "
+          f"peak RSS {results['peak_rss_mb']:.0f} MiB")
+    if baseline:
+        ratio = results["commands_per_s"] / baseline["commands_per_s"]
+        print(f"Throughput vs baseline: {ratio:.2f}x" + ("  ⚠️ lower" if ratio < 1 / REGRESSION_RATIO else ""))
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return float("nan")
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(rounds: int, streaming: bool) -> dict:
+    corpus = load_corpus()
+    # Tool discovery and the system prompt use paths relative to desk-agent/.
+    get_tool_registry()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        trace_path = os.path.join(work_dir, "traces.jsonl")
+        previous_exporter = tracing.set_exporter(SpanExporter(trace_path))
+        replay = Replay(corpus, streaming)
+        server = await StubLLMServer(replay.respond, ttft_delay_s=0.02, token_delay_s=0.001).start()
+        model_router._router = ModelRouter(ollama_base_url=server.base_url)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                # Warm-up round (model load, imports, first-call costs), then a clean trace.
+                await replay.run_round(0)
+                os.remove(trace_path)
+                start = time.perf_counter()
+                for n in range(1, rounds + 1):
+                    await replay.run_round(n)
+                wall_s = time.perf_counter() - start
+                stages = stage_stats(trace_path)
+                # Memory is measured on an extra round; tracemalloc slows everything down.
+                tracemalloc.start()
+                await replay.run_round(rounds + 1)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            results = {
+                "stages": stages,
+                "commands": rounds * len(corpus),
+                "wall_s": wall_s,
+                "commands_per_s": rounds * len(corpus) / wall_s,
+                "peak_traced_kb": peak / 1024,
+                "peak_rss_mb": peak_rss_mb(),
+                "stub_requests": server.requests,
+                "stub_misses": replay.stub_misses,
+            }
+        finally:
+            await model_router._router.aclose()
+            model_router._router = None
+            await server.stop()
+            tracing.set_exporter(previous_exporter)
+            os.chdir(cwd)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay commands through the command path against a stub LLM.")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--streaming", action="store_true", help="parse with stream_intent instead of parse_intent")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare against results saved with --save")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    results = asyncio.run(run(args.rounds, args.streaming))
+    report(results, baseline)
+    if results["stub_misses"]:
+        print(f"⚠️ The stub had no reply for {results['stub_misses']} request(s); check the corpus.")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
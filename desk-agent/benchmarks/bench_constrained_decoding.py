@@ -0,0 +1,117 @@
+# benchmarks/bench_constrained_decoding.py
+#
+# Compares the intent model's free-form output with schema-constrained output
+# (CONSTRAINED_DECODING: Ollama `format` + per-kind max_tokens) over a set of commands:
+#   - output tokens per parse
+#   - time to first token and total latency
+#   - strict parse rate: the raw output is a JSON object as-is
+#   - action_type rate: the raw output already has the action_type route_action reads
+#   - usable rate: parse_intent_response (extraction + repair + schema check) succeeds
+#
+# By default this talks to the real INTENT_MODEL at OLLAMA_BASE_URL (start Ollama first).
+# --stub replays canned replies from the local stub server instead: it only checks
+# that the benchmark and the request options work, the numbers mean nothing.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_constrained_decoding [--stub] [rounds]
+
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+
+from config import INTENT_MODEL, OLLAMA_BASE_URL
+from src.processing.intent_parser import decoding_options
+from src.processing.prompt_builder import PromptBuilder
+from src.routing.model_router import ModelRouter
+from tests.stub_server import StubLLMServer
+from src.utils.json_parser import parse_intent_response
+
+COMMANDS = [
+    "open chrome",
+    "create a file called notes.txt",
+    "make a folder named reports",
+    "delete old.log",
+    "start a new git repo here",
+    "commit everything with message 'fix parser'",
+    "write a python function that reverses a string",
+    "what's the capital of Australia?",
+    "open spotify and then open slack",
+    "create a folder demo, then add main.py and README.md inside it",
+    "set up a python project called api with a tests folder and init git",
+    "research the latest AI news and write a short summary",
+]
+
+STUB_FREE_FORM = ('Sure! Here is the JSON for your request:\n```json\n{"type": "os", "intent": "open_application", '
+                  '"target": "chrome", "params": {}, "confidence": 0.95, "requires_confirmation": false, '
+                  '"is_multi_step": false, "message": "Opening Chrome for you."}\n```\nLet me know if you need anything else!')
+STUB_CONSTRAINED = ('{"action_type": "os", "intent": "open_application", "target": "chrome", '
+                    '"message": "Opening Chrome."}')
+
+
+def stub_responder(payload: dict) -> str:
+    return STUB_CONSTRAINED if payload.get("format") else STUB_FREE_FORM
+
+
+async def run_mode(router: ModelRouter, constrained: bool, rounds: int) -> dict:
+    builder = PromptBuilder()
+    results = {"output_tokens": [], "ttft_ms": [], "total_ms": [], "strict": 0, "action_type": 0, "usable": 0, "calls": 0}
+    for _ in range(rounds):
+        for command in COMMANDS:
+            messages = builder.build_messages(command, vector_hits=[])
+            text = await router.complete(messages, INTENT_MODEL, **decoding_options(command, constrained=constrained))
+            timing = router.timings[-1]
+            results["calls"] += 1
+            results["output_tokens"].append(timing.stats.get("output_tokens", 0))
+            results["ttft_ms"].append((timing.ttft_s or 0) * 1000)
+            results["total_ms"].append(timing.total_s * 1000)
+            try:
+                raw = json.loads(text)
+            except json.JSONDecodeError:
+                raw = None
+            results["strict"] += isinstance(raw, dict)
+            results["action_type"] += isinstance(raw, dict) and bool(raw.get("action_type"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                results["usable"] += parse_intent_response(text) is not None
+    return results
+
+
+def report(name: str, results: dict):
+    calls = results["calls"]
+    print(f"--- {name} ({calls} calls) ---")
+    print(f"   output tokens  mean {statistics.mean(results['output_tokens']):6.1f}   "
+          f"max {max(results['output_tokens'])}")
+    print(f"   ttft   p50 {statistics.median(results['ttft_ms']):8.1f} ms")
+    print(f"   total  p50 {statistics.median(results['total_ms']):8.1f} ms   max {max(results['total_ms']):8.1f} ms")
+    print(f"   strict JSON {results['strict']}/{calls}   action_type present {results['action_type']}/{calls}   "
+          f"usable after repair {results['usable']}/{calls}")
+
+
+async def main():
+    use_stub = "--stub" in sys.argv
+    numbers = [arg for arg in sys.argv[1:] if arg.isdigit()]
+    rounds = int(numbers[0]) if numbers else 1
+
+    server = None
+    base_url = OLLAMA_BASE_URL
+    if use_stub:
+        server = await StubLLMServer(stub_responder, ttft_delay_s=0.02, token_delay_s=0.002).start()
+        base_url = server.base_url
+    router = ModelRouter(ollama_base_url=base_url)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await router.warm_up(INTENT_MODEL)
+        for name, constrained in (("free-form", False), ("constrained", True)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = await run_mode(router, constrained, rounds)
+            report(name, results)
+    finally:
+        await router.aclose()
+        if server:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+# benchmarks/bench_crew_cache.py
+#
+# Runs the developer crew three times and reports the wall time and tokens of each run:
+#   1. a new topic            - every task runs (and is cached)
+#   2. the same topic again   - every task comes from the cache
+#   3. coding_task changed    - the plan is reused, only coding_task runs
+# Step 3 appends a sentence to coding_task's config in memory (tasks.yaml is not
+# touched), which is enough to change its cache key.
+# Needs CrewAI and the crew model's API key. The cache entries it writes go to a
+# temporary directory, not .cache/.
+#
+# Without --live it only measures the cache's own overhead per task (key + lookup + store).
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_crew_cache [--live] ["topic"]
+
+import os
+import sys
+import tempfile
+import time
+
+from config import MODEL_ROUTES
+from src.agents import crew_cache
+from src.agents.crew_cache import CrewTaskCache, task_key
+
+ROUNDS = 1000
+PLAN = "1. Create main.py\n2. Write a function that adds two numbers\n" * 40
+
+
+def bench_overhead(directory: str):
+    cache = CrewTaskCache(directory, max_entries=200, ttl_s=3600)
+    config = {"description": "Plan this: {topic}", "expected_output": "A numbered list."}
+    agent = {"role": "Planner", "goal": "Plan", "backstory": "Plans things."}
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        key = task_key("coding_task", config, agent, "model", {"topic": f"topic {i}"}, [PLAN], os.getcwd())
+        if cache.get(key) is None:
+            cache.put(key, "coding_task", PLAN, wall_s=30.0, tokens=2500)
+    miss_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+    start = time.perf_counter()
+    for i in range(ROUNDS):
+        key = task_key("coding_task", config, agent, "model", {"topic": f"topic {ROUNDS - 1 - i % 200}"}, [PLAN], os.getcwd())
+        assert cache.get(key) is not None
+    hit_ms = (time.perf_counter() - start) * 1000 / ROUNDS
+    print(f"Cache overhead per task: miss + store {miss_ms:.3f} ms, hit {hit_ms:.3f} ms "
+          f"(vs. tens of seconds for a model call)")
+
+
+def bench_live(topic: str):
+    from src.agents.crew import run_developer_crew, _acquire_crew, _release_crew
+
+    model_name = MODEL_ROUTES["crew"][0]
+    runs = [("new topic", None), ("same topic", None), ("coding_task changed", "Keep it under 20 lines.")]
+    for label, coding_note in runs:
+        if coding_note:
+            developer_crew = _acquire_crew(model_name)
+            config = developer_crew.tasks_config["coding_task"]
+            config["description"] = config["description"] + " " + coding_note
+            _release_crew(developer_crew)
+        start = time.perf_counter()
+        run = run_developer_crew({"topic": topic}, model_name)
+        elapsed = time.perf_counter() - start
+        used = sum(tokens for _, _, tokens in run.ran)
+        print(f"{label:20s} {elapsed:7.1f} s  {used:7,} tokens used  {run.summary()}")
+
+
+def main():
+    live = "--live" in sys.argv
+    topics = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    with tempfile.TemporaryDirectory() as directory:
+        if not live:
+            bench_overhead(directory)
+            return
+        crew_cache._cache = CrewTaskCache(directory, max_entries=200, ttl_s=3600)
+        bench_live(topics[0] if topics else "a command-line tool that counts words in a file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_event_loop.py
+#
+# Compares the old 10 ms polling loop (app.update() + asyncio.sleep(0.01)) with
+# the threaded AsyncioTkBridge: CPU used while idle, and the latency from an
+# asyncio-side event ("a command finished") to the UI having rendered it.
+#
+# Run from the desk-agent directory (needs a display):
+#     python -m benchmarks.bench_event_loop
+
+import asyncio
+import random
+import statistics
+import time
+import tkinter as tk
+
+from src.ui.event_bridge import AsyncioTkBridge
+
+IDLE_SECONDS = 5.0
+LATENCY_SAMPLES = 200
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _report(name: str, cpu_fraction: float, latencies: list[float]):
+    print(f"--- {name} ---")
+    print(f"   idle CPU:           {cpu_fraction * 100:.2f}% of one core")
+    print(f"   input-to-render p50: {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"   input-to-render p99: {_percentile(latencies, 99) * 1000:.2f} ms")
+
+
+def _make_app():
+    app = tk.Tk()
+    label = tk.Label(app, text="")
+    label.pack()
+    return app, label
+
+
+def bench_polling():
+    """The original main.py loop."""
+    app, label = _make_app()
+    loop = asyncio.new_event_loop()
+    latencies = []
+
+    def render(t0):
+        label.config(text=str(t0))
+        app.update_idletasks()
+        latencies.append(time.perf_counter() - t0)
+
+    async def tk_loop(deadline):
+        while time.perf_counter() < deadline:
+            app.update()
+            await asyncio.sleep(0.01)
+
+    async def producer():
+        for _ in range(LATENCY_SAMPLES):
+            await asyncio.sleep(random.uniform(0.001, 0.02))
+            app.after_idle(render, time.perf_counter())
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    loop.run_until_complete(tk_loop(time.perf_counter() + IDLE_SECONDS))
+    idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+    async def measure():
+        task = asyncio.ensure_future(producer())
+        while not task.done():
+            app.update()
+            await asyncio.sleep(0.01)
+
+    loop.run_until_complete(measure())
+    app.destroy()
+    loop.close()
+    return idle_cpu, latencies
+
+
+def bench_bridge():
+    """asyncio on its own thread, UI work marshalled through the bridge."""
+    app, label = _make_app()
+    loop = asyncio.new_event_loop()
+    bridge = AsyncioTkBridge(app, loop)
+    bridge.start()
+    latencies = []
+
+    def render(t0):
+        label.config(text=str(t0))
+        app.update_idletasks()
+        latencies.append(time.perf_counter() - t0)
+
+    async def producer():
+        for _ in range(LATENCY_SAMPLES):
+            await asyncio.sleep(random.uniform(0.001, 0.02))
+            bridge.call_in_ui(render, time.perf_counter())
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    app.after(int(IDLE_SECONDS * 1000), app.quit)
+    app.mainloop()
+    idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+    future = bridge.submit(producer())
+    future.add_done_callback(lambda _: bridge.call_in_ui(app.quit))
+    app.mainloop()
+    bridge.stop()
+    app.destroy()
+    return idle_cpu, latencies
+
+
+if __name__ == "__main__":
+    print(f"Measuring {IDLE_SECONDS:.0f}s of idle time and {LATENCY_SAMPLES} UI updates per mode...")
+    _report("polling loop (10 ms)", *bench_polling())
+    _report("AsyncioTkBridge", *bench_bridge())
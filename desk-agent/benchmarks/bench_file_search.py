@@ -0,0 +1,101 @@
+# benchmarks/bench_file_search.py
+#
+# Compares the local file index behind search_everything() with a naive
+# os.walk scan:
+#   1. On a real temporary tree (build, no-op refresh, queries vs os.walk).
+#   2. In memory over a large synthetic path list (default 1,000,000 paths).
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_file_search [num_synthetic_paths]
+
+import fnmatch
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+from src.search.local_index import LocalFileIndex
+
+TREE_DIRS = 200
+FILES_PER_DIR = 100
+QUERIES = ["main", "report_1", "*.md", "notes_??.txt", "zzz_not_there"]
+EXTENSIONS = [".py", ".txt", ".md", ".json", ".pdf"]
+
+
+def _random_name(rng: random.Random) -> str:
+    stem = "".join(rng.choices(string.ascii_lowercase + "_", k=rng.randint(5, 14)))
+    return stem + rng.choice(EXTENSIONS)
+
+
+def _naive_walk(root: str, query: str, limit: int) -> list[str]:
+    query = query.lower()
+    is_glob = "*" in query or "?" in query
+    results = []
+    for dir_path, _, files in os.walk(root):
+        for name in files:
+            lowered = name.lower()
+            if (fnmatch.fnmatchcase(lowered, query) if is_glob else query in lowered):
+                results.append(os.path.join(dir_path, name))
+    results.sort(key=lambda path: os.path.basename(path).lower())
+    return results[:limit]
+
+
+def _time_ms(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_tree():
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as index_dir:
+        for d in range(TREE_DIRS):
+            dir_path = os.path.join(root, f"dir_{d // 20}", f"sub_{d}")
+            os.makedirs(dir_path)
+            names = {_random_name(rng) for _ in range(FILES_PER_DIR - 3)}
+            names |= {f"main_{d}.py", f"report_{d}.pdf", f"notes_{d % 100:02d}.txt"}
+            for name in names:
+                open(os.path.join(dir_path, name), "w").close()
+
+        index = LocalFileIndex([root], os.path.join(index_dir, "index.json"), set())
+        start = time.perf_counter()
+        index.refresh()
+        build_ms = (time.perf_counter() - start) * 1000
+        noop_ms = _time_ms(index.refresh, repeat=3)
+
+        print(f"--- Real tree: {TREE_DIRS * FILES_PER_DIR:,} files in {TREE_DIRS} folders ---")
+        print(f"   initial build:    {build_ms:8.1f} ms")
+        print(f"   no-op refresh:    {noop_ms:8.1f} ms (stat only, nothing re-listed)")
+        for query in QUERIES:
+            indexed = _time_ms(lambda: index.search(query, 10))
+            naive = _time_ms(lambda: _naive_walk(root, query, 10), repeat=2)
+            print(f"   {query!r:18} index {indexed:8.3f} ms   os.walk {naive:8.1f} ms")
+
+
+def bench_synthetic(count: int):
+    rng = random.Random(1)
+    paths = [
+        os.path.join("/home/user", f"project_{i % 500}", f"pkg_{i % 37}", _random_name(rng))
+        for i in range(count)
+    ]
+    paths[count // 2] = "/home/user/project_1/pkg_1/main.py"
+    start = time.perf_counter()
+    index = LocalFileIndex.from_paths(paths)
+    build_s = time.perf_counter() - start
+
+    print(f"--- In-memory: {count:,} synthetic paths (built in {build_s:.2f}s) ---")
+    for query in QUERIES + ["main.py", "project_1/pkg_1/"]:
+        indexed = _time_ms(lambda: index.search(query, 10))
+        print(f"   {query!r:18} limit=10   {indexed:8.3f} ms")
+    full = _time_ms(lambda: index.search("zzz_not_there", 10), repeat=3)
+    print(f"   worst case (full scan, no hit): {full:.1f} ms")
+
+
+if __name__ == "__main__":
+    bench_tree()
+    bench_synthetic(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
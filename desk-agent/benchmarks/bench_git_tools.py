@@ -0,0 +1,89 @@
+# benchmarks/bench_git_tools.py
+#
+# Adds and commits 1,000 new files in a throwaway repository, two ways:
+#   "naive"   - one `git add <file>` process per file, then `git commit` and `git status`,
+#               like running each step of a sequence as its own command.
+#   "batched" - the same steps as a sequence, merged by batch_git_steps into one
+#               git_batch: the adds are staged by a single git process.
+# Reports wall time and git processes started; both runs must end with the same
+# files committed and a clean working tree.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_git_tools [file count]
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.agents.tools import git_tools
+from src.processing.action_router import batch_git_steps, run_tool
+
+FILES = 1000
+
+
+def make_repository(root: str, files: int) -> list[str]:
+    subprocess.run(["git", "init", "-q", root], check=True)
+    subprocess.run(["git", "config", "user.name", "Bench"], cwd=root, check=True)
+    subprocess.run(["git", "config", "user.email", "bench@example.com"], cwd=root, check=True)
+    paths = []
+    for i in range(files):
+        path = os.path.join(root, "src", f"module_{i:04d}.py")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"VALUE = {i}\n")
+        paths.append(path)
+    return paths
+
+
+def committed_files(root: str) -> int:
+    output = subprocess.run(["git", "ls-tree", "-r", "--name-only", "HEAD"], cwd=root,
+                            capture_output=True, text=True, check=True).stdout
+    return len(output.splitlines())
+
+
+def is_clean(root: str) -> bool:
+    return not subprocess.run(["git", "status", "--porcelain"], cwd=root, capture_output=True, text=True).stdout
+
+
+def bench_naive(root: str, paths: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    for path in paths:
+        subprocess.run(["git", "add", path], cwd=root, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "Add modules"], cwd=root, check=True)
+    subprocess.run(["git", "status", "--porcelain"], cwd=root, capture_output=True, check=True)
+    return time.perf_counter() - start, len(paths) + 2
+
+
+def bench_batched(root: str, paths: list[str]) -> tuple[float, int]:
+    actions = [{"intent": "git_add", "action_type": "git", "target": path} for path in paths]
+    actions.append({"intent": "git_commit", "action_type": "git", "params": {"message": "Add modules"}, "target": root})
+    actions.append({"intent": "git_status", "action_type": "git", "target": root})
+    start = time.perf_counter()
+    batched = batch_git_steps(actions)
+    assert len(batched) == 1 and batched[0]["intent"] == "git_batch", batched
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_tool(batched[0])
+    elapsed = time.perf_counter() - start
+    assert "❌" not in result, result
+    return elapsed, git_tools.get_session(root).processes
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else FILES
+    results = {}
+    for name, bench in (("naive", bench_naive), ("batched", bench_batched)):
+        with tempfile.TemporaryDirectory() as root:
+            paths = make_repository(root, files)
+            elapsed, processes = bench(root, paths)
+            assert committed_files(root) == files and is_clean(root), f"{name}: wrong end state"
+            results[name] = elapsed
+            print(f"{name:8s} {elapsed * 1000:9.1f} ms  {processes:5d} git processes  ({files} files added and committed)")
+    print(f"Batched is {results['naive'] / results['batched']:.1f}x faster.")
+
+
+if __name__ == "__main__":
+    main()
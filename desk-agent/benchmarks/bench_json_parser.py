@@ -0,0 +1,82 @@
+# benchmarks/bench_json_parser.py
+#
+# Runs a corpus of intent-model responses (benchmarks/data/intent_responses.jsonl)
+# through JSON extraction and reports, per extractor:
+#   - how many responses yield the expected intent (or are correctly rejected)
+#   - the time per call, for clean responses and over the whole corpus
+#   "old" - the previous extract_json_from_response (regex for a ```json fence, else json.loads).
+#   "new" - parse_intent_response: single-pass scan, repair, then schema validation.
+# The corpus holds the kinds of defects small local models produce (prose around the
+# JSON, trailing commas, comments, single quotes, truncation, wrong field names, ...);
+# add real responses to it as you collect them.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_json_parser [-v]
+
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+
+from src.utils.json_parser import parse_intent_response
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_responses.jsonl")
+ROUNDS = 2000
+
+
+def old_extract(text: str) -> dict | None:
+    # The previous extract_json_from_response.
+    match = re.search(r"```json\s*(\{.*?\})\s*```", text, re.DOTALL)
+    json_str = match.group(1) if match else text
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        return None
+
+
+def is_correct(result, expected: str | None) -> bool:
+    if expected is None:
+        return not isinstance(result, dict) or not (result.get("intent") or result.get("actions"))
+    if not isinstance(result, dict):
+        return False
+    if expected == "sequence":
+        return result.get("action_type") == "sequence" and bool(result.get("actions"))
+    return result.get("intent") == expected and bool(result.get("action_type"))
+
+
+def time_per_call(extract, responses: list[str]) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for response in responses:
+                extract(response)
+        elapsed = time.perf_counter() - start
+    return elapsed / (ROUNDS * len(responses)) * 1e6
+
+
+def main():
+    verbose = "-v" in sys.argv
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    clean = [case["response"] for case in corpus if case["case"] == "clean"]
+    everything = [case["response"] for case in corpus]
+
+    for name, extract in (("old", old_extract), ("new", parse_intent_response)):
+        correct = 0
+        for case in corpus:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = extract(case["response"])
+            ok = is_correct(result, case["expected_intent"])
+            correct += ok
+            if verbose and not ok:
+                print(f"   {name} ✗ {case['case']}: {result}")
+        print(f"{name}: {correct}/{len(corpus)} correct   "
+              f"clean {time_per_call(extract, clean):6.1f} µs/call   "
+              f"corpus {time_per_call(extract, everything):6.1f} µs/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_memory.py
+#
+# Measures the memory vector store at 100k entries, with synthetic embeddings
+# (so the sentence-transformers model isn't needed):
+#   - batched insert throughput
+#   - top-k search latency (target: under 10 ms)
+#   - reload time after a restart (memory-mapped vectors, nothing re-embedded)
+#   - eviction + compaction time
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_memory
+
+import tempfile
+import time
+
+import numpy as np
+
+from config import MEMORY_IVF_MIN_ENTRIES, MEMORY_IVF_NPROBE
+from src.memory.vector_store import VectorStore
+
+ENTRIES = 100_000
+DIM = 384
+BATCH = 1000
+QUERIES = 200
+K = 5
+
+
+def synthetic_vectors(rng, count: int) -> np.ndarray:
+    # Clustered like real sentence embeddings, then L2-normalized.
+    centers = rng.standard_normal((300, DIM)).astype("float32")
+    vectors = centers[rng.integers(0, 300, count)] + 0.5 * rng.standard_normal((count, DIM)).astype("float32")
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def percentile_ms(samples: list, q: float) -> float:
+    return float(np.percentile(samples, q)) * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    vectors = synthetic_vectors(rng, ENTRIES)
+    with tempfile.TemporaryDirectory() as directory:
+        store = VectorStore(directory, MEMORY_IVF_MIN_ENTRIES, MEMORY_IVF_NPROBE)
+        start = time.perf_counter()
+        for i in range(0, ENTRIES, BATCH):
+            texts = [f"turn {j}" for j in range(i, i + BATCH)]
+            store.add_vectors(vectors[i:i + BATCH], texts, [{"kind": "turn"}] * BATCH)
+        elapsed = time.perf_counter() - start
+        print(f"Inserted {ENTRIES} entries in {elapsed:.2f}s ({ENTRIES / elapsed:,.0f}/s, index rebuilds included).")
+
+        queries = vectors[rng.integers(0, ENTRIES, QUERIES)]
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            store.search_vector(query[None, :], K)
+            timings.append(time.perf_counter() - start)
+        print(f"Top-{K} search: p50 {percentile_ms(timings, 50):.2f} ms, p99 {percentile_ms(timings, 99):.2f} ms")
+
+        hits = sum(store.search_vector(q[None, :], 1)[0][1]["text"] == f"turn {i}"
+                   for i, q in zip(range(0, ENTRIES, ENTRIES // 100), vectors[::ENTRIES // 100]))
+        print(f"Self-recall@1 on 100 stored vectors: {hits}%")
+
+        start = time.perf_counter()
+        reloaded = VectorStore(directory, MEMORY_IVF_MIN_ENTRIES, MEMORY_IVF_NPROBE)
+        print(f"Reloaded {len(reloaded)} entries in {time.perf_counter() - start:.2f}s.")
+
+        start = time.perf_counter()
+        store.remove(list(store.entries)[:ENTRIES // 3])
+        store.compact()
+        print(f"Evicted a third and compacted in {time.perf_counter() - start:.2f}s; {len(store)} entries left.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_model_router.py
+#
+# Measures per-call latency (queue / connect / TTFT / total) of ModelRouter
+# against the local stub LLM server:
+#   "fresh client"  - a new router (new connection) for every call, like an unpooled client.
+#   "pooled router" - one router for the whole session, with a warm-up first.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_model_router
+
+import asyncio
+import statistics
+
+from src.routing.model_router import ModelRouter
+from tests.stub_server import StubLLMServer
+
+CALLS = 50
+CONCURRENCY = 4
+MODEL = "ollama/stub-model"
+MESSAGES = [{"role": "user", "content": "open notepad"}]
+
+
+def _summary(name: str, timings: list):
+    def median_ms(values):
+        values = [v for v in values if v is not None]
+        return statistics.median(values) * 1000 if values else float("nan")
+
+    print(f"--- {name} ({len(timings)} calls) ---")
+    print(f"   queue   p50 {median_ms([t.queue_s for t in timings]):7.2f} ms")
+    print(f"   connect p50 {median_ms([t.connect_s for t in timings]):7.2f} ms "
+          f"(calls that opened a connection: {sum(1 for t in timings if t.connect_s > 0)})")
+    print(f"   ttft    p50 {median_ms([t.ttft_s for t in timings]):7.2f} ms")
+    print(f"   total   p50 {median_ms([t.total_s for t in timings]):7.2f} ms")
+
+
+async def bench_fresh_clients(base_url: str) -> list:
+    timings = []
+    for _ in range(CALLS):
+        router = ModelRouter(ollama_base_url=base_url)
+        await router.complete(MESSAGES, MODEL)
+        timings.extend(router.timings)
+        await router.aclose()
+    return timings
+
+
+async def bench_pooled(base_url: str) -> list:
+    router = ModelRouter(ollama_base_url=base_url, max_concurrency=CONCURRENCY)
+    await router.warm_up(MODEL)
+    for _ in range(CALLS // CONCURRENCY):
+        await asyncio.gather(*(router.complete(MESSAGES, MODEL) for _ in range(CONCURRENCY)))
+    timings = list(router.timings)
+    await router.aclose()
+    return timings
+
+
+async def main():
+    async with StubLLMServer(ttft_delay_s=0.02, token_delay_s=0.001) as server:
+        _summary("fresh client per call", await bench_fresh_clients(server.base_url))
+        _summary("pooled router", await bench_pooled(server.base_url))
+        print(f"Stub server saw {server.requests} requests over {server.connections} connections.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+# benchmarks/bench_model_routing.py
+#
+# Exercises ModelRouter.route() against the local stub LLM server, with a
+# preferred model and a smaller fallback for the "intent" request class:
+#   "healthy"      - everything goes to the preferred model.
+#   "slow primary" - the preferred model takes 3 s to start answering: the first calls are
+#                    hedged with the fallback, and after a few lost races the fallback is tried first.
+#   "primary down" - the preferred model returns errors: calls fall back, and once the
+#                    circuit opens the preferred model isn't even tried.
+#   "recovered"    - the preferred model works again: after the circuit's reset time a
+#                    trial call closes it and traffic returns.
+# For each scenario it prints the latency percentiles and which model served each call.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_model_routing
+
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from collections import Counter
+
+from src.routing.model_router import ModelRouter
+from tests.stub_server import StubLLMServer
+
+PRIMARY = "ollama/primary"
+FALLBACK = "ollama/fallback"
+REGISTRY = {
+    PRIMARY: {"cost_per_mtok": 0.0, "expected_ttft_s": 0.2},
+    FALLBACK: {"cost_per_mtok": 0.0, "expected_ttft_s": 0.1},
+}
+ROUTES = {"intent": [PRIMARY, FALLBACK]}
+# The stub sees model names without the provider prefix.
+PRIMARY_ON_SERVER = PRIMARY.split("/", 1)[1]
+MESSAGES = [{"role": "user", "content": "open notepad"}]
+CALLS = 20
+
+
+async def run_scenario(router: ModelRouter, server: StubLLMServer, name: str):
+    served = Counter()
+    latencies = []
+    requests_before = Counter(p["model"] for p in server.payloads)
+    for _ in range(CALLS):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                "".join([chunk async for chunk in router.route("intent", MESSAGES)])
+                served[next(t.model for t in reversed(router.timings) if t.ok)] += 1
+            except RuntimeError:
+                served["(failed)"] += 1
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    requests = Counter(p["model"] for p in server.payloads) - requests_before
+    print(f"--- {name} ({CALLS} calls) ---")
+    print(f"   latency p50 {statistics.median(latencies) * 1000:7.1f} ms   "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms")
+    print(f"   served by: {dict(served)}   requests sent: {dict(requests)}")
+    for row in router.health():
+        print(f"   {row['model']:16} ttft p50 {row['ttft_p50_ms']:7.1f} ms  p95 {row['ttft_p95_ms']:7.1f} ms  "
+              f"circuit {row['circuit']}{'  (demoted)' if row['slow'] else ''}")
+
+
+async def main():
+    async with StubLLMServer(ttft_delay_s=0.05, token_delay_s=0.001) as server:
+        router = ModelRouter(ollama_base_url=server.base_url, registry=REGISTRY, routes=ROUTES)
+        try:
+            await run_scenario(router, server, "healthy")
+
+            server.model_ttft_delay_s[PRIMARY_ON_SERVER] = 3.0
+            await run_scenario(router, server, "slow primary")
+            server.model_ttft_delay_s.clear()
+
+            # A fresh router, so the slow scenario's latency history doesn't decide the order.
+            await router.aclose()
+            router = ModelRouter(ollama_base_url=server.base_url, registry=REGISTRY, routes=ROUTES)
+            router.breaker_for(PRIMARY).reset_after_s = 1.0
+            server.failing_models.add(PRIMARY_ON_SERVER)
+            await run_scenario(router, server, "primary down")
+
+            server.failing_models.clear()
+            await asyncio.sleep(1.0)
+            await run_scenario(router, server, "recovered")
+        finally:
+            await router.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+# benchmarks/bench_search_results.py
+#
+# Per-result cost of reading paths out of a search backend:
+#   "alloc per result" - the old loop: create_unicode_buffer(260) for every result.
+#   "reused buffer"    - EverythingBackend._result_path: one growable buffer.
+#
+# Without Windows/Everything, GetResultFullPathNameW is simulated with a C-level
+# memmove into the caller's buffer so only the Python-side cost differs. With
+# the Everything DLL available, the real iter_results() is timed as well.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_search_results
+
+import ctypes
+import time
+
+from src.search.everything_search import EverythingBackend, search_everything, iter_search_results
+
+NUM_RESULTS = 100_000
+
+
+class FakeEverythingDll:
+    """Copies prepared wide strings into the caller's buffer, like GetResultFullPathNameW."""
+
+    def __init__(self, paths: list[str]):
+        self.sources = [ctypes.create_unicode_buffer(path) for path in paths]
+        self.lengths = [len(path) for path in paths]
+        self.char_size = ctypes.sizeof(ctypes.c_wchar)
+
+    def Everything_GetResultFullPathNameW(self, index, buf, size):
+        length = self.lengths[index]
+        if buf is None:
+            return length
+        copied = min(length, size - 1)
+        ctypes.memmove(buf, self.sources[index], copied * self.char_size)
+        buf[copied] = "\0"
+        return copied
+
+
+def bench_alloc_per_result(dll, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        buf = ctypes.create_unicode_buffer(260)
+        dll.Everything_GetResultFullPathNameW(i, buf, 260)
+        buf.value
+    return (time.perf_counter() - start) / count
+
+
+def bench_reused_buffer(dll, count: int) -> float:
+    backend = EverythingBackend()
+    start = time.perf_counter()
+    for i in range(count):
+        backend._result_path(dll, i)
+    return (time.perf_counter() - start) / count
+
+
+def bench_real(query: str = "*.py") -> None:
+    start = time.perf_counter()
+    old = search_everything(query, limit=NUM_RESULTS)
+    list_s = time.perf_counter() - start
+    start = time.perf_counter()
+    streamed = sum(1 for _ in iter_search_results(query, limit=NUM_RESULTS))
+    stream_s = time.perf_counter() - start
+    print(f"--- Everything DLL, query {query!r} ---")
+    print(f"   search_everything:   {len(old):,} results, {list_s / max(1, len(old)) * 1e6:.2f} us/result")
+    print(f"   iter_search_results: {streamed:,} results, {stream_s / max(1, streamed) * 1e6:.2f} us/result")
+
+
+if __name__ == "__main__":
+    paths = [f"C:\\Users\\dev\\projects\\project_{i % 300}\\src\\module_{i}.py" for i in range(NUM_RESULTS)]
+    # A few paths longer than MAX_PATH, which the old loop silently truncated.
+    for i in range(0, NUM_RESULTS, 1000):
+        paths[i] = "C:\\" + "\\".join(["very_long_folder_name"] * 20) + f"\\file_{i}.txt"
+    dll = FakeEverythingDll(paths)
+
+    backend = EverythingBackend()
+    assert backend._result_path(dll, 0) == paths[0], "long path was truncated"
+
+    alloc = bench_alloc_per_result(dll, NUM_RESULTS)
+    reused = bench_reused_buffer(dll, NUM_RESULTS)
+    print(f"--- Simulated GetResultFullPathNameW, {NUM_RESULTS:,} results ---")
+    print(f"   alloc per result: {alloc * 1e6:.3f} us/result (truncates paths over 259 chars)")
+    print(f"   reused buffer:    {reused * 1e6:.3f} us/result (long paths handled)")
+
+    if EverythingBackend.is_available():
+        bench_real()
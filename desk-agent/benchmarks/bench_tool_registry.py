@@ -0,0 +1,102 @@
+# benchmarks/bench_tool_registry.py
+#
+# Generates 10 / 100 / 500 throwaway plugin files (one @tool each) and measures:
+#   - eager  - importing every plugin module up front (what a hand-written TOOL_REGISTRY does)
+#   - cold   - ToolRegistry scanning all files with no manifest yet
+#   - cached - ToolRegistry starting from the manifest (only stat() per file)
+#   - first call / warm call - dispatching one tool, before and after its module is loaded
+#   - prompt - generating the SUPPORTED ACTIONS section
+# Startup should stay flat from 10 to 500 plugins once the manifest exists, and a
+# warm call should cost the same regardless of how many tools are registered.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_tool_registry
+
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from src.processing.tool_registry import ToolRegistry
+
+PLUGIN_COUNTS = [10, 100, 500]
+WARM_CALLS = 10_000
+
+PLUGIN_SOURCE = '''# {package}/{module}.py
+
+import json
+
+from src.processing.tool_registry import tool
+
+
+@tool("{name}", example="Run {name} on notes.txt", call={{"target": "notes.txt"}})
+def {name}(target: str, verbose: bool = False) -> str:
+    """Returns its arguments as JSON."""
+    return json.dumps({{"tool": "{name}", "target": target}})
+'''
+
+
+def write_plugins(root: str, package: str, count: int):
+    os.makedirs(os.path.join(root, package))
+    for i in range(count):
+        module = f"plugin_{i:04d}"
+        with open(os.path.join(root, package, f"{module}.py"), "w", encoding="utf-8") as f:
+            f.write(PLUGIN_SOURCE.format(package=package, module=module, name=f"tool_{i:04d}"))
+
+
+def timed(function) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def bench(root: str, count: int):
+    package = f"bench_plugins_{count}"
+    write_plugins(root, package, count)
+    manifest_path = os.path.join(root, f"manifest_{count}.json")
+
+    def eager():
+        for name in sorted(os.listdir(package)):
+            importlib.import_module(f"{package}.{name[:-3]}")
+
+    def registry():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ToolRegistry(directories=[package], manifest_path=manifest_path)
+
+    cold_ms, _ = timed(registry)
+    cached_ms, tools = timed(registry)
+    assert len(tools.specs) == count, f"found {len(tools.specs)} of {count} tools"
+    prompt_ms, _ = timed(tools.supported_actions)
+
+    name = f"tool_{count - 1:04d}"
+    arguments = {"target": "notes.txt", "params_the_model_made_up": 1}
+    first_ms, _ = timed(lambda: tools.call(name, arguments))
+    warm_ms, _ = timed(lambda: [tools.call(name, arguments) for _ in range(WARM_CALLS)])
+
+    # Eager last, so the first call above really was the module's first import.
+    eager_ms, _ = timed(eager)
+
+    print(f"{count:5d} plugins | eager {eager_ms:8.1f} ms | cold {cold_ms:7.1f} ms | cached {cached_ms:6.2f} ms"
+          f" | prompt {prompt_ms:5.2f} ms | first call {first_ms:5.2f} ms"
+          f" | warm call {warm_ms * 1000 / WARM_CALLS:5.2f} µs")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        cwd = os.getcwd()
+        # Plugin modules are named by their path from the working directory.
+        os.chdir(root)
+        sys.path.insert(0, root)
+        try:
+            for count in PLUGIN_COUNTS:
+                bench(root, count)
+        finally:
+            sys.path.remove(root)
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
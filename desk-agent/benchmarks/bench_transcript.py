@@ -0,0 +1,102 @@
+# benchmarks/bench_transcript.py
+#
+# Measures the latency of showing one more chat message once the conversation
+# already holds 10k / 100k / 1M messages:
+#   "unbounded" - the old add_message: every message stays in the ScrolledText.
+#   "bounded"   - TranscriptView: at most TRANSCRIPT_MAX_LINES lines in the widget,
+#                 everything else in the transcript log.
+# Each timed insert includes the layout pass (update_idletasks) needed to render it.
+# Needs a display (on Linux, e.g. run it under xvfb-run).
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_transcript [max_messages]
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+
+from config import TRANSCRIPT_MAX_LINES, TRANSCRIPT_PAGE_SIZE
+from src.memory.logs import AppendOnlyLog
+from src.ui.transcript import TranscriptView
+
+SIZES = [10_000, 100_000, 1_000_000]
+PREFILL_CHUNK = 10_000
+TIMED_INSERTS = 200
+
+
+def message(i: int) -> str:
+    return f"Job #{i % 7}: Step {i} finished; the crew reported progress on the current task."
+
+
+def add_unbounded(widget: scrolledtext.ScrolledText, text: str):
+    # The previous AppWindow.add_message.
+    widget.config(state="normal")
+    widget.insert(tk.END, f"System: {text}\n\n")
+    widget.config(state="disabled")
+    widget.yview(tk.END)
+
+
+def measure(root: tk.Tk, insert) -> tuple[float, float]:
+    timings = []
+    for i in range(TIMED_INSERTS):
+        start = time.perf_counter()
+        insert(message(i))
+        root.update_idletasks()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return statistics.median(timings) * 1000, timings[int(len(timings) * 0.99) - 1] * 1000
+
+
+def bench_unbounded(root: tk.Tk, size: int) -> tuple[float, float]:
+    widget = scrolledtext.ScrolledText(root, state="disabled", wrap=tk.WORD)
+    widget.pack(fill=tk.BOTH, expand=True)
+    widget.config(state="normal")
+    for start in range(0, size, PREFILL_CHUNK):
+        widget.insert(tk.END, "".join(f"System: {message(i)}\n\n" for i in range(start, start + PREFILL_CHUNK)))
+    widget.config(state="disabled")
+    root.update_idletasks()
+    result = measure(root, lambda text: add_unbounded(widget, text))
+    widget.destroy()
+    return result
+
+
+def bench_bounded(root: tk.Tk, size: int, directory: str) -> tuple[float, float]:
+    widget = scrolledtext.ScrolledText(root, state="disabled", wrap=tk.WORD)
+    widget.pack(fill=tk.BOTH, expand=True)
+    log = AppendOnlyLog(os.path.join(directory, f"transcript_{size}.jsonl"))
+    view = TranscriptView(widget, log, TRANSCRIPT_MAX_LINES, TRANSCRIPT_PAGE_SIZE)
+    for start in range(0, size, PREFILL_CHUNK):
+        for i in range(start, start + PREFILL_CHUNK):
+            view.add("System", message(i))
+        view.flush()
+    root.update_idletasks()
+
+    def insert(text: str):
+        view.add("System", text)
+        view.flush()  # what the per-frame flush does
+
+    result = measure(root, insert)
+    widget.destroy()
+    return result
+
+
+def main():
+    max_messages = int(sys.argv[1]) if len(sys.argv) > 1 else SIZES[-1]
+    root = tk.Tk()
+    root.geometry("700x500")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in [s for s in SIZES if s <= max_messages]:
+            print(f"--- {size:,} messages already shown ---")
+            p50, p99 = bench_bounded(root, size, directory)
+            print(f"   bounded   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+            p50, p99 = bench_unbounded(root, size)
+            print(f"   unbounded p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
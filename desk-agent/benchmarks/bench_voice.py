@@ -0,0 +1,113 @@
+# benchmarks/bench_voice.py
+#
+# Measures the voice path without a microphone, by replaying WAV files in real time:
+#   - end of speech -> full transcript (the VAD's end-silence wait plus any Whisper
+#     work not already done on the chunks sent during the utterance)
+#   - end of speech -> parsed intent (the above plus parse_intent)
+#   - Whisper inference time per utterance
+# Record a few commands ("open chrome", "create a folder called demo and add main.py
+# to it", ...) as WAV files, with some silence around each one.
+# Needs the Whisper model (transformers) and, for the intent, Ollama running.
+#
+# Without WAV files it only checks the segmenter, on synthetic "speech" (noise
+# bursts with short and long pauses), and prints the segments it cuts.
+#
+# Run from the desk-agent directory:
+#     python -m benchmarks.bench_voice [--no-intent] [file.wav ...]
+
+import asyncio
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from config import VOICE_SAMPLE_RATE
+from src.audio.voice_recorder import SpeechSegmenter, read_wav, replay
+from src.audio.voice_transcriber import VoiceTranscriber
+
+
+def synthetic_speech(rng) -> tuple[np.ndarray, list[tuple[float, float]]]:
+    """Background noise with bursts of louder, modulated noise; returns the audio and the burst times."""
+    # (silence before, speech) in seconds: two utterances with a short pause inside each,
+    # a 50 ms click that shouldn't count as speech, and a last single-phrase utterance.
+    plan = [(0.5, 0.8), (0.3, 1.0), (1.0, 0.6), (0.25, 0.5), (1.2, 0.05), (1.0, 1.0)]
+    parts, bursts, t = [], [], 0.0
+    for silence, speech in plan:
+        parts.append(rng.normal(0, 0.002, int(silence * VOICE_SAMPLE_RATE)))
+        t += silence
+        n = int(speech * VOICE_SAMPLE_RATE)
+        envelope = 0.5 + 0.5 * np.sin(np.linspace(0, speech * 2 * np.pi * 4, n)) ** 2
+        parts.append(rng.normal(0, 0.1, n) * envelope)
+        bursts.append((t, t + speech))
+        t += speech
+    parts.append(rng.normal(0, 0.002, VOICE_SAMPLE_RATE))
+    return np.concatenate(parts).astype(np.float32), bursts
+
+
+def check_segmenter():
+    audio, bursts = synthetic_speech(np.random.default_rng(0))
+    print(f"Synthetic audio: {len(audio) / VOICE_SAMPLE_RATE:.1f} s, speech at "
+          + ", ".join(f"{a:.2f}-{b:.2f}s" for a, b in bursts))
+    segments = []
+    segmenter = SpeechSegmenter(segments.append)
+    start = time.perf_counter()
+    replay(audio, segmenter, realtime=False)
+    elapsed = time.perf_counter() - start
+    for segment in segments:
+        print(f"   utterance {segment.utterance_id} segment {segment.index}: "
+              f"{segment.duration_s:5.2f} s{' (final)' if segment.is_final else ''}")
+    print(f"Segmented {len(audio) / VOICE_SAMPLE_RATE:.1f} s of audio in {elapsed * 1000:.1f} ms "
+          f"({len(audio) / VOICE_SAMPLE_RATE / elapsed:.0f}x real time).")
+
+
+async def bench_files(paths: list[str], with_intent: bool):
+    loop = asyncio.get_running_loop()
+    utterances = asyncio.Queue()
+    transcriber = VoiceTranscriber(on_utterance=lambda u: loop.call_soon_threadsafe(utterances.put_nowait, u))
+    transcriber.start()
+    print("Loading Whisper...")
+    await asyncio.to_thread(transcriber.ready.wait)
+    if with_intent:
+        from src.processing.intent_parser import parse_intent
+
+    transcript_ms, intent_ms, whisper_ms = [], [], []
+    try:
+        for path in paths:
+            segmenter = SpeechSegmenter(transcriber.submit)
+            replaying = asyncio.create_task(asyncio.to_thread(replay, read_wav(path), segmenter))
+            while not (replaying.done() and utterances.empty() and not transcriber.pending):
+                try:
+                    utterance = await asyncio.wait_for(utterances.get(), timeout=0.1)
+                except asyncio.TimeoutError:
+                    continue
+                transcript_ms.append(utterance.transcription_latency_s * 1000)
+                whisper_ms.append(utterance.inference_s * 1000)
+                line = (f"{path}: \"{utterance.text}\"  transcript {transcript_ms[-1]:.0f} ms "
+                        f"(Whisper {whisper_ms[-1]:.0f} ms)")
+                if with_intent:
+                    intent = await parse_intent(utterance.text)
+                    intent_ms.append((time.perf_counter() - utterance.speech_end_time) * 1000)
+                    line += f"  intent {intent_ms[-1]:.0f} ms -> {intent and intent.get('intent')}"
+                print(line)
+    finally:
+        transcriber.stop()
+
+    if transcript_ms:
+        print(f"--- {len(transcript_ms)} utterances ---")
+        print(f"   end of speech -> transcript p50 {statistics.median(transcript_ms):7.0f} ms")
+        print(f"   Whisper per utterance       p50 {statistics.median(whisper_ms):7.0f} ms")
+        if intent_ms:
+            print(f"   end of speech -> intent     p50 {statistics.median(intent_ms):7.0f} ms")
+
+
+def main():
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not paths:
+        check_segmenter()
+        return
+    asyncio.run(bench_files(paths, with_intent="--no-intent" not in sys.argv))
+
+
+if __name__ == "__main__":
+    main()
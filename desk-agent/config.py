@@ -7,7 +7,174 @@ load_dotenv()
 
 # --- Model Configuration ---
 INTENT_MODEL = "ollama/phi3:3.8b"
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+# How long Ollama keeps a model loaded after the last request.
+OLLAMA_KEEP_ALIVE = "30m"
+# Re-warm INTENT_MODEL this often (seconds) so it stays resident while the agent is idle.
+MODEL_KEEP_WARM_INTERVAL_S = 15 * 60
+# Concurrent requests per provider; extra calls wait (and that wait is reported as queue time).
+PROVIDER_MAX_CONCURRENCY = 2
+LLM_REQUEST_TIMEOUT_S = 120
+
+# --- Model Routing ---
+# Every model the router may use: cost in USD per 1M output tokens, the time to
+# first token assumed until it has been measured, and where its API key lives.
+MODEL_REGISTRY = {
+    "ollama/phi3:3.8b": {"cost_per_mtok": 0.0, "expected_ttft_s": 0.8},
+    "ollama/qwen2.5:0.5b": {"cost_per_mtok": 0.0, "expected_ttft_s": 0.3},
+    "gemini/gemini-1.5-pro-latest": {"cost_per_mtok": 5.0, "expected_ttft_s": 1.5, "api_key_env": "GOOGLE_API_KEY"},
+    "gemini/gemini-1.5-flash-latest": {"cost_per_mtok": 0.3, "expected_ttft_s": 0.6, "api_key_env": "GOOGLE_API_KEY"},
+}
+# The models tried for each kind of request, most preferred first. The last
+# entries are the fallbacks, ending with a small local model where possible.
+MODEL_ROUTES = {
+    "intent": [INTENT_MODEL, "ollama/qwen2.5:0.5b"],
+    "chat": ["gemini/gemini-1.5-pro-latest", "gemini/gemini-1.5-flash-latest", INTENT_MODEL],
+    "crew": ["gemini/gemini-1.5-pro-latest", "gemini/gemini-1.5-flash-latest"],
+}
+# Models whose median time to first token is over this budget, or that lost
+# HEDGE_LOSSES_TO_DEMOTE hedged races in a row, are tried after the faster ones
+# for ROUTE_RETRY_SLOW_S seconds; then they are tried first again.
+ROUTE_TTFT_BUDGET_S = {"intent": 1.5, "chat": 4.0}
+HEDGE_LOSSES_TO_DEMOTE = 3
+ROUTE_RETRY_SLOW_S = 60
+# If a model hasn't started answering by its p95 time to first token (kept within
+# these bounds), the next model is started alongside it and the first to answer wins.
+HEDGE_MIN_DELAY_S = 0.5
+HEDGE_MAX_DELAY_S = 10.0
+# How many recent calls per model the latency percentiles are computed over.
+LATENCY_WINDOW = 100
+# A model that fails this many times in a row is skipped for CIRCUIT_RESET_S seconds.
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_S = 30
+
+# --- Local Storage ---
+# Caches and indexes that can always be rebuilt live here.
+CACHE_DIR = ".cache"
+# The conversation history is kept here; unlike the cache it can't be rebuilt.
+MEMORY_DIR = "memory"
 
 # --- SDK/External Tool Paths ---
 # Add the full path to your Everything64.dll file here.
-EVERYTHING_DLL_PATH = r"C:\Users\Parth Dhengle\Desktop\Projects\Gen Ai\Desk-agent\desk-agent\src\search\everything_sdk\dll\Everything64.dll"
\ No newline at end of file
+EVERYTHING_DLL_PATH = r"C:\Users\Parth Dhengle\Desktop\Projects\Gen Ai\Desk-agent\desk-agent\src\search\everything_sdk\dll\Everything64.dll"
+
+# --- File Search ---
+# "everything" (Windows, needs the DLL above), "local" (built-in file index) or "auto".
+SEARCH_BACKEND = "auto"
+SEARCH_INDEX_PATH = os.path.join(CACHE_DIR, "file_index.json")
+SEARCH_INDEX_ROOTS = [os.path.expanduser("~")]
+SEARCH_INDEX_EXCLUDES = {".git", "node_modules", "__pycache__", ".venv", "venv", ".cache", "AppData"}
+# How often (seconds) the local index re-checks folder modification times.
+SEARCH_INDEX_REFRESH_S = 300
+# Results copied out of Everything per query; the SDK lock is released between pages.
+EVERYTHING_PAGE_SIZE = 500
+
+# --- Intent Parsing ---
+# Commands matched by the local fast path with at least this confidence skip the LLM.
+FAST_PATH_MIN_CONFIDENCE = 0.9
+# Stream model output so sequence steps and chat replies start before generation finishes.
+STREAMING_ENABLED = True
+# How many earlier commands are included in the prompt's recent history.
+RECENT_HISTORY_TURNS = 3
+# Constrain the intent model's output to the intent JSON Schema (Ollama `format` /
+# LiteLLM `response_format`): no prose around the JSON, no malformed output.
+CONSTRAINED_DECODING = True
+# Output token caps for the intent model. Commands that look multi-step get the
+# larger "sequence" cap; everything else is a single action.
+INTENT_MAX_TOKENS = {"single": 160, "sequence": 640}
+
+# --- Intent Cache ---
+# Parsed intents are cached on disk; near-identical commands ("open YouTube please")
+# reuse them when their embedding similarity is at least INTENT_CACHE_THRESHOLD.
+INTENT_CACHE_PATH = os.path.join(CACHE_DIR, "intent_cache.json")
+INTENT_CACHE_THRESHOLD = 0.92
+INTENT_CACHE_MAX_ENTRIES = 500
+INTENT_CACHE_TTL_S = 7 * 24 * 60 * 60
+
+# --- Embeddings ---
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# --- Memory ---
+# Every turn is appended to the history log; turns and the files in KNOWLEDGE_DIR
+# are embedded into a vector store, and the closest matches are added to the intent prompt.
+HISTORY_LOG_PATH = os.path.join(MEMORY_DIR, "history.jsonl")
+MEMORY_INDEX_DIR = os.path.join(CACHE_DIR, "memory_index")
+KNOWLEDGE_DIR = "knowledge"
+MEMORY_TOP_K = 3
+MEMORY_MIN_SCORE = 0.35
+# Older turns are evicted from the log and the index beyond this many.
+MEMORY_MAX_TURNS = 100_000
+# Past this many entries, exact search is replaced by an IVF index (probing MEMORY_IVF_NPROBE lists).
+MEMORY_IVF_MIN_ENTRIES = 20_000
+MEMORY_IVF_NPROBE = 8
+
+# --- Action Execution ---
+# Blocking tools (including independent sequence steps) run on a pool of this many threads.
+TOOL_MAX_WORKERS = 4
+# Long-running CrewAI jobs beyond this limit wait in a queue.
+MAX_CONCURRENT_CREWS = 1
+
+# --- Crew Cache ---
+# Crew task outputs are cached on disk by task, agent, model, inputs and the outputs
+# they build on, so repeating a request (or changing only a later task) skips the
+# model calls for everything that hasn't changed.
+CREW_CACHE_DIR = os.path.join(CACHE_DIR, "crew_tasks")
+CREW_CACHE_MAX_ENTRIES = 200
+CREW_CACHE_TTL_S = 7 * 24 * 60 * 60
+
+# --- Tools & Plugins ---
+# Every @tool in these directories is offered to the intent model. Modules are only
+# imported when one of their tools is first called.
+TOOL_DIRECTORIES = [os.path.join("src", "agents", "tools"), "plugins"]
+# What was found in each file, keyed by its size and modification time.
+TOOL_MANIFEST_PATH = os.path.join(CACHE_DIR, "tool_manifest.json")
+
+# --- Command Pipeline ---
+# Commands are parsed concurrently but executed in the order they were typed.
+# Beyond this many unfinished commands, new ones are turned away until one finishes.
+PIPELINE_MAX_PENDING = 8
+
+# --- Tracing ---
+# Each command is traced (UI submit, parsing, model calls, JSON extraction, routing,
+# tools) and its spans are appended to TRACE_LOG_PATH as JSON lines.
+TRACING_ENABLED = True
+TRACE_LOG_PATH = os.path.join(CACHE_DIR, "traces.jsonl")
+# When the trace log grows past this, its older half is dropped at startup.
+TRACE_LOG_MAX_BYTES = 20 * 1024 * 1024
+
+# --- Startup ---
+# Load heavy frameworks and LLM clients in the background once the window is up.
+PREWARM_ENABLED = True
+# `python main.py --startup-report` fails if the window takes longer than this to appear.
+STARTUP_BUDGET_S = 1.5
+
+# --- Conversation Display ---
+# The chat widget keeps at most this many lines; older messages are trimmed from the
+# top and paged back in from TRANSCRIPT_LOG_PATH when you scroll up.
+TRANSCRIPT_MAX_LINES = 2000
+TRANSCRIPT_PAGE_SIZE = 50
+TRANSCRIPT_LOG_PATH = os.path.join(MEMORY_DIR, "transcript.jsonl")
+# When the transcript log grows past this, its older half is dropped at startup.
+TRANSCRIPT_LOG_MAX_BYTES = 20 * 1024 * 1024
+
+# --- Voice Input ---
+# Microphone audio is split into utterances by an energy-based VAD and transcribed
+# by Whisper on the CPU, in a worker process.
+WHISPER_MODEL = "openai/whisper-base.en"
+VOICE_SAMPLE_RATE = 16_000
+VOICE_FRAME_MS = 30
+# The most recent audio kept for cutting out utterances.
+VOICE_RING_BUFFER_S = 30
+# A frame is speech when its RMS energy is this many times the (adaptive) noise floor,
+# and at least VOICE_VAD_MIN_RMS.
+VOICE_VAD_RATIO = 3.0
+VOICE_VAD_MIN_RMS = 0.01
+# Speech must last this long to start an utterance; this much audio before it is kept too.
+VOICE_MIN_SPEECH_MS = 90
+VOICE_PRE_ROLL_MS = 200
+# A pause this long sends the speech so far to Whisper while the user keeps talking...
+VOICE_CHUNK_PAUSE_MS = 200
+# ...and one this long ends the utterance.
+VOICE_END_SILENCE_MS = 500
+VOICE_MAX_CHUNK_S = 10
+VOICE_MAX_UTTERANCE_S = 30
@@ -1,41 +1,75 @@
 # main.py
 
+from src.utils import startup # <-- Imported first so it can time the rest of startup
+
 import asyncio
+import sys
+import tkinter as tk
+from config import INTENT_MODEL, MODEL_KEEP_WARM_INTERVAL_S, PREWARM_ENABLED, STARTUP_BUDGET_S
+from src.processing import fast_path, intent_cache
+from src.routing.model_router import get_router
 from src.ui.app_window import AppWindow
+from src.ui.event_bridge import AsyncioTkBridge
 
 class AsyncTkinterLoop:
     """A class to bridge asyncio and Tkinter's mainloop."""
-    def __init__(self, app):
+    def __init__(self, app, startup_report=False):
         self.app = app
         self.loop = app.loop
-        self.running = True
+        self.startup_report = startup_report
+        self.startup_ok = True
+        # asyncio runs on its own thread; Tk keeps the main thread and sleeps until there's work.
+        self.bridge = AsyncioTkBridge(app, self.loop)
+        app.bridge = self.bridge
 
     def run(self):
         try:
             self.app.protocol("WM_DELETE_WINDOW", self.on_closing)
-            self.loop.run_until_complete(self.tk_loop())
+            self.bridge.start()
+            # Runs once mainloop has drawn the window for the first time.
+            self.app.after(0, self.on_window_shown)
+            self.app.mainloop()
         except KeyboardInterrupt:
             self.on_closing()
+        finally:
+            self.bridge.stop()
+
+    def on_window_shown(self):
+        startup.mark("window_shown")
+        if self.startup_report:
+            self.startup_ok = startup.print_startup_report(STARTUP_BUDGET_S)
+            self.on_closing()
+        elif PREWARM_ENABLED:
+            # Load CrewAI, LiteLLM and model clients now, so the first command doesn't pay for them.
+            startup.start_prewarm()
+            # Load the intent model into Ollama now and keep it resident while the agent is idle.
+            self.bridge.submit(self.keep_models_warm())
 
-    async def tk_loop(self):
-        while self.running:
-            try:
-                self.app.update()
-                await asyncio.sleep(0.01)
-            except tk.TclError: # Handle window being closed
-                self.running = False
+    async def keep_models_warm(self):
+        get_router().start_keep_warm(INTENT_MODEL, MODEL_KEEP_WARM_INTERVAL_S)
 
     def on_closing(self):
-        self.running = False
+        try:
+            self.app.destroy()
+        except tk.TclError: # Window already gone
+            pass
 
 if __name__ == "__main__":
+    # `python main.py --startup-report` shows the window, reports startup cost and exits
+    # with status 1 if time-to-window is over STARTUP_BUDGET_S (usable as a CI check).
+    startup_report = "--startup-report" in sys.argv
     print("🚀 Initializing DeskAgent...")
     print("   Please ensure Ollama and Everything services are running.")
 
-    event_loop = asyncio.get_event_loop()
+    event_loop = asyncio.new_event_loop()
     app_window = AppWindow(loop=event_loop)
-    
-    async_loop = AsyncTkinterLoop(app_window)
+
+    async_loop = AsyncTkinterLoop(app_window, startup_report=startup_report)
     async_loop.run()
-    
-    print("DeskAgent has shut down.")
\ No newline at end of file
+    if startup_report:
+        sys.exit(0 if async_loop.startup_ok else 1)
+
+    print(f"⚡ Fast path stats: {fast_path.stats.summary()}")
+    if intent_cache._cache:
+        print(f"🗃️ Intent cache stats: {intent_cache._cache.summary()}")
+    print("DeskAgent has shut down.")
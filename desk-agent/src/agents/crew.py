@@ -0,0 +1,129 @@
+# src/agents/crew.py
+
+import os
+import threading
+import time
+
+from src.agents.crew_cache import get_crew_cache, task_key
+
+# Built crews waiting for their next run, per model. Building one parses the YAML
+# configs and creates every agent and LLM client, so it's only done once per model
+# (or once per concurrent run).
+_idle_crews = {}
+_idle_lock = threading.Lock()
+
+
+def _acquire_crew(model_name: str):
+    with _idle_lock:
+        idle = _idle_crews.get(model_name)
+        if idle:
+            return idle.pop()
+    from src.agents.crew_setup import DeveloperCrew
+    developer_crew = DeveloperCrew()
+    developer_crew.model_name = model_name
+    return developer_crew
+
+
+def _release_crew(developer_crew):
+    with _idle_lock:
+        _idle_crews.setdefault(developer_crew.model_name, []).append(developer_crew)
+
+
+class CrewRun:
+    """The result of one developer-crew run, with what each task cost or saved."""
+
+    def __init__(self):
+        self.output = ""
+        self.ran = []           # (task name, seconds, tokens)
+        self.reused = []        # (task name, seconds saved, tokens saved)
+
+    @property
+    def saved_s(self) -> float:
+        return sum(seconds for _, seconds, _ in self.reused)
+
+    @property
+    def tokens_saved(self) -> int:
+        return sum(tokens for _, _, tokens in self.reused)
+
+    def summary(self) -> str:
+        parts = [f"ran {name} ({seconds:.1f}s, {tokens:,} tokens)" for name, seconds, tokens in self.ran]
+        parts += [f"reused {name}" for name, _, _ in self.reused]
+        line = "♻️ " + ", ".join(parts)
+        if self.reused:
+            line += f" - saved ~{self.saved_s:.1f}s and {self.tokens_saved:,} tokens"
+        return line
+
+
+def _total_tokens(crew_output) -> int:
+    usage = getattr(crew_output, "token_usage", None)
+    return int(getattr(usage, "total_tokens", 0) or 0)
+
+
+def _tokens_used(crew) -> int | None:
+    """Tokens the crew's agents have used so far. Pooled crews keep counting across kickoffs."""
+    calculate = getattr(crew, "calculate_usage_metrics", None)
+    if calculate is None:
+        return None
+    return int(getattr(calculate(), "total_tokens", 0) or 0)
+
+
+def run_developer_crew(inputs: dict, model_name: str, progress=None, step_callback=None) -> CrewRun:
+    """
+    Runs the developer crew one task at a time, reusing cached task outputs.
+
+    Each task's output is looked up by its content address (task_key): its
+    config, its agent's config, the model, the inputs and the outputs of the
+    tasks before it, and the working directory. A hit is handed to the next
+    task as context without calling the model; a miss runs just that task. So
+    a repeated request costs nothing, and while the plan is unchanged
+    coding_task only runs again if its own definition, its agent or the model
+    changed, or a file it created has since been deleted.
+
+    Args:
+        inputs: The crew inputs, e.g. {"topic": ...}.
+        model_name: The model the agents use.
+        progress: Optional; called with a message as each task finishes.
+        step_callback: Optional; passed to CrewAI for every agent step (it may raise to cancel).
+
+    Returns:
+        A CrewRun; its output is the last task's output.
+    """
+    from crewai.tasks.task_output import TaskOutput
+    from src.agents.tools.file_system_tools import recording_writes
+
+    cache = get_crew_cache()
+    working_dir = os.getcwd()
+    developer_crew = _acquire_crew(model_name)
+    run = CrewRun()
+    outputs = []
+    for task_name, agent_name in developer_crew.stages:
+        task = getattr(developer_crew, task_name)()
+        key = task_key(task_name, developer_crew.tasks_config[task_name], developer_crew.agents_config[agent_name],
+                       model_name, inputs, outputs, working_dir)
+        entry = cache.get(key)
+        if entry is not None:
+            task.output = TaskOutput(description=task.description, raw=entry["output"], agent=task.agent.role)
+            run.reused.append((task_name, entry["wall_s"], entry["tokens"]))
+            print(f"🗃️ Crew cache hit for {task_name} (saved ~{entry['wall_s']:.1f}s, {entry['tokens']:,} tokens)")
+        else:
+            stage = developer_crew.stage_crew(task_name)
+            stage.step_callback = step_callback
+            tokens_before = _tokens_used(stage)
+            start = time.perf_counter()
+            with recording_writes() as written:
+                result = stage.kickoff(inputs=inputs)
+            wall_s = time.perf_counter() - start
+            tokens_after = _tokens_used(stage)
+            # This kickoff's share; the crew's own totals include every earlier run of it.
+            tokens = _total_tokens(result) if tokens_after is None else tokens_after - tokens_before
+            cache.put(key, task_name, task.output.raw, wall_s, tokens, files=written)
+            run.ran.append((task_name, wall_s, tokens))
+        outputs.append(task.output.raw)
+        if progress:
+            progress(f"📋 Finished task: {task_name}{' (cached)' if entry is not None else ''}")
+
+    # Only crews that finished go back to the pool; one that failed or was cancelled
+    # half-way may hold partial state.
+    _release_crew(developer_crew)
+    run.output = outputs[-1] if outputs else ""
+    return run
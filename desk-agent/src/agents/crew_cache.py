@@ -0,0 +1,132 @@
+# src/agents/crew_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from config import CREW_CACHE_DIR, CREW_CACHE_MAX_ENTRIES, CREW_CACHE_TTL_S
+
+# Bump when the key recipe changes, so old entries stop matching.
+KEY_VERSION = 2
+
+
+def task_key(task_name: str, task_config: dict, agent_config: dict, model_name: str, inputs: dict,
+             context_outputs: list[str], working_dir: str) -> str:
+    """
+    The content address of one task run.
+
+    Two runs share a key only if they would send the model the same thing: the
+    same task and agent definitions, the same model, the same inputs, and the
+    same outputs from the tasks they build on. The working directory is part of
+    it too, because tools write files relative to it.
+
+    Returns:
+        A SHA-256 hex digest.
+    """
+    material = {
+        "version": KEY_VERSION,
+        "task": task_name,
+        "task_config": task_config,
+        "agent_config": agent_config,
+        "model": model_name,
+        "inputs": inputs,
+        "context": [hashlib.sha256(output.encode("utf-8")).hexdigest() for output in context_outputs],
+        "working_dir": os.path.normcase(os.path.abspath(working_dir)),
+    }
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class CrewTaskCache:
+    """
+    Task outputs stored on disk, one JSON file per key.
+
+    Each entry keeps what producing it cost (wall time and tokens), so a hit
+    can report what it saved, and the files the task's tools wrote. Entries
+    expire after ttl_s; beyond max_entries the least recently used ones are deleted.
+    """
+
+    def __init__(self, directory: str, max_entries: int, ttl_s: float):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns the entry for a key, or None if it is missing or expired.
+
+        An entry whose task wrote files only counts while all of them still exist:
+        reusing its output would otherwise report work that is no longer on disk.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Warning: Ignoring unreadable crew cache entry ({e}).")
+            return None
+        if entry.get("created", 0) < time.time() - self.ttl_s:
+            self._delete(path)
+            return None
+        missing = [file for file in entry.get("files", []) if not os.path.exists(file)]
+        if missing:
+            print(f"🗃️ Not reusing cached {entry.get('task')}: {len(missing)} file(s) it created are gone.")
+            return None
+        # Each file's modification time is its last use, which is the order eviction goes by.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, task_name: str, output: str, wall_s: float, tokens: int, files: list[str] = ()):
+        """Stores a task's output along with what it cost to produce and the files (absolute paths) it wrote."""
+        entry = {
+            "task": task_name,
+            "output": output,
+            "wall_s": wall_s,
+            "tokens": tokens,
+            "files": sorted(set(files)),
+            "created": time.time(),
+        }
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+            self._evict()
+
+    def _evict(self):
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            self._delete(entry.path)
+
+    @staticmethod
+    def _delete(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = None
+
+
+def get_crew_cache() -> CrewTaskCache:
+    """Returns the process-wide crew task cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = CrewTaskCache(CREW_CACHE_DIR, max_entries=CREW_CACHE_MAX_ENTRIES, ttl_s=CREW_CACHE_TTL_S)
+    return _cache
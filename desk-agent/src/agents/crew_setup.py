@@ -1,29 +1,32 @@
 # src/agents/crew_setup.py
 
-from crewai import Agent, Crew, Process, Task
+import os
+
+from crewai import LLM, Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-# NEW: Import the ChatGoogleGenerativeAI class
-from langchain_google_genai import ChatGoogleGenerativeAI
 
+from config import MODEL_REGISTRY, MODEL_ROUTES
 from src.agents.tools.file_system_tools import create_file
 
-# Instantiate the Gemini model.
-# By default, it will look for the GOOGLE_API_KEY in your environment variables.
-# We'll use the powerful Gemini 1.5 Pro model.
-gemini_llm = ChatGoogleGenerativeAI(model="gemini-1.5-pro-latest")
-
 @CrewBase
 class DeveloperCrew:
     """A crew of agents designed to handle software development tasks."""
     agents_config = 'src/agents/config/agents.yaml'
     tasks_config = 'src/agents/config/tasks.yaml'
+    # The model the router picked for this run (see ModelRouter.select).
+    model_name = MODEL_ROUTES["crew"][0]
+    # The tasks in the order they run, with the agent each one uses.
+    stages = [("planning_task", "project_planner"), ("coding_task", "code_generator")]
+
+    def llm(self) -> LLM:
+        api_key_env = MODEL_REGISTRY.get(self.model_name, {}).get("api_key_env")
+        return LLM(model=self.model_name, api_key=os.getenv(api_key_env) if api_key_env else None)
 
     @agent
     def project_planner(self) -> Agent:
         return Agent(
             config=self.agents_config['project_planner'],
-            # Use the new Gemini LLM instance
-            llm=gemini_llm,
+            llm=self.llm(),
             verbose=True
         )
 
@@ -33,8 +36,7 @@ class DeveloperCrew:
         return Agent(
             config=self.agents_config['code_generator'],
             tools=[create_file_tool],
-            # Use the new Gemini LLM instance here as well
-            llm=gemini_llm,
+            llm=self.llm(),
             verbose=True
         )
 
@@ -61,4 +63,17 @@ class DeveloperCrew:
             tasks=self.tasks,
             process=Process.sequential,
             verbose=2,
-        )
\ No newline at end of file
+        )
+
+    def stage_crew(self, task_name: str) -> Crew:
+        """A crew that runs just one task, built on first use and reused across kickoffs."""
+        stage_crews = self.__dict__.setdefault("_stage_crews", {})
+        if task_name not in stage_crews:
+            stage_task = getattr(self, task_name)()
+            stage_crews[task_name] = Crew(
+                agents=[stage_task.agent],
+                tasks=[stage_task],
+                process=Process.sequential,
+                verbose=2,
+            )
+        return stage_crews[task_name]
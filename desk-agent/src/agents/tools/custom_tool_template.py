@@ -2,6 +2,17 @@
 
 from crewai_tools import BaseTool
 
+# To let the intent model call a tool directly, put it in a file under
+# src/agents/tools/ or plugins/ and decorate it; it shows up in the prompt on the
+# next start, and its module is only imported the first time it's used:
+#
+#     from src.processing.tool_registry import tool
+#
+#     @tool("word_count", example="Count the words in notes.txt", call={"target": "notes.txt"})
+#     def word_count(target: str) -> str:
+#         """Counts the words in a text file."""
+#         ...
+
 class MyCustomTool(BaseTool):
     name: str = "A Useful Tool Name"
     description: str = "A clear description of what this tool does and when an agent should use it."
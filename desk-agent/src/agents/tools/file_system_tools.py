@@ -1,10 +1,35 @@
 # src/agents/tools/file_system_tools.py
 
+import contextvars
 import os
 import shutil
 import subprocess
-from src.search.everything_search import search_everything
+from contextlib import closing, contextmanager
+from src.processing.tool_registry import tool
+from src.search.everything_search import iter_search_results
 
+# How many same-named files an ambiguous delete lists.
+MAX_DELETE_CANDIDATES = 5
+
+# Files written by tools inside a recording_writes() block (e.g. while a crew task runs).
+_written_paths = contextvars.ContextVar("written_paths", default=None)
+
+@contextmanager
+def recording_writes():
+    """Collects the absolute paths of the files tools create inside the block; yields the list."""
+    written = []
+    token = _written_paths.set(written)
+    try:
+        yield written
+    finally:
+        _written_paths.reset(token)
+
+def _record_write(path: str):
+    written = _written_paths.get()
+    if written is not None:
+        written.append(os.path.abspath(path))
+
+@tool("create_file", example="Make a file called notes.txt", call={"target": "notes.txt"})
 def create_file(target: str) -> str:
     """Creates an empty file."""
     try:
@@ -13,27 +38,65 @@ def create_file(target: str) -> str:
             os.makedirs(parent_dir, exist_ok=True)
         with open(target, 'w') as f:
             pass
+        _record_write(target)
         return f"✅ Successfully created file: {target}"
     except IOError as e:
         return f"❌ Error creating file: {e}"
 
+@tool("create_folder", example="Make a folder called src", call={"target": "src"})
+def create_folder(target: str) -> str:
+    """Creates a folder, including any missing parent folders."""
+    try:
+        os.makedirs(target, exist_ok=True)
+        return f"✅ Successfully created folder: {target}"
+    except OSError as e:
+        return f"❌ Error creating folder: {e}"
+
+def find_file_to_delete(target: str) -> str:
+    """
+    Resolves which file delete_file would remove.
+
+    That is the target itself if it exists; otherwise the single indexed file whose
+    name is exactly the target's name. Search matches on substrings, so a looser hit
+    (meeting_notes.txt for "notes.txt") is never picked.
+
+    Raises:
+        FileNotFoundError: No file has that name.
+        ValueError: Several files have that name, so it's unclear which one is meant.
+    """
+    if os.path.exists(target):
+        return os.path.abspath(target)
+    name = os.path.basename(target.rstrip("/\\"))
+    print(f"File '{target}' not found directly, searching with Everything...")
+    matches = []
+    with closing(iter_search_results(name)) as results:
+        for result in results:
+            if os.path.basename(result.path).lower() == name.lower():
+                matches.append(result.path)
+                if len(matches) > MAX_DELETE_CANDIDATES:
+                    break
+    if not matches:
+        raise FileNotFoundError(f"File '{target}' not found.")
+    if len(matches) > 1:
+        listed = "\n".join(f"  {path}" for path in matches[:MAX_DELETE_CANDIDATES])
+        more = " (and more)" if len(matches) > MAX_DELETE_CANDIDATES else ""
+        raise ValueError(f"Several files are named '{name}'{more}; give the full path of the one to delete:\n{listed}")
+    return matches[0]
+
+@tool("delete_file", example="Delete resume.pdf", call={"target": "resume.pdf"}, requires_confirmation=True)
 def delete_file(target: str) -> str:
-    """Deletes the specified file, using Everything to find it if needed."""
+    """Deletes the specified file, using Everything to find it by exact name if needed."""
     try:
-        if not os.path.exists(target):
-            print(f"File '{target}' not found directly, searching with Everything...")
-            results = search_everything(target, limit=1)
-            if not results:
-                return f"❌ Error: File '{target}' not found."
-            file_to_delete = results[0]
-        else:
-            file_to_delete = target
+        file_to_delete = find_file_to_delete(target)
         os.remove(file_to_delete)
         return f"✅ Successfully deleted file: {file_to_delete}"
+    except (FileNotFoundError, ValueError) as e:
+        return f"❌ Error: {e}"
     except Exception as e:
         return f"❌ An unexpected error occurred while deleting: {e}"
 
 # --- NEW FUNCTION ---
+@tool("open_application", example="Open Chrome", call={"target": "chrome"})
 def open_application(target: str) -> str:
     """Opens an application by name or opens a URL in the default web browser."""
     target_lower = target.lower()
@@ -0,0 +1,284 @@
+# src/agents/tools/git_tools.py
+
+import functools
+import os
+import subprocess
+import threading
+
+from src.processing.tool_registry import tool
+
+
+class GitError(Exception):
+    """A git command failed; the message is git's own error output."""
+
+
+def find_repository(path: str) -> str | None:
+    """Returns the top-level directory of the repository containing path, without running git."""
+    path = os.path.abspath(path)
+    if not os.path.isdir(path):
+        path = os.path.dirname(path)
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+class GitSession:
+    """
+    One repository, kept for the life of the process.
+
+    The session remembers where the repository and its git directory are, so
+    they aren't rediscovered on every command, and serializes the commands run
+    against it. Staging is batched: add() only records paths, and they are all
+    staged by a single `git add --pathspec-from-file` the next time something
+    needs the index (a commit, a status, or flush()). HEAD is read straight
+    from the git directory rather than by starting another process.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.git_dir = self._resolve_git_dir()
+        self.lock = threading.RLock()
+        self.pending = []           # paths (relative to root) waiting to be staged
+        self.processes = 0          # git processes started by this session
+
+    def _resolve_git_dir(self) -> str:
+        dot_git = os.path.join(self.root, ".git")
+        if os.path.isfile(dot_git):
+            # A worktree or submodule: .git is a file pointing at the real directory.
+            with open(dot_git, encoding="utf-8") as f:
+                pointer = f.read().strip().removeprefix("gitdir:").strip()
+            return os.path.normpath(os.path.join(self.root, pointer))
+        return dot_git
+
+    def run(self, *args: str, stdin: str | None = None) -> str:
+        """Runs one git command in the repository and returns its output."""
+        self.processes += 1
+        result = subprocess.run(["git", *args], cwd=self.root, input=stdin, capture_output=True,
+                                text=True, encoding="utf-8")
+        if result.returncode != 0:
+            raise GitError((result.stderr or result.stdout).strip() or f"git {args[0]} failed")
+        return result.stdout
+
+    # --- Direct reads ---
+
+    def head(self) -> str | None:
+        """The commit HEAD points to, read from the git directory (None before the first commit)."""
+        try:
+            with open(os.path.join(self.git_dir, "HEAD"), encoding="utf-8") as f:
+                head = f.read().strip()
+        except OSError:
+            return None
+        if not head.startswith("ref:"):
+            return head  # detached
+        ref = head[4:].strip()
+        try:
+            with open(os.path.join(self.git_dir, *ref.split("/")), encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            pass
+        try:
+            with open(os.path.join(self.git_dir, "packed-refs"), encoding="utf-8") as f:
+                for line in f:
+                    if line.rstrip().endswith(" " + ref):
+                        return line.split(" ", 1)[0]
+        except OSError:
+            pass
+        return None
+
+    # --- Staging ---
+
+    def relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root)
+
+    def add(self, paths: list[str]):
+        """Queues paths (files or folders; deletions too) to be staged by the next flush()."""
+        with self.lock:
+            self.pending.extend(self.relative(path) for path in paths)
+
+    def flush(self) -> int:
+        """Stages every queued path with one git process. Returns how many paths were staged."""
+        with self.lock:
+            if not self.pending:
+                return 0
+            paths, self.pending = self.pending, []
+            self.run("add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul", stdin="\0".join(paths))
+            return len(paths)
+
+    # --- Commands ---
+
+    def commit(self, message: str, all_changes: bool = False) -> str | None:
+        """
+        Commits the index (after staging what's queued). Returns the new commit, or None if there was nothing to commit.
+
+        With all_changes, everything in the working tree is staged first, new
+        files included (`git commit -a` would skip those).
+        """
+        with self.lock:
+            self.flush()
+            if all_changes:
+                self.run("add", "-A")
+            try:
+                self.run("commit", "-q", "-m", message)
+            except GitError as e:
+                if any(text in str(e) for text in ("nothing to commit", "nothing added to commit", "no changes added")):
+                    return None
+                raise
+            return self.head()
+
+    def status(self) -> dict:
+        """Counts of staged, modified (unstaged) and untracked paths."""
+        with self.lock:
+            self.flush()
+            output = self.run("status", "--porcelain=v1", "-z", "--untracked-files=normal")
+        counts = {"staged": 0, "modified": 0, "untracked": 0}
+        entries = iter(output.split("\0"))
+        for entry in entries:
+            if len(entry) < 3:
+                continue
+            index, worktree = entry[0], entry[1]
+            if index == "?":
+                counts["untracked"] += 1
+                continue
+            if index in "RC":
+                next(entries, None)  # renames and copies are followed by the original path
+            if index != " ":
+                counts["staged"] += 1
+            if worktree != " ":
+                counts["modified"] += 1
+        return counts
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(target: str = ".") -> GitSession:
+    """Returns the session for the repository containing target, creating it on first use."""
+    root = find_repository(target)
+    if root is None:
+        raise GitError(f"'{os.path.abspath(target)}' is not inside a Git repository")
+    key = os.path.normcase(root)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = GitSession(root)
+        return session
+
+
+def _describe_status(counts: dict) -> str:
+    if not any(counts.values()):
+        return "working tree clean"
+    return f"{counts['staged']} staged, {counts['modified']} modified, {counts['untracked']} untracked"
+
+
+def _git_errors(function):
+    """Turns git failures into the "❌ Error" messages the sequence executor stops on."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        except GitError as e:
+            return f"❌ Error: git: {e}"
+        except FileNotFoundError:
+            return "❌ Error: Git is not installed (or not on PATH)."
+    return wrapper
+
+
+@tool("git_init", example="Start a new Git repo here", call={"target": "."}, action_type="git")
+@_git_errors
+def git_init(target: str = ".") -> str:
+    """Creates a Git repository (or reinitializes an existing one)."""
+    os.makedirs(target, exist_ok=True)
+    result = subprocess.run(["git", "init", "-q", target], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip())
+    return f"✅ Initialized a Git repository in {os.path.abspath(target)}"
+
+
+@tool("git_add", example="Stage main.py", call={"target": "main.py"}, action_type="git")
+@_git_errors
+def git_add(target: str = ".", paths: list | None = None) -> str:
+    """Stages files or folders (all changes under them, including deletions)."""
+    paths = paths or [target]
+    session = get_session(paths[0])
+    session.add(paths)
+    staged = session.flush()
+    return f"✅ Staged {staged} path(s) in {session.root}"
+
+
+@tool("git_commit", example="Commit everything with message 'Initial commit'",
+      call={"target": ".", "params": {"message": "Initial commit", "all_changes": True}}, action_type="git")
+@_git_errors
+def git_commit(message: str, target: str = ".", all_changes: bool = False) -> str:
+    """Commits the staged changes (every change in the working tree, new files too, with all_changes)."""
+    session = get_session(target)
+    commit = session.commit(message, all_changes)
+    if commit is None:
+        return f"ℹ️ Nothing to commit in {session.root} ({_describe_status(session.status())})."
+    return f"✅ Committed {commit[:7]}: {message}"
+
+
+@tool("git_status", example="What has changed in this repo?", call={"target": "."}, action_type="git")
+@_git_errors
+def git_status(target: str = ".") -> str:
+    """Summarizes what is staged, modified and untracked."""
+    session = get_session(target)
+    return f"📋 {session.root}: {_describe_status(session.status())}"
+
+
+@_git_errors
+def _queue_add(step: dict, target: str, queued: list) -> str:
+    paths = (step.get("params") or {}).get("paths") or [target]
+    session = get_session(paths[0])
+    session.add(paths)
+    if session not in queued:
+        queued.append(session)
+    return f"✅ Queued {len(paths)} path(s) to stage in {session.root}"
+
+
+@_git_errors
+def _flush_all(sessions: list) -> str:
+    staged = sum(session.flush() for session in sessions)
+    return f"✅ Staged {staged} path(s)" if staged else ""
+
+
+@tool("git_batch", action_type="git", hidden=True)
+def git_batch(steps: list) -> str:
+    """
+    Runs consecutive git steps of a sequence as one operation.
+
+    git_add steps only queue their paths; the queue is staged with a single
+    git process right before the next step that reads the index (commit or
+    status) and at the end. So "add 500 files, commit, show status" starts
+    three git processes instead of 502.
+    """
+    results = []
+    queued = []     # sessions with paths waiting to be staged
+    for step in steps:
+        intent = step.get("intent")
+        params = step.get("params") or {}
+        target = step.get("target") or params.get("target") or "."
+        if intent == "git_init":
+            results.append(git_init(target))
+        elif intent == "git_add":
+            results.append(_queue_add(step, target, queued))
+        elif intent == "git_commit":
+            if params.get("message"):
+                results.append(git_commit(params["message"], target, bool(params.get("all_changes"))))
+            else:
+                results.append("❌ Error: git_commit needs a commit message.")
+        elif intent == "git_status":
+            results.append(git_status(target))
+        else:
+            results.append(f"❌ Error: '{intent}' can't run in a git batch.")
+        if results[-1].startswith("❌"):
+            break
+    # Paths queued after the last commit/status (or before an error) are still staged.
+    flushed = _flush_all(queued)
+    if flushed:
+        results.append(flushed)
+    return "\n".join(results)
@@ -0,0 +1,49 @@
+# src/audio/voice_input.py
+
+from src.audio.voice_recorder import VoiceRecorder
+from src.audio.voice_transcriber import VoiceTranscriber
+
+
+class VoiceInput:
+    """
+    Microphone to text: VoiceRecorder cuts speech into segments, VoiceTranscriber turns them into utterances.
+
+    The Whisper worker is started with the first start() and kept running when
+    listening stops, so turning the microphone back on is instant. If the worker
+    fails, listening stops and on_error gets the message.
+    """
+
+    def __init__(self, on_utterance, on_partial=None, on_error=None):
+        self.transcriber = VoiceTranscriber(on_utterance, on_partial, self._on_transcriber_error)
+        self.on_error = on_error
+        self.recorder = None
+
+    @property
+    def listening(self) -> bool:
+        return self.recorder is not None
+
+    def start(self):
+        self.transcriber.start()
+        if not self.transcriber.alive:
+            # It failed or was killed since the last start(); reset it so the next start() spawns a new one.
+            error = self.transcriber.error or "the Whisper worker exited"
+            self.transcriber.stop()
+            raise RuntimeError(error)
+        recorder = VoiceRecorder(self.transcriber.submit)
+        recorder.start()
+        self.recorder = recorder
+
+    def stop(self):
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+
+    def _on_transcriber_error(self, message: str):
+        # On the transcriber's result thread; nothing will transcribe what the recorder hears now.
+        self.stop()
+        if self.on_error:
+            self.on_error(message)
+
+    def close(self):
+        self.stop()
+        self.transcriber.stop()
@@ -0,0 +1,270 @@
+# src/audio/voice_recorder.py
+
+import itertools
+import queue
+import threading
+import time
+
+import numpy as np
+
+from config import (
+    VOICE_SAMPLE_RATE,
+    VOICE_FRAME_MS,
+    VOICE_RING_BUFFER_S,
+    VOICE_VAD_RATIO,
+    VOICE_VAD_MIN_RMS,
+    VOICE_MIN_SPEECH_MS,
+    VOICE_PRE_ROLL_MS,
+    VOICE_CHUNK_PAUSE_MS,
+    VOICE_END_SILENCE_MS,
+    VOICE_MAX_CHUNK_S,
+    VOICE_MAX_UTTERANCE_S,
+)
+
+
+# Utterance IDs are unique for the whole process, so they never collide when the
+# microphone is turned off and on while earlier utterances are still being transcribed.
+_utterance_ids = itertools.count(1)
+
+
+class RingBuffer:
+    """
+    The last `capacity` samples of a stream, addressed by absolute sample index.
+
+    Writing never allocates; reading copies the requested range out.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=np.float32)
+        self.total = 0      # samples written since the start
+
+    def write(self, samples: np.ndarray):
+        samples = samples[-self.capacity:]
+        start = self.total % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        self.total += len(samples)
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Returns samples [start, end); anything older than the buffer holds is dropped."""
+        start = max(start, self.total - self.capacity, 0)
+        end = min(end, self.total)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        indices = np.arange(start, end) % self.capacity
+        return self.data[indices]
+
+
+class EnergyVAD:
+    """Marks frames as speech when their RMS energy stands out from an adaptive noise floor."""
+
+    def __init__(self, ratio: float = VOICE_VAD_RATIO, min_rms: float = VOICE_VAD_MIN_RMS):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.noise_floor = None
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.dot(frame, frame) / len(frame)))
+        if self.noise_floor is None:
+            self.noise_floor = rms
+        speech = rms >= max(self.min_rms, self.noise_floor * self.ratio)
+        if not speech:
+            # Follow the background level slowly, so a fan or hum doesn't count as speech.
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+
+
+class SpeechSegment:
+    """A piece of one utterance, ready to transcribe."""
+
+    def __init__(self, utterance_id: int, index: int, audio: np.ndarray | None, is_final: bool,
+                 speech_end_time: float | None):
+        self.utterance_id = utterance_id
+        self.index = index                  # position within the utterance
+        self.audio = audio                  # None for a final segment with no speech left in it
+        self.is_final = is_final
+        self.speech_end_time = speech_end_time  # perf_counter() when the last speech frame was captured
+
+    @property
+    def duration_s(self) -> float:
+        return 0.0 if self.audio is None else len(self.audio) / VOICE_SAMPLE_RATE
+
+
+class SpeechSegmenter:
+    """
+    Turns a stream of audio into utterances, and utterances into segments to transcribe.
+
+    Audio goes into a ring buffer and is judged frame by frame by the VAD. While
+    the user is talking, each short pause (VOICE_CHUNK_PAUSE_MS) sends the speech
+    since the previous one off as a segment, so it is transcribed while the user
+    keeps talking; a long pause (VOICE_END_SILENCE_MS) ends the utterance with a
+    final segment. Usually that final segment is empty by then, and the whole
+    utterance has been transcribed by the time the silence confirms it ended.
+
+    Args:
+        on_segment: Called with each SpeechSegment, on the thread that calls feed().
+    """
+
+    def __init__(self, on_segment, sample_rate: int = VOICE_SAMPLE_RATE, vad: EnergyVAD | None = None):
+        self.on_segment = on_segment
+        self.sample_rate = sample_rate
+        self.vad = vad or EnergyVAD()
+        self.ring = RingBuffer(int(VOICE_RING_BUFFER_S * sample_rate))
+        self.frame = int(sample_rate * VOICE_FRAME_MS / 1000)
+        self._ms = lambda ms: int(sample_rate * ms / 1000)
+        self._leftover = np.zeros(0, dtype=np.float32)
+        self.utterance_id = None
+        self._reset()
+
+    def _reset(self):
+        self.in_speech = False
+        self.speech_run = 0         # samples of consecutive speech before an utterance starts
+        self.silence = 0            # samples of silence since the last speech frame
+        self.utterance_start = None
+        self.chunk_start = None
+        self.last_speech_end = None
+        self.last_speech_time = None
+        self.segment_index = 0
+
+    def feed(self, samples: np.ndarray, timestamp: float | None = None):
+        """
+        Adds captured audio (mono float32) and emits any segments it completes.
+
+        Args:
+            samples: The new audio.
+            timestamp: perf_counter() when the last of these samples was captured (default: now).
+        """
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        samples = np.concatenate([self._leftover, samples.astype(np.float32, copy=False)])
+        frames = len(samples) // self.frame
+        self._leftover = samples[frames * self.frame:]
+        for i in range(frames):
+            frame = samples[i * self.frame:(i + 1) * self.frame]
+            self.ring.write(frame)
+            # When this frame was captured, counting back from the end of the block.
+            frame_time = timestamp - (len(samples) - (i + 1) * self.frame) / self.sample_rate
+            self._process(frame, frame_time)
+
+    def _process(self, frame: np.ndarray, frame_time: float):
+        end = self.ring.total
+        speech = self.vad.is_speech(frame)
+        if not self.in_speech:
+            self.speech_run = self.speech_run + self.frame if speech else 0
+            if self.speech_run >= self._ms(VOICE_MIN_SPEECH_MS):
+                self.in_speech = True
+                self.utterance_id = next(_utterance_ids)
+                self.utterance_start = max(end - self.speech_run - self._ms(VOICE_PRE_ROLL_MS), 0)
+                self.chunk_start = self.utterance_start
+                self.last_speech_end, self.last_speech_time = end, frame_time
+            return
+
+        if speech:
+            self.silence = 0
+            self.last_speech_end, self.last_speech_time = end, frame_time
+        else:
+            self.silence += self.frame
+
+        if self.silence >= self._ms(VOICE_END_SILENCE_MS) or end - self.utterance_start >= VOICE_MAX_UTTERANCE_S * self.sample_rate:
+            self._emit(self.last_speech_end + self._ms(VOICE_CHUNK_PAUSE_MS) // 2, is_final=True)
+            self._reset()
+        elif self.silence >= self._ms(VOICE_CHUNK_PAUSE_MS) and self.last_speech_end > self.chunk_start:
+            self._emit(end, is_final=False)
+        elif speech and end - self.chunk_start >= VOICE_MAX_CHUNK_S * self.sample_rate:
+            self._emit(end, is_final=False)
+
+    def _emit(self, chunk_end: int, is_final: bool):
+        chunk_end = min(chunk_end, self.ring.total)
+        # Only silence since the previous segment: nothing left to transcribe.
+        audio = self.ring.read(self.chunk_start, chunk_end) if self.last_speech_end > self.chunk_start else None
+        self.on_segment(SpeechSegment(self.utterance_id, self.segment_index, audio, is_final,
+                                      self.last_speech_time))
+        self.segment_index += 1
+        self.chunk_start = chunk_end
+
+
+def read_wav(path: str, sample_rate: int = VOICE_SAMPLE_RATE) -> np.ndarray:
+    """Loads a WAV file as mono float32 at sample_rate, for testing without a microphone."""
+    from math import gcd
+    from scipy.io import wavfile
+    from scipy.signal import resample_poly
+
+    rate, data = wavfile.read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data / float(np.iinfo(data.dtype).max)
+    data = data.astype(np.float32)
+    if rate != sample_rate:
+        factor = gcd(rate, sample_rate)
+        data = resample_poly(data, sample_rate // factor, rate // factor).astype(np.float32)
+    return data
+
+
+def replay(audio: np.ndarray, segmenter: SpeechSegmenter, realtime: bool = True, block_ms: int = VOICE_FRAME_MS):
+    """
+    Feeds recorded audio through a segmenter as if it were being captured.
+
+    With realtime=True it is fed at the speed it was recorded, so the timings
+    (e.g. end of speech to intent) are what a live microphone would give.
+    """
+    block = int(segmenter.sample_rate * block_ms / 1000)
+    start = time.perf_counter()
+    for offset in range(0, len(audio), block):
+        chunk = audio[offset:offset + block]
+        captured_at = start + (offset + len(chunk)) / segmenter.sample_rate
+        if realtime:
+            time.sleep(max(captured_at - time.perf_counter(), 0))
+        segmenter.feed(chunk, captured_at if realtime else time.perf_counter())
+
+
+class VoiceRecorder:
+    """
+    Captures the microphone with sounddevice and feeds it to a SpeechSegmenter.
+
+    The audio callback only copies each block into a queue; VAD and segmenting
+    run on a separate thread, so the audio thread never waits.
+    """
+
+    def __init__(self, on_segment, device=None):
+        self.segmenter = SpeechSegmenter(on_segment)
+        self.device = device
+        self._blocks = queue.Queue()
+        self._stream = None
+        self._thread = None
+
+    def start(self):
+        import sounddevice as sd
+
+        self._stream = sd.InputStream(samplerate=VOICE_SAMPLE_RATE, channels=1, dtype="float32",
+                                      blocksize=self.segmenter.frame, device=self.device,
+                                      callback=self._on_audio)
+        self._thread = threading.Thread(target=self._run, name="voice-segmenter", daemon=True)
+        self._thread.start()
+        self._stream.start()
+        print("🎤 Listening...")
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self._blocks.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        print("🎤 Stopped listening.")
+
+    def _on_audio(self, indata, frames, time_info, status):
+        if status:
+            print(f"⚠️ Warning: Audio input: {status}")
+        self._blocks.put((indata[:, 0].copy(), time.perf_counter()))
+
+    def _run(self):
+        while True:
+            item = self._blocks.get()
+            if item is None:
+                return
+            samples, captured_at = item
+            self.segmenter.feed(samples, captured_at)
@@ -0,0 +1,176 @@
+# src/audio/voice_transcriber.py
+
+import multiprocessing
+import queue
+import threading
+import time
+
+import numpy as np
+
+from config import WHISPER_MODEL, VOICE_SAMPLE_RATE
+from src.audio.voice_recorder import SpeechSegment
+
+# How often the result thread checks that a silent worker is still alive.
+WORKER_CHECK_S = 1.0
+
+
+def _transcription_worker(model_name: str, requests, results):
+    """Runs in the worker process: loads Whisper once, then transcribes segments in order."""
+    try:
+        from transformers import pipeline
+
+        asr = pipeline("automatic-speech-recognition", model=model_name, device=-1)
+        # The first inference is much slower than the rest; pay for it before the user speaks.
+        asr({"raw": np.zeros(VOICE_SAMPLE_RATE, dtype=np.float32), "sampling_rate": VOICE_SAMPLE_RATE})
+        results.put(("ready", None, None, None))
+        while True:
+            request = requests.get()
+            if request is None:
+                return
+            key, audio = request
+            start = time.perf_counter()
+            text = ""
+            if audio is not None:
+                text = asr({"raw": audio, "sampling_rate": VOICE_SAMPLE_RATE})["text"].strip()
+            results.put(("text", key, text, time.perf_counter() - start))
+    except Exception as e:
+        # Otherwise the process just dies and the UI keeps "listening" to nothing.
+        results.put(("error", None, f"{type(e).__name__}: {e}", None))
+
+
+class Utterance:
+    """The full transcript of one utterance, with where its latency went."""
+
+    def __init__(self, utterance_id: int, text: str, speech_end_time: float, inference_s: float):
+        self.id = utterance_id
+        self.text = text
+        self.speech_end_time = speech_end_time      # perf_counter() of the last speech frame
+        self.transcribed_time = time.perf_counter()
+        self.inference_s = inference_s              # Whisper time summed over the segments
+
+    @property
+    def transcription_latency_s(self) -> float:
+        """From the end of speech to the full transcript."""
+        return self.transcribed_time - self.speech_end_time
+
+
+class VoiceTranscriber:
+    """
+    Transcribes speech segments with Whisper (transformers, CPU) in a worker process.
+
+    The model runs in its own process so inference never holds the GIL the UI
+    and asyncio threads need. Segments are transcribed in the order they were
+    submitted; the text of an utterance's segments is stitched together, reported
+    through on_partial as it grows, and passed to on_utterance as soon as its
+    final segment is done.
+
+    Args:
+        on_utterance: Called with an Utterance, on the transcriber's result thread.
+        on_partial: Optional; called with (utterance_id, text so far) after each non-final segment.
+        on_error: Optional; called with the error message if the worker fails. It has exited by then.
+    """
+
+    def __init__(self, on_utterance, on_partial=None, on_error=None, model_name: str = WHISPER_MODEL):
+        self.on_utterance = on_utterance
+        self.on_partial = on_partial
+        self.on_error = on_error
+        self.model_name = model_name
+        self.ready = threading.Event()
+        self.error = None       # the worker's error message, once it has failed
+        self._segments = {}     # (utterance_id, index) -> SpeechSegment, until transcribed
+        self._texts = {}        # utterance_id -> [text, ...]
+        self._inference = {}    # utterance_id -> seconds of inference so far
+        self._process = None
+        self._thread = None
+        self._requests = None
+        self._results = None
+        self._stopping = False
+
+    def start(self):
+        """Starts the worker process; the model loads in the background (see `ready`)."""
+        if self._process is not None:
+            return
+        self.error = None
+        self._stopping = False
+        # "spawn" so the worker doesn't inherit Tk or the asyncio loop.
+        context = multiprocessing.get_context("spawn")
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(target=_transcription_worker, name="whisper",
+                                        args=(self.model_name, self._requests, self._results), daemon=True)
+        self._process.start()
+        self._thread = threading.Thread(target=self._collect, name="whisper-results", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._process is None:
+            return
+        self._stopping = True
+        if self._process.is_alive():
+            self._requests.put(None)
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+        # A worker that was killed may have died holding the results queue's lock;
+        # the result thread notices the exit by itself then.
+        if self._process.exitcode == 0:
+            self._results.put(("stop", None, None, None))
+        self._thread.join()
+        self._process = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is running (loading the model counts)."""
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def pending(self) -> int:
+        """Segments submitted but not transcribed yet."""
+        return len(self._segments)
+
+    def submit(self, segment: SpeechSegment):
+        """Queues a segment from the SpeechSegmenter. Safe to call from any thread."""
+        key = (segment.utterance_id, segment.index)
+        self._segments[key] = segment
+        self._requests.put((key, segment.audio))
+
+    def _collect(self):
+        while True:
+            try:
+                kind, key, text, inference_s = self._results.get(timeout=WORKER_CHECK_S)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                if self._stopping:
+                    return
+                # Killed, or crashed in native code: it couldn't report an error itself.
+                kind, key, text, inference_s = "error", None, f"the worker exited (code {self._process.exitcode})", None
+            if kind == "stop":
+                return
+            if kind == "ready":
+                print(f"🎤 Whisper ({self.model_name}) is ready.")
+                self.ready.set()
+                continue
+            if kind == "error":
+                print(f"❌ Whisper ({self.model_name}) failed: {text}")
+                self.error = text
+                self._segments.clear()
+                self._texts.clear()
+                self._inference.clear()
+                if self.on_error:
+                    self.on_error(text)
+                return
+            segment = self._segments.pop(key)
+            utterance_id = segment.utterance_id
+            if text:
+                self._texts.setdefault(utterance_id, []).append(text)
+            self._inference[utterance_id] = self._inference.get(utterance_id, 0.0) + inference_s
+            so_far = " ".join(self._texts.get(utterance_id, []))
+            if not segment.is_final:
+                if self.on_partial and so_far:
+                    self.on_partial(utterance_id, so_far)
+                continue
+            self._texts.pop(utterance_id, None)
+            inference_total = self._inference.pop(utterance_id)
+            if so_far:
+                self.on_utterance(Utterance(utterance_id, so_far, segment.speech_end_time, inference_total))
@@ -0,0 +1,173 @@
+# src/memory/conversation_history.py
+
+import glob
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (
+    HISTORY_LOG_PATH,
+    MEMORY_INDEX_DIR,
+    KNOWLEDGE_DIR,
+    MEMORY_TOP_K,
+    MEMORY_MIN_SCORE,
+    MEMORY_MAX_TURNS,
+    MEMORY_IVF_MIN_ENTRIES,
+    MEMORY_IVF_NPROBE,
+)
+from src.memory.logs import AppendOnlyLog
+from src.memory.vector_store import VectorStore
+
+KNOWLEDGE_PATTERNS = ["*.txt", "*.md"]
+# Compact once removed rows make up this share of the vectors file.
+COMPACT_DEAD_RATIO = 0.25
+
+
+def describe_turn(record: dict) -> str:
+    """The text that gets embedded (and shown to the model) for one turn."""
+    text = f"User said \"{record['user']}\" → {record.get('intent') or 'unknown'}"
+    if record.get("target"):
+        text += f" ({record['target']})"
+    return text
+
+
+def _knowledge_chunks(path: str) -> list[str]:
+    """Splits a knowledge file into one chunk per fact (non-empty, non-comment line)."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+class ConversationMemory:
+    """
+    Long-term memory for the assistant.
+
+    Every turn is appended to a history log (the source of truth). Turns and
+    the facts in knowledge/ are also embedded into a VectorStore, so the
+    intent prompt can include whatever the user said or noted before that
+    is relevant to the current request.
+    """
+
+    def __init__(self, history_path: str, index_dir: str, knowledge_dir: str, max_turns: int,
+                 ivf_min_entries: int = MEMORY_IVF_MIN_ENTRIES, nprobe: int = MEMORY_IVF_NPROBE):
+        self.history = AppendOnlyLog(history_path)
+        self.store = VectorStore(index_dir, ivf_min_entries, nprobe)
+        self.knowledge_dir = knowledge_dir
+        self.max_turns = max_turns
+        self.lock = threading.Lock()
+        self.history_count = sum(1 for _ in self.history.read())
+        # Indexed turns, oldest first; built once here and kept up to date, so a turn never scans the store.
+        self.turn_ids = deque(entry_id for entry_id, entry in self.store.entries.items() if entry.get("kind") == "turn")
+        self._reindex_history()
+
+    def _reindex_history(self):
+        """Re-embeds the history if the index is missing it (e.g. the cache folder was cleared)."""
+        if self.history_count == 0 or self.turn_ids:
+            return
+        records = list(self.history.read())[-self.max_turns:]
+        print(f"🧠 Re-indexing {len(records)} conversation turns...")
+        for i in range(0, len(records), 256):
+            batch = records[i:i + 256]
+            self.turn_ids.extend(self.store.add([describe_turn(r) for r in batch],
+                                                [{"kind": "turn", "ts": r["ts"]} for r in batch]))
+
+    # --- Writing ---
+
+    def record_turn(self, user_text: str, command: dict):
+        """
+        Logs one handled request and adds it to the index.
+
+        Args:
+            user_text: What the user said.
+            command: The intent it was parsed into.
+        """
+        record = {
+            "ts": time.time(),
+            "user": user_text,
+            "intent": command.get("intent") or command.get("type"),
+            "target": command.get("target"),
+            "message": command.get("message"),
+        }
+        with self.lock:
+            self.history.append(record)
+            self.history_count += 1
+            self.turn_ids.extend(self.store.add([describe_turn(record)], [{"kind": "turn", "ts": record["ts"]}]))
+            self._evict_old_turns()
+
+    def _evict_old_turns(self):
+        if len(self.turn_ids) > self.max_turns:
+            self.store.remove([self.turn_ids.popleft() for _ in range(len(self.turn_ids) - self.max_turns)])
+        if self.store.dead_rows() > COMPACT_DEAD_RATIO * max(len(self.store), 1):
+            self.store.compact()
+        # The log is trimmed in bulk (once it's 25% over), so appends stay cheap.
+        if self.history_count > self.max_turns * 1.25:
+            kept = list(self.history.read())[-self.max_turns:]
+            self.history.rewrite(kept)
+            self.history_count = len(kept)
+
+    def sync_knowledge(self):
+        """Indexes new or changed files in the knowledge folder and forgets deleted ones."""
+        current = {}
+        for pattern in KNOWLEDGE_PATTERNS:
+            for path in glob.glob(os.path.join(self.knowledge_dir, "**", pattern), recursive=True):
+                current[os.path.normpath(path)] = os.path.getmtime(path)
+
+        with self.lock:
+            indexed = {}
+            for entry_id, entry in self.store.entries.items():
+                if entry.get("kind") == "knowledge":
+                    indexed.setdefault((entry["source"], entry["mtime"]), []).append(entry_id)
+            for (source, mtime), entry_ids in indexed.items():
+                if current.get(source) != mtime:
+                    self.store.remove(entry_ids)
+            for source, mtime in current.items():
+                if (source, mtime) not in indexed:
+                    chunks = _knowledge_chunks(source)
+                    self.store.add(chunks, [{"kind": "knowledge", "source": source, "mtime": mtime}] * len(chunks))
+                    print(f"📚 Indexed {len(chunks)} fact(s) from '{source}'.")
+
+    # --- Reading ---
+
+    def recall(self, query: str, k: int = MEMORY_TOP_K, min_score: float = MEMORY_MIN_SCORE) -> list[str]:
+        """
+        Returns the remembered turns and facts most relevant to a request.
+
+        Args:
+            query: The user's request.
+            k: The maximum number of snippets.
+            min_score: The minimum cosine similarity for a snippet to count as relevant.
+
+        Returns:
+            The snippets' texts, most relevant first.
+        """
+        return [entry["text"] for score, entry in self.store.search(query, k) if score >= min_score]
+
+
+_memory = None
+_memory_lock = threading.Lock()
+# Turns are written on one background thread, in order, off the request path.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory")
+
+
+def get_memory() -> ConversationMemory:
+    """Returns the process-wide memory, loading it (and syncing knowledge/) on first use."""
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                memory = ConversationMemory(HISTORY_LOG_PATH, MEMORY_INDEX_DIR, KNOWLEDGE_DIR, MEMORY_MAX_TURNS)
+                memory.sync_knowledge()
+                _memory = memory
+    return _memory
+
+
+def remember_in_background(user_text: str, command: dict):
+    """Records a turn without making the caller wait for the embedding and disk writes."""
+    def record():
+        try:
+            get_memory().record_turn(user_text, command)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not record turn in memory: {e}")
+    _writer.submit(record)
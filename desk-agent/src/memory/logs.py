@@ -0,0 +1,150 @@
+# src/memory/logs.py
+
+import json
+import os
+import threading
+
+from config import TRACE_LOG_PATH, TRACE_LOG_MAX_BYTES
+
+
+class AppendOnlyLog:
+    """
+    A JSON-lines file that records are only ever appended to.
+
+    Appends are cheap and crash-safe: a crash can at worst leave a torn last
+    line, which is skipped on read. The only rewrite is rewrite(), used for
+    compaction, which swaps in a new file atomically.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def append(self, record: dict) -> int:
+        return self.extend([record])[0]
+
+    def extend(self, records: list[dict]) -> list[int]:
+        """
+        Appends several records with a single write.
+
+        Returns:
+            Each record's byte offset in the file, usable with read_before().
+        """
+        lines = [(json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8") for record in records]
+        with self.lock, open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(b"".join(lines))
+        offsets = []
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line)
+        return offsets
+
+    def read(self):
+        """
+        Reads the log from the start.
+
+        Yields:
+            The records in the order they were appended.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn write from a crash; everything before it is intact.
+                    continue
+
+    def read_before(self, offset: int, count: int, block_size: int = 65536) -> list[tuple[int, dict]]:
+        """
+        Reads up to `count` records that end before a byte offset, reading the file backwards.
+
+        Args:
+            offset: A record offset returned by extend() (or the file size for the newest records).
+            count: How many records to return at most.
+
+        Returns:
+            (offset, record) pairs, oldest first.
+        """
+        if offset <= 0 or not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            start = offset
+            while True:
+                start = max(0, start - block_size)
+                f.seek(start)
+                data = f.read(offset - start)
+                # The first line may be cut off unless we're at the start of the file.
+                lines = data.split(b"\n")[:-1] if start == 0 else data.split(b"\n")[1:-1]
+                if len(lines) >= count or start == 0:
+                    break
+                block_size *= 2
+        results = []
+        end = offset
+        for line in reversed(lines):
+            end -= len(line) + 1
+            try:
+                results.append((end, json.loads(line)))
+            except json.JSONDecodeError:
+                continue
+            if len(results) == count:
+                break
+        results.reverse()
+        return results
+
+    def trim_to_size(self, max_bytes: int):
+        """Drops the oldest records so the file is at most about half of max_bytes, once it exceeds max_bytes."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= max_bytes:
+            return
+        with self.lock:
+            with open(self.path, "rb") as f:
+                f.seek(-(max_bytes // 2), os.SEEK_END)
+                f.readline()  # skip the partial record
+                kept = f.read()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(kept)
+            os.replace(tmp_path, self.path)
+
+    def rewrite(self, records):
+        """Atomically replaces the log's contents with the given records."""
+        tmp_path = self.path + ".tmp"
+        with self.lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+
+
+class SpanExporter:
+    """
+    Writes finished traces (see src.utils.tracing) to a JSON-lines log.
+
+    Each trace arrives as one batch when its root span ends, and is written
+    with a single append, so a trace is never interleaved with another.
+    """
+
+    def __init__(self, path: str, max_bytes: int | None = None):
+        self.log = AppendOnlyLog(path)
+        if max_bytes:
+            self.log.trim_to_size(max_bytes)
+
+    def export(self, records: list[dict]):
+        try:
+            self.log.extend(records)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write trace: {e}")
+
+
+_span_exporter = None
+
+
+def get_span_exporter() -> SpanExporter:
+    """Returns the exporter for TRACE_LOG_PATH, trimming the log on first use."""
+    global _span_exporter
+    if _span_exporter is None:
+        _span_exporter = SpanExporter(TRACE_LOG_PATH, TRACE_LOG_MAX_BYTES)
+    return _span_exporter
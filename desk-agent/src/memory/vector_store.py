@@ -0,0 +1,300 @@
+# src/memory/vector_store.py
+
+import json
+import math
+import os
+import threading
+import time
+
+from src.memory.logs import AppendOnlyLog
+from src.utils import embeddings
+
+FLOAT32_BYTES = 4
+INITIAL_CAPACITY = 1024
+
+
+class VectorStore:
+    """
+    Text snippets with their embeddings, on disk, searchable by similarity.
+
+    Vectors live in a memory-mapped float32 file that grows in place, so adding
+    a batch only writes the new rows and a restart never re-embeds anything.
+    Each row's text and metadata goes to an append-only log next to it;
+    removals are logged as tombstones until compact() rewrites both files.
+    The two always change together: compact() writes a new generation of
+    both, and meta.json, replaced last, says which generation is current.
+
+    Search goes through FAISS: an exact inner-product index while the store is
+    small, and an IVF index (probing only a few clusters) once it holds
+    ivf_min_entries or more, which keeps top-k queries in the low milliseconds
+    at 100k entries.
+    """
+
+    def __init__(self, directory: str, ivf_min_entries: int, nprobe: int):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.generation = 0
+        self.vectors_path, rows_path = self._paths(0)
+        self.rows = AppendOnlyLog(rows_path)
+        self.ivf_min_entries = ivf_min_entries
+        self.nprobe = nprobe
+        self.lock = threading.RLock()
+
+        self.entries = {}     # id -> row record, oldest first
+        self.dim = None
+        self.count = 0        # rows used in the vectors file, dead ones included
+        self.next_id = 0
+        self._vectors = None
+        self.index = None
+        self._indexed_at = 0  # live entries when the index was last built
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # --- Storage ---
+
+    def _paths(self, generation: int) -> tuple[str, str]:
+        """The vectors file and row log of a generation (0 is the original, unnumbered pair)."""
+        suffix = f".{generation}" if generation else ""
+        return (os.path.join(self.directory, f"vectors{suffix}.f32"),
+                os.path.join(self.directory, f"rows{suffix}.jsonl"))
+
+    def _write_meta(self):
+        # Replaced atomically: switching generations is this one rename.
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "generation": self.generation}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _load(self):
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.generation = meta.get("generation", 0)
+            self.vectors_path, rows_path = self._paths(self.generation)
+            self.rows = AppendOnlyLog(rows_path)
+        for record in self.rows.read():
+            self.next_id = max(self.next_id, record["id"] + 1)
+            if record.get("deleted"):
+                self.entries.pop(record["id"], None)
+            else:
+                self.entries[record["id"]] = record
+                self.count = max(self.count, record["row"] + 1)
+        if self.dim is None:
+            return
+
+        capacity = os.path.getsize(self.vectors_path) // (self.dim * FLOAT32_BYTES) if os.path.exists(self.vectors_path) else 0
+        if capacity < self.count:
+            # The log got ahead of the vectors (a crash mid-write): drop rows without a vector.
+            print("⚠️ Warning: Memory vectors are incomplete, dropping the unsaved rows.")
+            self.entries = {i: e for i, e in self.entries.items() if e["row"] < capacity}
+            self.count = capacity
+        if capacity:
+            self._open_vectors(capacity)
+        self._build_index()
+
+    def _open_vectors(self, capacity: int):
+        import numpy as np
+        self._vectors = np.memmap(self.vectors_path, dtype="float32", mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, rows: int):
+        capacity = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2, INITIAL_CAPACITY)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None  # the file can't be resized while mapped (on Windows)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * FLOAT32_BYTES)
+        self._open_vectors(new_capacity)
+
+    # --- Index ---
+
+    def _build_index(self):
+        """Rebuilds the FAISS index over the live rows."""
+        try:
+            import faiss
+            import numpy as np
+        except ImportError:
+            self.index = None
+            return
+        live = len(self.entries)
+        if live >= self.ivf_min_entries:
+            start = time.perf_counter()
+            nlist = int(min(max(math.sqrt(live), 64), 1024))
+            index = faiss.IndexIVFFlat(faiss.IndexFlatIP(self.dim), self.dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.cp.niter = 10
+            index.nprobe = self.nprobe
+            rows = np.array([entry["row"] for entry in self.entries.values()])
+            sample = np.random.default_rng(0).choice(rows, size=min(live, nlist * 40), replace=False)
+            index.train(np.ascontiguousarray(self._vectors[np.sort(sample)]))
+            print(f"🧠 Built IVF memory index ({nlist} lists, {live} entries) in {time.perf_counter() - start:.2f}s.")
+        else:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+        self.index = index
+        self._indexed_at = live
+        if live:
+            ids = np.fromiter(self.entries.keys(), dtype="int64", count=live)
+            rows = np.fromiter((entry["row"] for entry in self.entries.values()), dtype="int64", count=live)
+            # Add in slices so large stores aren't copied out of the memory map all at once.
+            for i in range(0, live, 16384):
+                self.index.add_with_ids(np.ascontiguousarray(self._vectors[rows[i:i + 16384]]), ids[i:i + 16384])
+
+    def _maybe_rebuild_index(self):
+        live = len(self.entries)
+        is_ivf = self._indexed_at >= self.ivf_min_entries
+        # Switch to IVF when crossing the threshold, and retrain when the store has grown a lot since.
+        if (not is_ivf and live >= self.ivf_min_entries) or (is_ivf and live > 4 * self._indexed_at):
+            self._build_index()
+
+    # --- Public API ---
+
+    def add(self, texts: list[str], metadata: list[dict], batch_size: int = 64) -> list[int]:
+        """
+        Embeds and stores a batch of texts.
+
+        Args:
+            texts: The snippets to store.
+            metadata: One dict of extra fields (e.g. kind, source) per text.
+            batch_size: How many texts the embedding model encodes per forward pass.
+
+        Returns:
+            The new entries' ids, or an empty list if embeddings are unavailable.
+        """
+        if not texts:
+            return []
+        vectors = embeddings.embed(texts, batch_size=batch_size)
+        if vectors is None:
+            return []
+        return self.add_vectors(vectors, texts, metadata)
+
+    def add_vectors(self, vectors, texts: list[str], metadata: list[dict]) -> list[int]:
+        """Stores already-embedded texts. vectors must be L2-normalized float32 rows."""
+        import numpy as np
+        with self.lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                os.makedirs(self.directory, exist_ok=True)
+                self._write_meta()
+            first_row = self.count
+            self._ensure_capacity(first_row + len(texts))
+            self._vectors[first_row:first_row + len(texts)] = vectors
+            self._vectors.flush()  # vectors first, so the log never points at rows that aren't there
+
+            now = time.time()
+            records = []
+            for offset, (text, extra) in enumerate(zip(texts, metadata)):
+                record = {**extra, "id": self.next_id, "row": first_row + offset, "text": text, "created": now}
+                records.append(record)
+                self.entries[record["id"]] = record
+                self.next_id += 1
+            self.rows.extend(records)
+            self.count += len(texts)
+
+            ids = [record["id"] for record in records]
+            if self.index is None:
+                self._build_index()
+            else:
+                self.index.add_with_ids(np.ascontiguousarray(vectors, dtype="float32"), np.array(ids, dtype="int64"))
+                self._maybe_rebuild_index()
+            return ids
+
+    def remove(self, ids: list[int]):
+        """Removes entries from the index and logs their removal."""
+        import numpy as np
+        with self.lock:
+            ids = [i for i in ids if i in self.entries]
+            if not ids:
+                return
+            for i in ids:
+                del self.entries[i]
+            self.rows.extend([{"id": i, "deleted": True} for i in ids])
+            if self.index is not None:
+                self.index.remove_ids(np.array(ids, dtype="int64"))
+
+    def search(self, query: str, k: int, kind: str | None = None) -> list[tuple[float, dict]]:
+        """
+        Finds the stored snippets most similar to a query.
+
+        Args:
+            query: The text to search for.
+            k: How many results to return.
+            kind: Only return entries of this kind (e.g. "turn" or "knowledge").
+
+        Returns:
+            (similarity, entry) pairs, most similar first.
+        """
+        if not self.entries or self.index is None:
+            return []
+        vector = embeddings.embed([query])
+        if vector is None:
+            return []
+        return self.search_vector(vector, k, kind)
+
+    def search_vector(self, vector, k: int, kind: str | None = None) -> list[tuple[float, dict]]:
+        with self.lock:
+            if self.index is None or not self.entries:
+                return []
+            # Over-fetch when filtering, so enough results of the wanted kind survive.
+            fetch = min(len(self.entries), k * 4 if kind else k)
+            scores, ids = self.index.search(vector, fetch)
+            results = []
+            for score, i in zip(scores[0], ids[0]):
+                entry = self.entries.get(int(i))
+                if entry and (kind is None or entry.get("kind") == kind):
+                    results.append((float(score), entry))
+                    if len(results) == k:
+                        break
+            return results
+
+    def dead_rows(self) -> int:
+        return self.count - len(self.entries)
+
+    def compact(self):
+        """
+        Rewrites the vectors file and row log without removed entries, then rebuilds the index.
+
+        Both are written as a new generation next to the current one, and
+        meta.json is switched to it last; a crash at any point leaves a store
+        whose rows and vectors belong together, old or new.
+        """
+        import numpy as np
+        with self.lock:
+            if self._vectors is None or not self.dead_rows():
+                return
+            start = time.perf_counter()
+            live = list(self.entries.values())
+            generation = self.generation + 1
+            vectors_path, rows_path = self._paths(generation)
+            capacity = max(len(live), INITIAL_CAPACITY)
+            compacted = np.memmap(vectors_path, dtype="float32", mode="w+", shape=(capacity, self.dim))
+            old_rows = np.fromiter((entry["row"] for entry in live), dtype="int64", count=len(live))
+            for i in range(0, len(live), 16384):
+                chunk = old_rows[i:i + 16384]
+                compacted[i:i + len(chunk)] = self._vectors[chunk]
+            compacted.flush()
+            del compacted
+            rows = AppendOnlyLog(rows_path)
+            rows.rewrite({**entry, "row": new_row} for new_row, entry in enumerate(live))
+
+            old_paths = (self.vectors_path, self.rows.path)
+            self.generation = generation
+            self._write_meta()
+            self._vectors = None
+            self.vectors_path, self.rows = vectors_path, rows
+            for new_row, entry in enumerate(live):
+                entry["row"] = new_row
+            for path in old_paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # still mapped (Windows) or already gone; it's no longer referenced
+            self.count = len(live)
+            self._open_vectors(capacity)
+            self._build_index()
+            print(f"🧹 Compacted memory to {len(live)} entries in {time.perf_counter() - start:.2f}s.")
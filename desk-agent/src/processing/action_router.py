@@ -1,28 +1,28 @@
 # src/processing/action_router.py
 
-from src.agents.tools import file_system_tools
-from src.agents.crew_setup import DeveloperCrew, gemini_llm # <-- IMPORT THE CREW and gemini_llm
+from config import MAX_CONCURRENT_CREWS
+from src.processing.jobs import job_manager, JobCancelled
+from src.processing.sequence_executor import SequenceExecutor
+from src.processing.tool_registry import get_tool_registry
+from src.routing.model_router import get_router
+from src.utils import tracing
+from src.utils.json_parser import validate_action
 
-# A dictionary mapping the 'intent' string to the actual tool function.
-TOOL_REGISTRY = {
-    "create_file": file_system_tools.create_file,
-    "delete_file": file_system_tools.delete_file,
-    "open_application": file_system_tools.open_application, # <-- ADD NEW TOOL
-}
-
-async def execute_action(command: dict) -> str:
+def run_tool(command: dict) -> str:
+    """Executes a single simple-tool command synchronously and returns its result message."""
     intent = command.get("intent")
     
-    arguments = command.get("params", {})
+    arguments = dict(command.get("params") or {})
     if "target" in command: arguments["target"] = command["target"]
     if "source" in command: arguments["source"] = command["source"]
     if "destination" in command: arguments["destination"] = command["destination"]
     
-    if intent in TOOL_REGISTRY:
-        tool_function = TOOL_REGISTRY[intent]
+    registry = get_tool_registry()
+    if registry.get(intent) is not None:
         print(f"⚙️ Executing simple tool for intent: '{intent}' with args: {arguments}")
         try:
-            return tool_function(**arguments)
+            with tracing.span("tool", intent=intent):
+                return registry.call(intent, arguments)
         except TypeError as e:
             return f"❌ Error: Missing or incorrect arguments for intent '{intent}'. Details: {e}"
         except Exception as e:
@@ -30,33 +30,179 @@ async def execute_action(command: dict) -> str:
     else:
         return f"❌ Error: Unknown intent '{intent}'. No simple tool registered."
 
-async def route_action(parsed_command: dict) -> str:
+async def execute_action(command: dict) -> str:
+    # Tools block (file I/O, Everything searches, process launches), so they run off the event loop.
+    return await job_manager.run_blocking(run_tool, command, description=str(command.get("intent")))
+
+def run_crew(inputs: dict, progress, cancel_event, model_name: str) -> str:
+    """Runs the developer crew on a job worker thread, reporting each task as it finishes."""
+    # CrewAI is slow to import, so it is only loaded when a crew actually runs (or by the prewarm).
+    from src.agents.crew import run_developer_crew
+
+    def on_step(step_output):
+        if cancel_event.is_set():
+            raise JobCancelled()
+        progress("🔧 Crew is working...")
+
+    try:
+        run = run_developer_crew(inputs, model_name, progress=progress, step_callback=on_step)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        return f"❌ CrewAI task failed: {e}"
+    print(run.summary())
+    return f"✅ CrewAI task completed successfully.\n{run.summary()}\n--- Report ---\n{run.output}"
+
+def is_git_step(action: dict) -> bool:
+    spec = get_tool_registry().get(action.get("intent"))
+    return spec is not None and spec.action_type == "git"
+
+def batch_git_steps(actions: list[dict]) -> list[dict]:
+    """
+    Merges each run of consecutive git steps into one git_batch action.
+
+    The batch runs them in one go against a persistent repository session, so
+    adding many files stages them with a single git process.
+    """
+    batched = []
+    for action in actions:
+        if is_git_step(action) and batched and batched[-1].get("intent") == "git_batch":
+            batched[-1]["params"]["steps"].append(action)
+        elif is_git_step(action):
+            batched.append({"intent": "git_batch", "action_type": "git", "params": {"steps": [action]},
+                            "message": "Running git steps."})
+        else:
+            batched.append(action)
+    # A lone git step doesn't need the batch wrapper.
+    return [a["params"]["steps"][0] if a.get("intent") == "git_batch" and len(a["params"]["steps"]) == 1 else a
+            for a in batched]
+
+def _is_destructive(action: dict) -> bool:
+    if action.get("requires_confirmation"):
+        return True
+    spec = get_tool_registry().get(action.get("intent"))
+    return spec is not None and spec.requires_confirmation
+
+def destructive_steps(command: dict) -> list[dict]:
+    """The actions of a command (the command itself, or the steps of a sequence) that need confirming."""
+    steps = [command] + list(command.get("actions") or [])
+    return [step for step in steps if step.get("intent") and _is_destructive(step)]
+
+def needs_confirmation(command: dict) -> bool:
+    """Destructive actions must never run before the user has confirmed them, including steps of a sequence."""
+    return bool(command.get("requires_confirmation")) or bool(destructive_steps(command))
+
+def _resolve_delete_target(step: dict) -> str:
+    """Pins a delete_file step to the file it would remove, so the path confirmed is the path deleted."""
+    from src.agents.tools.file_system_tools import find_file_to_delete
+    try:
+        step["target"] = find_file_to_delete(step["target"])
+    except (FileNotFoundError, ValueError) as e:
+        return f"{step['target']} (⚠️ {e})"
+    return step["target"]
+
+def confirmation_prompt(command: dict) -> str:
+    """
+    The question asked before running a command, listing every destructive step it would take.
+
+    delete_file steps are resolved to the full path of the file they would remove
+    (and pinned to it), which may search the file index, so call this off the event loop.
+    """
+    prompt = command.get("message") or "Are you sure?"
+    steps = destructive_steps(command)
+    if not steps:
+        return prompt
+    lines = []
+    for step in steps:
+        if step["intent"] == "delete_file" and step.get("target"):
+            target = _resolve_delete_target(step)
+        else:
+            target = step.get("target") or step.get("source")
+        lines.append(f"  - {step['intent']}" + (f": {target}" if target else ""))
+    return f"{prompt}\nThis will run:\n" + "\n".join(lines)
+
+
+class StreamingDispatcher:
+    """
+    Starts the actions of a 'sequence' command while the model is still generating the rest.
+
+    Streamed actions go into a SequenceExecutor, so each one waits only for the
+    earlier actions it depends on. Dispatch stops at the first action that needs
+    confirmation (or if the command itself turns out to need it) and at the first
+    git step (so it can be batched); whatever wasn't dispatched is left for the
+    normal route_action/confirmation flow.
+    """
+
+    def __init__(self, held: bool = False):
+        self.executor = SequenceExecutor(run_tool)
+        # Start held to parse without dispatching anything early (e.g. while earlier commands are pending).
+        self.held = held
+        self.is_sequence = False
+
+    @property
+    def dispatched(self) -> int:
+        return self.executor.submitted
+
+    @property
+    def failed(self) -> bool:
+        return self.executor.failed
+
+    def on_field(self, key: str, value):
+        if key in ("action_type", "type") and value == "sequence":
+            self.is_sequence = True
+        elif key == "requires_confirmation" and value:
+            self.held = True
+
+    def on_action(self, index: int, action: dict):
+        if not self.is_sequence:
+            return
+        # Repaired the way the full parse will be ("app_name" for target, "true" for true, ...),
+        # before deciding whether it needs confirming; one that doesn't validate is left for the full parse.
+        if not self.held and validate_action(action, f"$.actions[{index}]") is None:
+            self.held = True
+            return
+        # Git steps are left for route_action, which batches them with the steps that follow.
+        if self.held or self.failed or index != self.dispatched or needs_confirmation(action) or is_git_step(action):
+            self.held = True
+            return
+        print(f"🚀 Dispatching streamed action #{index + 1}: '{action.get('intent')}'")
+        self.executor.submit(action)
+
+    async def finish(self) -> list[str]:
+        """Waits for the dispatched actions and returns their result messages."""
+        return await self.executor.finish()
+
+
+@tracing.traced("route")
+async def route_action(parsed_command: dict, on_token=None) -> str:
     """
     Routes the parsed command. It can execute simple tools, sequences, or kick off a CrewAI crew.
+
+    Args:
+        parsed_command: The intent dictionary from the intent parser.
+        on_token: Optional callback that receives chat replies token by token.
     """
     # --- PRIMARY FIX: Use 'action_type' instead of 'type' ---
     action_type = parsed_command.get("action_type")
+    tracing.current_span().set(action_type=action_type)
 
     if action_type == "sequence":
-        results = []
-        for action in parsed_command.get("actions", []):
-            result_msg = await execute_action(action)
-            results.append(result_msg)
-            if "❌ Error" in result_msg:
-                results.append("Sequence stopped due to an error.")
-                break
-        return "\n".join(results)
+        # Independent steps run concurrently; dependent ones (folder, then file inside it) stay ordered.
+        return await SequenceExecutor(run_tool).run(batch_git_steps(parsed_command.get("actions", [])))
 
     elif action_type == "crew":
         print(" delegating task to CrewAI...")
         inputs = parsed_command.get("arguments", {})
-        try:
-            crew_result = DeveloperCrew().crew().kickoff(inputs=inputs)
-            return f"✅ CrewAI task completed successfully.\n--- Report ---\n{crew_result}"
-        except Exception as e:
-            return f"❌ CrewAI task failed: {e}"
+        # Crews can take minutes, so they run as a background job and report back when done.
+        description = inputs.get("topic") or parsed_command.get("message") or "CrewAI task"
+        queued = len(job_manager.active_crews())
+        # CrewAI makes its own model calls, so the router only picks the model (skipping any with an open circuit).
+        model_name = get_router().select("crew")
+        job = job_manager.start_crew(lambda progress, cancel_event: run_crew(inputs, progress, cancel_event, model_name), description)
+        status = f" It is queued behind {queued} running crew(s)." if queued >= MAX_CONCURRENT_CREWS else ""
+        return f"🚀 Started CrewAI job #{job.id}.{status} I'll report back when it's done (say 'cancel job {job.id}' to stop it)."
     
-    elif action_type == "os":
+    elif action_type in ("os", "git"):
         return await execute_action(parsed_command)
 
     # --- NEW: Handle 'chat' action type ---
@@ -69,9 +215,13 @@ async def route_action(parsed_command: dict) -> str:
             return "It seems you wanted to chat, but I didn't understand your question."
         
         try:
-            # Use the powerful Gemini model for a conversational response
-            response = await gemini_llm.ainvoke(query)
-            return response.content
+            # Routed to the best chat model that's up (Gemini first), falling back to a local model.
+            parts = []
+            async for chunk in get_router().route("chat", [{"role": "user", "content": query}]):
+                parts.append(chunk)
+                if on_token is not None:
+                    on_token(chunk)
+            return "".join(parts)
         except Exception as e:
             return f"❌ Error during chat: {e}"
 
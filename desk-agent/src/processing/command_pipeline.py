@@ -0,0 +1,190 @@
+# src/processing/command_pipeline.py
+
+import asyncio
+import itertools
+import re
+from collections import deque
+
+from config import PIPELINE_MAX_PENDING
+from src.processing.action_router import confirmation_prompt, needs_confirmation
+from src.utils import tracing
+
+CONFIRM_REPLY = re.compile(r"\s*(yes|y|no|n)(?:\s+#?(\d+))?\s*[.!]?\s*", re.IGNORECASE)
+STATUS_REQUESTS = ("queue", "status", "show queue")
+
+
+class PipelineCommand:
+    """One line the user typed, from parsing to execution."""
+
+    def __init__(self, command_id: int, text: str, submitted_ns: int | None = None):
+        self.id = command_id
+        self.text = text
+        # The trace of this command, from submission until it finishes or is cancelled.
+        self.span = tracing.start_span("command", start_ns=submitted_ns, id=command_id, text=text[:80])
+        self.status = "parsing"    # parsing -> waiting -> running -> done | failed; or awaiting confirmation
+        self.parse_task = None
+        self.intent = None
+        self.confirmed = False
+        self.reply = None          # resolved with True/False once the user answers the confirmation
+
+    def describe(self) -> str:
+        return f"#{self.id} {self.status}: {self.text}"
+
+
+class CommandPipeline:
+    """
+    Lets several commands be in flight at once without them stepping on each other.
+
+    Each command starts parsing as soon as it's submitted, so model calls
+    for back-to-back commands overlap. Execution happens on a single worker,
+    strictly in submission order. A command that needs confirmation holds
+    the queue until the user answers ("yes"/"no", or "yes 3"/"no 3"): commands
+    submitted after it keep parsing but don't run before it.
+    At most max_pending commands can be unfinished at a time.
+
+    The pipeline doesn't know about the UI; it is given:
+        parse(text, allow_early_dispatch) -> intent dict, None (not understood) or False (already handled)
+        execute(intent) -> coroutine that runs the intent and shows its result
+        notify(message) -> shows a system message
+        on_status(summary) -> shows the queue status line ("" when idle)
+    """
+
+    def __init__(self, parse, execute, notify, on_status=None, max_pending: int = PIPELINE_MAX_PENDING):
+        self.parse = parse
+        self.execute = execute
+        self.notify = notify
+        self.on_status = on_status or (lambda summary: None)
+        self.max_pending = max_pending
+        self.queue = deque()        # parsed or parsing commands, in execution order
+        self.awaiting = {}          # id -> the command waiting for yes/no (at most one: it holds the queue)
+        self._ids = itertools.count(1)
+        self._worker = None
+
+    # --- Submitting ---
+
+    async def submit(self, text: str, submitted_ns: int | None = None) -> PipelineCommand | None:
+        """
+        Handles one line of user input. Must be called on the asyncio thread.
+
+        Args:
+            text: The line the user typed (or said).
+            submitted_ns: perf_counter_ns() when the user submitted it, so its trace includes the hand-off to this thread.
+
+        Returns:
+            The queued command, or None if the input was a reply/status request or was turned away.
+        """
+        reply = CONFIRM_REPLY.fullmatch(text)
+        if reply and self.awaiting:
+            self._confirm(reply.group(1).lower().startswith("y"), reply.group(2))
+            return None
+        if text.strip().lower() in STATUS_REQUESTS:
+            self.notify(self.describe())
+            return None
+        if len(self.queue) >= self.max_pending:
+            self.notify(f"⏳ {len(self.queue)} commands are still in progress; please wait for one to finish.")
+            return None
+
+        command = PipelineCommand(next(self._ids), text, submitted_ns)
+        # Sequence steps may only start while parsing if nothing submitted earlier is still pending.
+        command.parse_task = asyncio.ensure_future(self._parse(command, allow_early_dispatch=not self.queue))
+        self._enqueue(command)
+        if len(self.queue) > 1:
+            held = "".join(f" (#{c.id} is waiting for your yes/no)" for c in self.awaiting.values())
+            self.notify(f"📥 Command #{command.id} queued behind {len(self.queue) - 1} other(s).{held}")
+        return command
+
+    async def _parse(self, command: PipelineCommand, allow_early_dispatch: bool):
+        try:
+            with tracing.activate(command.span), tracing.span("parse"):
+                command.intent = await self.parse(command.text, allow_early_dispatch)
+        except Exception as e:
+            print(f"❌ Error: Parsing command #{command.id} failed: {e}")
+            command.intent = None
+        if command.status == "parsing":
+            command.status = "waiting"
+            self._report_status()
+
+    def _enqueue(self, command: PipelineCommand):
+        self.queue.append(command)
+        self._report_status()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+
+    # --- Executing ---
+
+    async def _run(self):
+        while self.queue:
+            command = self.queue[0]
+            await command.parse_task
+            try:
+                with tracing.activate(command.span):
+                    await self._execute(command)
+            except Exception as e:
+                command.status = "failed"
+                self.notify(f"❌ Command #{command.id} failed: {e}")
+            command.span.end(status=command.status)
+            self.queue.popleft()
+            self._report_status()
+
+    async def _execute(self, command: PipelineCommand):
+        intent = command.intent
+        if intent is False:
+            command.status = "done"  # fully handled while streaming
+            return
+        if not intent:
+            command.status = "failed"
+            self.notify("Sorry, I had trouble understanding that command.")
+            return
+        if not command.confirmed and needs_confirmation(intent):
+            # Resolving what would be deleted may search the file index, so it runs off the loop.
+            prompt = await asyncio.to_thread(confirmation_prompt, intent)
+            command.status = "awaiting confirmation"
+            command.reply = asyncio.get_running_loop().create_future()
+            self.awaiting[command.id] = command
+            self.notify(f"{prompt} (yes/no)")
+            self._report_status()
+            # The worker waits here, so nothing submitted later runs before this command.
+            if not await command.reply:
+                command.status = "cancelled"
+                self.notify(f"Action cancelled (#{command.id}).")
+                return
+            command.confirmed = True
+        command.status = "running"
+        self._report_status()
+        with tracing.span("execute"):
+            await self.execute(intent)
+        command.status = "done"
+
+    def _confirm(self, approved: bool, command_id: str | None):
+        if command_id is None:
+            # Only the command at the head of the queue can be waiting for an answer.
+            command_id = next(iter(self.awaiting))
+        command = self.awaiting.pop(int(command_id), None)
+        if command is None:
+            self.notify(f"No command #{command_id} is waiting for confirmation.")
+            return
+        # Resumes the worker, which runs or cancels it and then moves on to the commands behind it.
+        command.reply.set_result(approved)
+
+    # --- Status ---
+
+    def describe(self) -> str:
+        commands = list(self.queue)
+        if not commands:
+            return "No commands in progress."
+        return "\n".join(command.describe() for command in commands)
+
+    def _report_status(self):
+        parts = []
+        running = sum(1 for c in self.queue if c.status == "running")
+        parsing = sum(1 for c in self.queue if c.status == "parsing")
+        waiting = len(self.queue) - running - parsing - len(self.awaiting)
+        if running:
+            parts.append(f"{running} running")
+        if parsing:
+            parts.append(f"{parsing} parsing")
+        if waiting:
+            parts.append(f"{waiting} waiting")
+        if self.awaiting:
+            parts.append(f"{len(self.awaiting)} awaiting confirmation")
+        self.on_status(", ".join(parts) + (f" ({len(self.queue)}/{self.max_pending})" if self.queue else ""))
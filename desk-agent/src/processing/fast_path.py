@@ -0,0 +1,215 @@
+# src/processing/fast_path.py
+
+import re
+import time
+
+# --- Deterministic fast path for high-frequency commands ---
+# Commands like "create file notes.txt" or "open chrome" don't need a round
+# trip through the intent model. The patterns below are indexed by their first
+# word, so a miss costs one dict lookup and, at most, a handful of regex matches.
+
+# Words that usually mean the user wants more than one thing done.
+MULTI_STEP_MARKERS = re.compile(r"\b(and|then|after|before|also)\b|[,;]")
+
+FILE_TARGET = r"(?P<target>[\w.\-/\\:~]+)"
+POLITE_SUFFIX = r"(?:\s+please)?"
+
+# intent -> (action_type, compiled pattern, base confidence)
+PATTERNS = {
+    "create_file": (
+        "os",
+        re.compile(
+            r"^(?:create|make|touch|new)\s+(?:a\s+|an\s+)?(?:new\s+|empty\s+)?(?P<file_word>file\s+)?"
+            r"(?:called\s+|named\s+)?" + FILE_TARGET + POLITE_SUFFIX + r"$",
+            re.IGNORECASE,
+        ),
+        0.95,
+    ),
+    "delete_file": (
+        "os",
+        re.compile(
+            r"^(?:delete|remove|rm|erase)\s+(?:the\s+)?(?P<file_word>file\s+)?"
+            r"(?:called\s+|named\s+)?" + FILE_TARGET + POLITE_SUFFIX + r"$",
+            re.IGNORECASE,
+        ),
+        0.95,
+    ),
+    # Not "start" or "run": "start over" or "run tests" aren't apps, so those go to the model.
+    "open_application": (
+        "os",
+        re.compile(
+            r"^(?:open|launch)\s+(?:the\s+)?(?:app\s+|application\s+)?"
+            r"(?P<target>[\w.\-:/]+)(?:\s+app|\s+application)?" + POLITE_SUFFIX + r"$",
+            re.IGNORECASE,
+        ),
+        0.93,
+    ),
+    "git_init": (
+        "git",
+        re.compile(
+            r"^(?:git\s+init|init(?:ialize|ialise)?\s+(?:a\s+)?(?:new\s+)?git\s+repo(?:sitory)?"
+            r"|start\s+a\s+new\s+git\s+repo(?:sitory)?)"
+            r"(?:\s+(?:in|at)\s+(?P<target>[\w.\-/\\:~]+))?(?:\s+here)?" + POLITE_SUFFIX + r"$",
+            re.IGNORECASE,
+        ),
+        0.97,
+    ),
+    "git_commit": (
+        "git",
+        re.compile(
+            r"^(?:git\s+)?commit(?:\s+(?P<scope>changes|everything|all|-a))?\s+(?:with\s+)?"
+            r"(?:(?:the\s+)?message\s+|-m\s+)(?P<quote>[\"'])(?P<message>.+)(?P=quote)$",
+            re.IGNORECASE,
+        ),
+        0.97,
+    ),
+}
+
+# The "small trie": first word of the utterance -> intents worth trying.
+FIRST_WORD_INDEX = {
+    "create": ["create_file"],
+    "make": ["create_file"],
+    "touch": ["create_file"],
+    "new": ["create_file"],
+    "delete": ["delete_file"],
+    "remove": ["delete_file"],
+    "rm": ["delete_file"],
+    "erase": ["delete_file"],
+    "open": ["open_application"],
+    "launch": ["open_application"],
+    "start": ["git_init"],
+    "git": ["git_init", "git_commit"],
+    "init": ["git_init"],
+    "initialize": ["git_init"],
+    "initialise": ["git_init"],
+    "commit": ["git_commit"],
+}
+
+# Words that look like an app name to the open_application pattern but aren't.
+NOT_APPLICATIONS = {"file", "folder", "directory", "it", "this", "that", "a", "the"}
+
+
+class FastPathStats:
+    """Hit/miss counters used to measure how much model latency the fast path saves."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.match_time = 0.0
+        self.llm_calls = 0
+        self.llm_time = 0.0
+
+    def record_llm_call(self, elapsed: float):
+        self.llm_calls += 1
+        self.llm_time += elapsed
+
+    def summary(self) -> dict:
+        lookups = self.hits + self.misses
+        avg_llm = self.llm_time / self.llm_calls if self.llm_calls else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "avg_match_us": (self.match_time / lookups) * 1e6 if lookups else 0.0,
+            "avg_llm_s": avg_llm,
+            # Every hit is one model round trip we didn't make.
+            "estimated_saved_s": self.hits * avg_llm,
+        }
+
+
+stats = FastPathStats()
+
+
+def _normalize(text: str) -> str:
+    text = text.strip().rstrip(".!?").strip()
+    return re.sub(r"\s+", " ", text)
+
+
+def _looks_like_file(target: str) -> bool:
+    name = re.split(r"[/\\]", target)[-1]
+    return "." in name.strip(".")
+
+
+def _build_intent(intent: str, action_type: str, match: re.Match, confidence: float) -> dict | None:
+    groups = match.groupdict()
+    target = groups.get("target")
+    params = {}
+
+    if intent in ("create_file", "delete_file"):
+        # Without the word "file" or an extension, "make coffee" would be a file.
+        has_file_word = bool(groups.get("file_word"))
+        if not has_file_word and not _looks_like_file(target):
+            return None
+        if not (has_file_word and _looks_like_file(target)):
+            confidence -= 0.03
+        verb = "Creating" if intent == "create_file" else "Deleting"
+        message = f"{verb} file {target}."
+    elif intent == "open_application":
+        if target.lower() in NOT_APPLICATIONS:
+            return None
+        message = f"Opening {target}."
+    elif intent == "git_init":
+        target = target or "."
+        message = f"Initializing a Git repository in '{target}'."
+    else:  # git_commit
+        params["message"] = groups["message"]
+        # "commit everything" also means changes that haven't been staged.
+        if (groups.get("scope") or "").lower() in ("everything", "all", "-a"):
+            params["all_changes"] = True
+        message = f"Committing changes with message '{groups['message']}'."
+
+    command = {
+        "type": "os",
+        "intent": intent,
+        "action_type": action_type,
+        "params": params,
+        "confidence": round(confidence, 2),
+        "requires_confirmation": intent == "delete_file",
+        "is_multi_step": False,
+        "message": message,
+    }
+    if target is not None:
+        command["target"] = target
+    return command
+
+
+def match_fast_path(user_text: str) -> dict | None:
+    """
+    Tries to recognize a high-frequency command without calling the LLM.
+
+    Args:
+        user_text: The raw text from the user.
+
+    Returns:
+        An intent dictionary in the same shape the LLM produces, or None if
+        the text isn't a simple, unambiguous command.
+    """
+    start = time.perf_counter()
+    command = None
+
+    text = _normalize(user_text)
+    lowered = text.lower()
+    first_word = lowered.split(" ", 1)[0] if lowered else ""
+    if lowered.startswith("please "):
+        text, lowered = text[7:], lowered[7:]
+        first_word = lowered.split(" ", 1)[0]
+
+    # Commit messages are free text ("fix a and b"), so they skip the multi-step check;
+    # the anchored pattern still rejects anything that isn't a single commit.
+    candidates = FIRST_WORD_INDEX.get(first_word, [])
+    if candidates and (first_word in ("commit", "git") or not MULTI_STEP_MARKERS.search(lowered)):
+        for intent in candidates:
+            action_type, pattern, confidence = PATTERNS[intent]
+            match = pattern.match(text)
+            if match:
+                command = _build_intent(intent, action_type, match, confidence)
+                if command:
+                    break
+
+    stats.match_time += time.perf_counter() - start
+    if command:
+        stats.hits += 1
+    else:
+        stats.misses += 1
+    return command
+
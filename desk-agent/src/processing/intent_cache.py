@@ -0,0 +1,285 @@
+# src/processing/intent_cache.py
+
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    INTENT_CACHE_PATH,
+    INTENT_CACHE_THRESHOLD,
+    INTENT_CACHE_MAX_ENTRIES,
+    INTENT_CACHE_TTL_S,
+)
+from src.utils import embeddings
+
+# Filler words that don't change what the user is asking for.
+FILLER_WORDS = {"please", "pls", "can", "could", "would", "you", "kindly", "just", "now", "for", "me"}
+# Words whose meaning comes from the conversation ("open it", "delete that file", "init a repo here").
+# The model resolves them from the prompt's context, so the same words can mean something else next time.
+CONTEXT_WORDS = {"it", "its", "this", "that", "these", "those", "them", "they", "here", "there",
+                 "again", "same", "last", "previous", "above"}
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercases the text and strips punctuation and filler words."""
+    text = re.sub(r"[^\w\s./\\:-]", " ", text.lower())
+    words = [word.strip(".") for word in text.split()]
+    return " ".join(word for word in words if word and word not in FILLER_WORDS)
+
+
+def depends_on_context(key: str) -> bool:
+    """Whether a normalized utterance refers to the conversation, so its intent can't be reused."""
+    return any(word in CONTEXT_WORDS for word in key.split())
+
+
+def _contains_slot(value: str, key: str) -> bool:
+    """Checks that a slot value appears in the utterance as whole words ("a.txt" is not in "data.txt")."""
+    value = normalize_utterance(value)
+    return not value or re.search(r"(?<![\w.])" + re.escape(value) + r"(?![\w.])", key) is not None
+
+
+def _slot_values(intent: dict) -> list[str]:
+    """Collects the user-supplied values (targets, params, queries) in an intent."""
+    values = []
+    for command in [intent] + list(intent.get("actions") or []):
+        if isinstance(command.get("target"), str):
+            values.append(command["target"])
+        for key in ("params", "arguments"):
+            for value in (command.get(key) or {}).values():
+                if isinstance(value, str):
+                    values.append(value)
+    return values
+
+
+class IntentCache:
+    """
+    A persistent cache of parsed intents, keyed by normalized utterance.
+
+    Exact matches are a dict lookup. Near matches ("open YouTube please" vs
+    "open youtube") go through a FAISS inner-product index over sentence
+    embeddings. A semantic hit is only accepted if every target/parameter in
+    the cached intent also appears in the new utterance, so "create file a.txt"
+    can never be answered with the cached intent for "create file b.txt".
+    Utterances that refer to the conversation ("open it") are never cached.
+    """
+
+    def __init__(self, path: str, prompt: str, threshold: float, max_entries: int, ttl_s: float):
+        self.path = path
+        self.index_path = path + ".faiss"
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        # Any change to the system prompt can change what the model returns.
+        self.prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+        self.entries = OrderedDict()  # normalized utterance -> entry
+        self.keys_by_id = {}
+        self.next_id = 0
+        self.index = None
+        self.lock = threading.Lock()
+
+        self.lookups = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.lookup_time = 0.0
+        self.saved_time = 0.0
+
+        self._load()
+
+    # --- Persistence ---
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Warning: Ignoring unreadable intent cache ({e}).")
+            return
+        if data.get("prompt_hash") != self.prompt_hash:
+            print("♻️ System prompt changed, invalidating the intent cache.")
+            return
+        for entry in data.get("entries", []):
+            self.entries[entry["key"]] = entry
+            self.keys_by_id[entry["id"]] = entry["key"]
+        self.next_id = data.get("next_id", len(self.entries))
+        self._evict_expired()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "prompt_hash": self.prompt_hash,
+            "next_id": self.next_id,
+            "entries": list(self.entries.values()),
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        if self.index is not None:
+            import faiss
+            faiss.write_index(self.index, self.index_path)
+
+    def _ensure_index(self) -> bool:
+        """Loads or rebuilds the FAISS index. Returns False if embeddings are unavailable."""
+        if self.index is not None:
+            return True
+        try:
+            import faiss
+            import numpy as np
+        except ImportError:
+            return False
+
+        if os.path.exists(self.index_path):
+            index = faiss.read_index(self.index_path)
+            if index.ntotal == len(self.entries):
+                self.index = index
+                return True
+
+        # Missing or stale on disk: re-embed what we have.
+        probe = embeddings.embed(["probe"])
+        if probe is None:
+            return False
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(probe.shape[1]))
+        if self.entries:
+            keys = list(self.entries)
+            ids = np.array([self.entries[key]["id"] for key in keys], dtype="int64")
+            index.add_with_ids(embeddings.embed(keys), ids)
+        self.index = index
+        return True
+
+    # --- Eviction ---
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key)
+        self.keys_by_id.pop(entry["id"], None)
+        if self.index is not None:
+            import numpy as np
+            self.index.remove_ids(np.array([entry["id"]], dtype="int64"))
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.ttl_s
+        for key in [key for key, entry in self.entries.items() if entry["created"] < cutoff]:
+            self._remove(key)
+
+    def _evict_lru(self):
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+
+    # --- Public API ---
+
+    def lookup(self, user_text: str) -> dict | None:
+        """
+        Returns a cached intent for the utterance, or None on a miss.
+
+        Args:
+            user_text: The raw text from the user.
+
+        Returns:
+            A copy of the cached intent dictionary, or None.
+        """
+        start = time.perf_counter()
+        key = normalize_utterance(user_text)
+        if depends_on_context(key):
+            return None
+        with self.lock:
+            self.lookups += 1
+            entry = self.entries.get(key)
+            if entry and entry["created"] < time.time() - self.ttl_s:
+                self._remove(key)
+                entry = None
+            if entry:
+                self.exact_hits += 1
+            elif self.entries and self._ensure_index():
+                entry = self._semantic_lookup(key)
+                if entry:
+                    self.semantic_hits += 1
+
+            elapsed = time.perf_counter() - start
+            self.lookup_time += elapsed
+            if not entry:
+                return None
+            self.entries.move_to_end(entry["key"])
+            self.saved_time += max(0.0, entry["llm_latency"] - elapsed)
+            print(f"🗃️ Intent cache hit for '{entry['key']}' ({elapsed * 1000:.1f} ms, saved ~{entry['llm_latency']:.2f}s)")
+            return copy.deepcopy(entry["intent"])
+
+    def _semantic_lookup(self, key: str) -> dict | None:
+        vector = embeddings.embed([key])
+        if vector is None or self.index.ntotal == 0:
+            return None
+        scores, ids = self.index.search(vector, 1)
+        if ids[0][0] < 0 or scores[0][0] < self.threshold:
+            return None
+        entry = self.entries.get(self.keys_by_id.get(int(ids[0][0])))
+        if not entry:
+            return None
+        if not all(_contains_slot(value, key) for value in _slot_values(entry["intent"])):
+            return None
+        return entry
+
+    def store(self, user_text: str, intent: dict, llm_latency: float):
+        """
+        Adds a freshly parsed intent to the cache.
+
+        Args:
+            user_text: The raw text from the user.
+            intent: The intent dictionary returned by the model.
+            llm_latency: How long the model took, used to report latency saved on hits.
+        """
+        key = normalize_utterance(user_text)
+        if not key or depends_on_context(key):
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            entry = {
+                "key": key,
+                "id": self.next_id,
+                "intent": copy.deepcopy(intent),
+                "created": time.time(),
+                "llm_latency": llm_latency,
+            }
+            self.next_id += 1
+            self.entries[key] = entry
+            self.keys_by_id[entry["id"]] = key
+            if self._ensure_index():
+                import numpy as np
+                self.index.add_with_ids(embeddings.embed([key]), np.array([entry["id"]], dtype="int64"))
+            self._evict_lru()
+            self._save()
+
+    def summary(self) -> dict:
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "entries": len(self.entries),
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "hit_ratio": hits / self.lookups if self.lookups else 0.0,
+            "avg_lookup_ms": (self.lookup_time / self.lookups) * 1000 if self.lookups else 0.0,
+            "saved_s": self.saved_time,
+        }
+
+
+_cache = None
+
+
+def get_intent_cache(prompt: str) -> IntentCache:
+    """Returns the process-wide intent cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = IntentCache(
+            INTENT_CACHE_PATH,
+            prompt,
+            threshold=INTENT_CACHE_THRESHOLD,
+            max_entries=INTENT_CACHE_MAX_ENTRIES,
+            ttl_s=INTENT_CACHE_TTL_S,
+        )
+    return _cache
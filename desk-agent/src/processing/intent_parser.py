@@ -1,69 +1,82 @@
 # src/processing/intent_parser.py
 
-from config import INTENT_MODEL
-from src.routing.model_router import get_llm_response
-from src.utils.json_parser import extract_json_from_response
-
-# This is the master prompt that guides the LLM to act as an intent parser.
-SYSTEM_PROMPT = """You are Spark, a smart voice assistant for developers on Windows.
-
-### CONTEXT:
-- **User Summary**: {summary}
-- **Recent History**: {recent}
-- **Relevant Memory**: {vector_hits}
-- **Current Directory**: {current_directory}
-- **User Said**: {query}
-- **OS**: {os_context}
-
-### TASK:
-Analyze the user's request and return a structured JSON describing the intent. Follow these rules:
-- Return **valid JSON only**, no explanations.
-- Always include a `message` summarizing the action(s).
-- For simple tasks, return a JSON with `type` as "os", "code", or "assistant".
-- For complex tasks, return `type`: "sequence" with a list of actions.
-
-### INTENT JSON FORMAT:
-{
-  "type": "os" | "code" | "assistant" | "sequence",
-  "intent": "action_name",           # Required: Core action (e.g., "create_file")
-  "action_type": "category",         # Category (e.g., "os", "git", "codegen")
-  "target": "file_or_dir",           # Optional: Subject of the action
-  "params": {},                      # Optional: Additional arguments (e.g., "commit_message")
-  "confidence": 0.91,                # Optional: Confidence in the intent (0.0 to 1.0)
-  "requires_confirmation": false,    # Optional: For sensitive actions (e.g., delete)
-  "is_multi_step": false,            # Optional: If further planning is needed
-  "message": "Action summary."       # Required: Summary of the action
-}
-
-### SUPPORTED ACTIONS (with examples):
-- **open_application**: Open an app (e.g., "Open Chrome" → { "intent": "open_application", "app_name": "chrome" })
-- **create_file**: Create a file (e.g., "Make a file called notes.txt" → { "intent": "create_file", "target": "notes.txt" })
-- **delete_file**: Delete a file (e.g., "Delete resume.pdf" → { "intent": "delete_file", "target": "resume.pdf", "requires_confirmation": true })
-- **git_init**: Initialize a Git repo (e.g., "Start a new Git repo here" → { "intent": "git_init", "target": "." })
-- **git_commit**: Commit changes (e.g., "Commit with message 'Initial commit'" → { "intent": "git_commit", "params": { "message": "Initial commit" } })
-- **generate_code**: Generate code (e.g., "Generate a Python function to add two numbers" → { "intent": "generate_code", "params": { "language": "python", "task": "add two numbers" } })
-
-### MULTI-STEP ACTIONS:
-For tasks requiring multiple steps, return a sequence:
-{
-  "type": "sequence",
-  "message": "Setting up a new Python project.",
-  "actions": [
-    { "type": "os", "intent": "create_folder", "target": "my_project", "message": "Creating project folder." },
-    { "type": "os", "intent": "create_file", "target": "my_project/main.py", "message": "Creating main.py." },
-    { "type": "git", "intent": "git_init", "target": "my_project", "message": "Initializing Git repo." }
-  ]
-}
-
-### GUIDELINES:
-- Use `confidence` to indicate certainty (e.g., 0.95 for clear commands, 0.60 for ambiguous ones).
-- If unsure, set `requires_confirmation` to true and provide a `message` for clarification.
-- For complex tasks, break them into smaller actions in the `actions` list.
-- Extract parameters accurately (e.g., file names, commit messages).
-- Do NOT generate code unless the intent is "code".
-
-Return JSON only.
-"""
+import asyncio
+import time
+
+from config import FAST_PATH_MIN_CONFIDENCE, CONSTRAINED_DECODING, INTENT_MAX_TOKENS
+from src.processing import fast_path, prompt_builder
+from src.memory.conversation_history import get_memory, remember_in_background
+from src.processing.intent_cache import get_intent_cache
+from src.routing.model_router import OutputTruncated, get_llm_response, stream_llm_response
+from src.utils import tracing
+from src.utils.json_parser import parse_intent_response, IncrementalJSONParser, INTENT_OUTPUT_SCHEMA
+
+# The master prompt that guides the LLM to act as an intent parser. It is static (see
+# prompt_builder), so the model server can keep its prefill cached between requests.
+SYSTEM_PROMPT = prompt_builder.SYSTEM_PROMPT
+
+async def _lookup_local(user_text: str) -> dict | None:
+    """Answers the command without the model, from the fast path or the intent cache."""
+    # Simple, unambiguous commands are recognized locally in microseconds.
+    with tracing.span("intent.fast_path") as span:
+        fast_command = fast_path.match_fast_path(user_text)
+        span.set(hit=bool(fast_command))
+    if fast_command and fast_command["confidence"] >= FAST_PATH_MIN_CONFIDENCE:
+        print(f"⚡ Fast path matched intent: '{fast_command['intent']}'")
+        return fast_command
+
+    # Near-identical commands reuse an earlier parse instead of asking the model again.
+    with tracing.span("intent.cache") as span:
+        cache = get_intent_cache(SYSTEM_PROMPT)
+        cached = await asyncio.to_thread(cache.lookup, user_text)
+        span.set(hit=cached is not None)
+    return cached
+
+
+async def _build_messages(user_text: str) -> list:
+    with tracing.span("intent.prompt"):
+        # Earlier turns and knowledge/ facts that relate to this request.
+        # get_memory() loads the memory and syncs knowledge/ on first use, so it runs off the loop too.
+        vector_hits = await asyncio.to_thread(lambda: get_memory().recall(user_text))
+        return prompt_builder.get_prompt_builder().build_messages(user_text, vector_hits=vector_hits)
+
+
+def expected_kind(user_text: str) -> str:
+    """Guesses whether the command is one action ("single") or several ("sequence"), to pick its token cap."""
+    return "sequence" if fast_path.MULTI_STEP_MARKERS.search(user_text.lower()) else "single"
+
+
+def decoding_options(user_text: str, constrained: bool = CONSTRAINED_DECODING, kind: str | None = None) -> dict:
+    """Model options for an intent parse: schema-constrained output and a token cap for the expected kind of intent."""
+    if not constrained:
+        return {}
+    return {"json_schema": INTENT_OUTPUT_SCHEMA, "max_tokens": INTENT_MAX_TOKENS[kind or expected_kind(user_text)]}
+
+
+async def _complete_intent(messages: list, user_text: str, kind: str) -> str | None:
+    """
+    Asks the model for the intent, retrying once with the sequence cap if the output was cut off.
+
+    The marker words only guess at the kind ("set up a project with a tests folder"
+    is several steps), and a cut-off answer must never be repaired into a partial plan.
+    """
+    while True:
+        try:
+            return await get_llm_response(messages=messages, request_class="intent",
+                                          **decoding_options(user_text, kind=kind))
+        except OutputTruncated as e:
+            if kind == "sequence":
+                print(f"❌ Error: The intent was cut off ({e}).")
+                return None
+            print(f"✂️ The intent was cut off ({e}); asking again with the sequence cap.")
+            kind = "sequence"
+
+
+def _remember(user_text: str, command: dict | None):
+    prompt_builder.get_prompt_builder().remember(user_text, command)
+    if command:
+        remember_in_background(user_text, command)
+
 
 async def parse_intent(user_text: str) -> dict | None:
     """
@@ -75,18 +88,104 @@ async def parse_intent(user_text: str) -> dict | None:
     Returns:
         A dictionary representing the parsed command, or None on failure.
     """
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_text},
-    ]
+    local_command = await _lookup_local(user_text)
+    if local_command:
+        _remember(user_text, local_command)
+        return local_command
 
     print("🤖 Parsing intent...")
-    llm_response = await get_llm_response(messages=messages, model_name=INTENT_MODEL)
+    start = time.perf_counter()
+    messages = await _build_messages(user_text)
+    with tracing.span("intent.llm"):
+        llm_response = await _complete_intent(messages, user_text, expected_kind(user_text))
+    llm_latency = time.perf_counter() - start
+    fast_path.stats.record_llm_call(llm_latency)
 
     if not llm_response:
         return None
 
-    # Use our utility to safely extract the JSON from the response
-    parsed_json = extract_json_from_response(llm_response)
+    # Extract the JSON, repairing what can be repaired, and check it has the shape of an intent
+    with tracing.span("json.extract"):
+        parsed_json = parse_intent_response(llm_response)
     print(parsed_json)
-    return parsed_json
\ No newline at end of file
+    _remember(user_text, parsed_json)
+    if parsed_json:
+        cache = get_intent_cache(SYSTEM_PROMPT)
+        await asyncio.to_thread(cache.store, user_text, parsed_json, llm_latency)
+    return parsed_json
+
+
+async def stream_intent(user_text: str):
+    """
+    Parses the user's text like parse_intent, but reports parts of the intent as they stream in.
+
+    Args:
+        user_text: The raw text from the user.
+
+    Yields:
+        ("field", key, value) and ("action", index, action) events while the model
+        is generating, then a final ("intent", None, command) event where command
+        is the full parsed dictionary (or None on failure).
+    """
+    local_command = await _lookup_local(user_text)
+    if local_command:
+        _remember(user_text, local_command)
+        yield ("intent", None, local_command)
+        return
+
+    print("🤖 Parsing intent (streaming)...")
+    start = time.perf_counter()
+    messages = await _build_messages(user_text)
+    parser = IncrementalJSONParser()
+    chunks = []
+    streamed_actions = []
+    kind = expected_kind(user_text)
+    truncated = None
+    # Not a `with` block: this is a generator, and the span would become current for whoever iterates it.
+    llm_span = tracing.start_span("intent.llm", streaming=True)
+    try:
+        async for chunk in stream_llm_response(messages=messages, request_class="intent",
+                                               **decoding_options(user_text, kind=kind)):
+            chunks.append(chunk)
+            for event, key, value in parser.feed(chunk):
+                if event == "action":
+                    streamed_actions.append(value)
+                if event != "done":
+                    yield (event, key, value)
+    except OutputTruncated as e:
+        truncated = e
+    finally:
+        llm_span.end(truncated=truncated is not None)
+    if truncated is not None:
+        # Never repaired into a partial plan. Only complete actions were streamed; the rest comes from a full answer.
+        chunks = []
+        if kind == "single":
+            print(f"✂️ The intent was cut off ({truncated}); asking again with the sequence cap.")
+            with tracing.span("intent.llm", retry=True):
+                response = await _complete_intent(messages, user_text, "sequence")
+            chunks = [response] if response else []
+        else:
+            print(f"❌ Error: The intent was cut off ({truncated}).")
+    llm_latency = time.perf_counter() - start
+    fast_path.stats.record_llm_call(llm_latency)
+
+    # The incremental events are a head start; the full parse is still the source of truth.
+    with tracing.span("json.extract"):
+        parsed_json = parse_intent_response("".join(chunks)) if chunks else None
+    if parsed_json and truncated is not None and not _starts_with(parsed_json, streamed_actions):
+        # Steps from the cut-off answer may already be running; a different plan can't be continued.
+        print("⚠️ Warning: The retried intent doesn't match the steps already streamed.")
+        parsed_json = None
+    print(parsed_json)
+    _remember(user_text, parsed_json)
+    if parsed_json:
+        cache = get_intent_cache(SYSTEM_PROMPT)
+        await asyncio.to_thread(cache.store, user_text, parsed_json, llm_latency)
+    yield ("intent", None, parsed_json)
+
+
+def _starts_with(command: dict, actions: list[dict]) -> bool:
+    def key(action):
+        return action.get("intent"), action.get("target")
+    planned = command.get("actions") or []
+    return [key(a) for a in planned[:len(actions)]] == [key(a) for a in actions]
@@ -0,0 +1,182 @@
+# src/processing/jobs.py
+
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import TOOL_MAX_WORKERS, MAX_CONCURRENT_CREWS
+from src.utils.tracing import wrap_context
+
+# Finished jobs kept around for the "jobs" command.
+MAX_FINISHED_JOBS = 50
+
+
+class JobCancelled(Exception):
+    """Raised inside a job (e.g. from a CrewAI step callback) once it has been cancelled."""
+
+
+class Job:
+    """One unit of blocking work running off the event loop."""
+
+    def __init__(self, job_id: int, kind: str, description: str):
+        self.id = job_id
+        self.kind = kind                # "tool" or "crew"
+        self.description = description
+        self.status = "queued"          # queued -> running -> done | failed | cancelled
+        self.result = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def describe(self) -> str:
+        return f"#{self.id} [{self.kind}] {self.status} ({self.elapsed:.1f}s): {self.description}"
+
+
+class JobManager:
+    """
+    Runs blocking tools and CrewAI crews on worker threads so the asyncio loop
+    (and the Tk window it feeds) never freezes.
+
+    Tools are awaited like normal coroutines. Crews are fire-and-forget: they
+    get a job ID straight away, report progress through listeners, and at most
+    MAX_CONCURRENT_CREWS run at once (the rest wait in the queue). Threads are
+    used rather than processes because crews and tools hold unpicklable
+    objects; a running job is cancelled cooperatively, through cancel_event.
+    """
+
+    def __init__(self, tool_workers: int, max_crews: int):
+        self.tool_pool = ThreadPoolExecutor(max_workers=tool_workers, thread_name_prefix="tool-job")
+        self.crew_pool = ThreadPoolExecutor(max_workers=max_crews, thread_name_prefix="crew-job")
+        self.jobs = {}
+        self.listeners = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """Registers listener(job, message), called from worker threads on progress and completion."""
+        self.listeners.append(listener)
+
+    def _notify(self, job: Job, message: str):
+        for listener in self.listeners:
+            try:
+                listener(job, message)
+            except Exception as e:
+                print(f"⚠️ Warning: Job listener failed: {e}")
+
+    def _new_job(self, kind: str, description: str) -> Job:
+        with self._lock:
+            job = Job(next(self._ids), kind, description)
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.finished]
+            for old in finished[:-MAX_FINISHED_JOBS]:
+                del self.jobs[old.id]
+        return job
+
+    def _run(self, job: Job, func, *args):
+        if job.cancel_event.is_set():
+            job.status, job.finished = "cancelled", time.time()
+            return None
+        job.status, job.started = "running", time.time()
+        try:
+            result = func(*args)
+            job.status = "cancelled" if job.cancel_event.is_set() else "done"
+        except JobCancelled:
+            job.status, result = "cancelled", None
+        except Exception:
+            job.status = "failed"
+            raise
+        finally:
+            job.finished = time.time()
+        job.result = result
+        return result
+
+    async def run_blocking(self, func, *args, description: str = "", cancel_event: threading.Event | None = None) -> str:
+        """
+        Runs a synchronous tool on the tool pool and waits for its result.
+
+        Args:
+            func: The blocking function to call.
+            *args: Positional arguments for func.
+            description: A short label shown in the job list.
+            cancel_event: Shared with other jobs so they can be called off together. A tool
+                can't be interrupted, so it only stops the job if it is set before the job starts.
+
+        Returns:
+            Whatever func returns, or None if the job was cancelled before it started.
+        """
+        job = self._new_job("tool", description or getattr(func, "__name__", "tool"))
+        if cancel_event is not None:
+            job.cancel_event = cancel_event
+        loop = asyncio.get_running_loop()
+        # Carry the caller's trace over to the worker thread.
+        job.future = loop.run_in_executor(self.tool_pool, wrap_context(self._run), job, func, *args)
+        return await job.future
+
+    def start_crew(self, func, description: str) -> Job:
+        """
+        Starts a long-running crew without waiting for it.
+
+        Args:
+            func: Called as func(progress, cancel_event) on a crew worker thread.
+                `progress(message)` reports to the listeners; the function should
+                stop (or raise JobCancelled) once `cancel_event` is set.
+            description: A short label shown in the job list.
+
+        Returns:
+            The new Job. Its result is delivered to the listeners when it finishes.
+        """
+        job = self._new_job("crew", description)
+
+        def progress(message: str):
+            if not job.cancel_event.is_set():
+                self._notify(job, message)
+
+        def done(future):
+            if future.cancelled():
+                job.status, job.finished = "cancelled", time.time()
+                self._notify(job, "🛑 Cancelled before it started.")
+            elif future.exception() is not None:
+                self._notify(job, f"❌ Failed: {future.exception()}")
+            elif job.status == "cancelled":
+                self._notify(job, "🛑 Cancelled.")
+            else:
+                self._notify(job, f"{future.result()}\n⏱️ Took {job.elapsed:.1f}s.")
+
+        job.future = self.crew_pool.submit(wrap_context(self._run), job, func, progress, job.cancel_event)
+        job.future.add_done_callback(done)
+        return job
+
+    def cancel(self, job_id: int) -> str:
+        """Cancels a queued job outright, or asks a running one to stop."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return f"❌ Error: No job with ID {job_id}."
+        if job.finished:
+            return f"Job #{job_id} has already {job.status}."
+        if job.kind != "crew":
+            return f"❌ Error: Job #{job_id} is a quick tool call and can't be cancelled."
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            return f"🛑 Job #{job_id} cancelled before it started."
+        return f"🛑 Cancelling job #{job_id}; it will stop at its next step."
+
+    def active_crews(self) -> list[Job]:
+        return [job for job in self.jobs.values() if job.kind == "crew" and not job.finished]
+
+    def describe_jobs(self) -> str:
+        if not self.jobs:
+            return "No jobs yet."
+        return "\n".join(job.describe() for job in self.jobs.values())
+
+
+job_manager = JobManager(tool_workers=TOOL_MAX_WORKERS, max_crews=MAX_CONCURRENT_CREWS)
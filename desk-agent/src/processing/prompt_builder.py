@@ -0,0 +1,115 @@
+# src/processing/prompt_builder.py
+
+import os
+import platform
+from collections import deque
+
+from config import RECENT_HISTORY_TURNS
+from src.processing.tool_registry import get_tool_registry
+
+# The system prompt is assembled from these sections. It contains no per-request
+# data, so it stays byte-identical across calls and the model server can reuse
+# its KV cache for it instead of re-evaluating the whole prefix every time.
+PERSONA = "You are Spark, a smart voice assistant for developers."
+
+TASK_RULES = """### TASK
+Turn the user's request into one JSON intent.
+- Return valid JSON only, no explanations.
+- `action_type` comes first and is one of:
+  "os" (files, folders, apps), "git" (repositories), "chat" (questions and conversation),
+  "crew" (writing code or planning a project), or "sequence" (several steps, listed in `actions`).
+- Always include `action_type`, `intent`, `target` (null if there is none) and a `message` summarizing the action(s)."""
+
+INTENT_FORMAT = """### INTENT JSON FORMAT
+{"action_type": "os"|"git"|"chat"|"crew"|"sequence", "intent": "action_name", "target": "file_or_dir"|null,
+ "params": {}, "arguments": {}, "requires_confirmation": false, "confidence": 0.91, "message": "Action summary."}
+Required: action_type, intent, target, message. No other keys.
+- Questions: {"action_type": "chat", "intent": "chat", "target": null, "arguments": {"query": "the question"}, "message": "Answering."}
+- Code: {"action_type": "crew", "intent": "generate_code", "target": null, "arguments": {"topic": "what to build"}, "message": "Writing the code."}"""
+
+MULTI_STEP = """### MULTI-STEP
+{"action_type": "sequence", "intent": "setup_project", "target": "my_project", "message": "Setting up a new Python project.", "actions": [
+ {"action_type": "os", "intent": "create_folder", "target": "my_project", "message": "Creating project folder."},
+ {"action_type": "os", "intent": "create_file", "target": "my_project/main.py", "message": "Creating main.py."},
+ {"action_type": "git", "intent": "git_init", "target": "my_project", "message": "Initializing Git repo."}]}
+Each step has the same fields as a single intent; a step's action_type is never "sequence"."""
+
+GUIDELINES = """### GUIDELINES
+- `confidence`: about 0.95 for clear commands, 0.60 for ambiguous ones.
+- If unsure, set `requires_confirmation` to true and ask for clarification in `message`.
+- Extract parameters accurately (file names, commit messages).
+- Do NOT generate code yourself; code requests are "crew" intents.
+- The user's message starts with a CONTEXT block; use it to resolve "here", "it", "that file", etc.
+Return JSON only."""
+
+
+def build_system_prompt(supported_actions: str | None = None) -> str:
+    """
+    Assembles the static system prompt.
+
+    Args:
+        supported_actions: The SUPPORTED ACTIONS section to use (default: generated from the tool registry).
+
+    Returns:
+        The prompt text. The same arguments always give the same bytes.
+    """
+    if supported_actions is None:
+        supported_actions = get_tool_registry().supported_actions()
+    return "\n\n".join([PERSONA, TASK_RULES, INTENT_FORMAT, supported_actions, MULTI_STEP, GUIDELINES])
+
+
+SYSTEM_PROMPT = build_system_prompt()
+
+
+class PromptBuilder:
+    """
+    Builds intent-parsing messages: the static system prompt, then only the dynamic context.
+
+    The context lines go from the most stable (OS, directory) to the most volatile
+    (recent history, the request itself), so consecutive prompts share as long a
+    prefix as possible.
+    """
+
+    def __init__(self, system_prompt: str = SYSTEM_PROMPT, history_turns: int = RECENT_HISTORY_TURNS):
+        self.system_prompt = system_prompt
+        self.summary = ""
+        self.recent = deque(maxlen=history_turns)
+        self.os_context = f"{platform.system()} {platform.release()}".strip()
+
+    def remember(self, user_text: str, command: dict | None):
+        """Adds a handled request to the recent history shown to the model."""
+        if command:
+            self.recent.append(f"\"{user_text}\" → {command.get('intent') or command.get('type')}")
+
+    def context_block(self, vector_hits: list[str] | None = None) -> str:
+        lines = [f"- OS: {self.os_context}", f"- Current directory: {os.getcwd()}"]
+        if self.summary:
+            lines.append(f"- User summary: {self.summary}")
+        if vector_hits:
+            lines.append("- Relevant memory: " + "; ".join(vector_hits))
+        if self.recent:
+            lines.append("- Recent history: " + "; ".join(self.recent))
+        return "### CONTEXT\n" + "\n".join(lines)
+
+    def build_messages(self, user_text: str, vector_hits: list[str] | None = None) -> list:
+        """
+        Returns the chat messages for one intent-parsing request.
+
+        Args:
+            user_text: What the user said.
+            vector_hits: Optional snippets of relevant long-term memory.
+        """
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": f"{self.context_block(vector_hits)}\n\n### USER SAID\n{user_text}"},
+        ]
+
+
+_builder = None
+
+def get_prompt_builder() -> PromptBuilder:
+    """Returns the session's prompt builder (it holds the recent history)."""
+    global _builder
+    if _builder is None:
+        _builder = PromptBuilder()
+    return _builder
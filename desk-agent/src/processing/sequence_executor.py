@@ -0,0 +1,146 @@
+# src/processing/sequence_executor.py
+
+import asyncio
+import os
+import threading
+import time
+
+from src.processing.jobs import job_manager
+
+PATH_KEYS = ("target", "source", "destination")
+
+
+def _action_paths(action: dict) -> list[str]:
+    """Returns the normalized absolute paths an action touches."""
+    paths = []
+    for key in PATH_KEYS:
+        value = action.get(key) or (action.get("params") or {}).get(key)
+        if isinstance(value, str) and value:
+            paths.append(os.path.normcase(os.path.abspath(value)))
+    return paths
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """True if the paths are equal or one contains the other."""
+    if a == b:
+        return True
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return longer.startswith(shorter.rstrip(os.sep) + os.sep)
+
+
+def depends_on(later: dict, earlier: dict) -> bool:
+    """
+    Decides whether a step must wait for an earlier one.
+
+    Steps depend on each other when their targets overlap (creating a folder,
+    then a file inside it). A step with no target at all (e.g. git_commit)
+    could touch anything, so it is ordered against every other step.
+    """
+    later_paths, earlier_paths = _action_paths(later), _action_paths(earlier)
+    if not later_paths or not earlier_paths:
+        return True
+    return any(_overlaps(a, b) for a in later_paths for b in earlier_paths)
+
+
+class SequenceExecutor:
+    """
+    Runs the steps of a 'sequence' command as a dependency graph.
+
+    Steps can be submitted one at a time (e.g. while they stream in). Each step
+    waits only for the earlier steps it depends on; independent steps run
+    concurrently on the job manager's bounded tool pool. After the first error no new steps are
+    started, matching the old one-at-a-time behaviour: steps still waiting for a worker are
+    cancelled, but a step that is already running can't be interrupted and completes. The
+    report says which steps ran after the failure and how many were skipped.
+    """
+
+    def __init__(self, run_step):
+        """
+        Args:
+            run_step: A synchronous function that executes one action and returns its result message.
+        """
+        self.run_step = run_step
+        self.actions = []
+        self.tasks = []
+        self.outcomes = {}  # index -> (result message, seconds)
+        self.failed = False
+        self.ran_after_failure = []  # indexes of steps that were already running when one failed
+        self.cancel_event = threading.Event()
+        self.start_time = None
+
+    @property
+    def submitted(self) -> int:
+        return len(self.actions)
+
+    def submit(self, action: dict):
+        """Schedules a step behind the earlier steps it depends on. Must be called from the event loop."""
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        index = len(self.actions)
+        dependencies = [self.tasks[i] for i, earlier in enumerate(self.actions) if depends_on(action, earlier)]
+        self.actions.append(action)
+        self.tasks.append(asyncio.ensure_future(self._run(index, action, dependencies)))
+
+    async def _run(self, index: int, action: dict, dependencies: list):
+        if dependencies:
+            await asyncio.gather(*dependencies)
+        if self.failed:
+            return
+        start = time.perf_counter()
+        result_msg = await job_manager.run_blocking(
+            self._run_step, action, description=f"sequence step {index + 1}: {action.get('intent')}",
+            cancel_event=self.cancel_event,
+        )
+        if result_msg is None:
+            return  # cancelled before it started
+        self.outcomes[index] = (result_msg, time.perf_counter() - start)
+        if self.failed:
+            self.ran_after_failure.append(index)
+        elif "❌ Error" in result_msg:
+            self.failed = True
+
+    def _run_step(self, action: dict) -> str:
+        result_msg = self.run_step(action)
+        if "❌ Error" in result_msg:
+            # Set on the worker thread, before it picks up the next queued step.
+            self.cancel_event.set()
+        return result_msg
+
+    async def finish(self) -> list[str]:
+        """
+        Waits for every submitted step.
+
+        Returns:
+            The result messages in submission order, followed by a note on what
+            happened to the remaining steps if one of them failed.
+        """
+        if self.tasks:
+            await asyncio.gather(*self.tasks)
+        results = [
+            f"{self.outcomes[i][0]} ({self.outcomes[i][1] * 1000:.0f} ms)"
+            for i in range(len(self.actions)) if i in self.outcomes
+        ]
+        if self.failed:
+            results.append(self._stop_note())
+        return results
+
+    def _stop_note(self) -> str:
+        note = "Sequence stopped due to an error."
+        if self.ran_after_failure:
+            steps = ", ".join(str(i + 1) for i in sorted(self.ran_after_failure))
+            note += f" Step(s) {steps} were already running and still completed."
+        skipped = len(self.actions) - len(self.outcomes)
+        if skipped:
+            note += f" {skipped} step(s) were not run."
+        return note
+
+    async def run(self, actions: list[dict]) -> str:
+        """Runs a complete list of steps and returns the combined report."""
+        for action in actions:
+            self.submit(action)
+        results = await self.finish()
+        if self.outcomes:
+            wall = time.perf_counter() - self.start_time
+            busy = sum(seconds for _, seconds in self.outcomes.values())
+            results.append(f"⏱️ {len(self.outcomes)} step(s) in {wall * 1000:.0f} ms (step total {busy * 1000:.0f} ms).")
+        return "\n".join(results)
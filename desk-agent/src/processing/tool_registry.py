@@ -0,0 +1,254 @@
+# src/processing/tool_registry.py
+
+import ast
+import importlib
+import inspect
+import json
+import os
+import threading
+
+from config import TOOL_DIRECTORIES, TOOL_MANIFEST_PATH
+
+MANIFEST_VERSION = 2
+
+
+def tool(name: str, example: str = "", call: dict | None = None, action_type: str = "os",
+         requires_confirmation: bool = False, hidden: bool = False):
+    """
+    Marks a function (or a class with a run() method) as a tool the intent model can call.
+
+    The registry reads these arguments from the source without importing the
+    module, so they must be literals.
+
+    Args:
+        name: The intent name, e.g. "create_file".
+        example: A request that should map to this tool, e.g. "Make a file called notes.txt".
+        call: The arguments the model should extract for that example, e.g. {"target": "notes.txt"}.
+        action_type: How route_action dispatches the intent ("os" for simple tools).
+        requires_confirmation: Whether the user must confirm before it runs.
+        hidden: Leave it out of the prompt; for tools the agent calls itself (e.g. git_batch).
+    """
+    def mark(obj):
+        obj.tool_name = name
+        return obj
+    return mark
+
+
+class ToolSpec:
+    """What the manifest knows about one tool, without its module being imported."""
+
+    def __init__(self, name: str, module: str, attribute: str, kind: str, description: str = "",
+                 example: str = "", call: dict | None = None, action_type: str = "os",
+                 requires_confirmation: bool = False, hidden: bool = False, params: list | None = None,
+                 accepts_any: bool = False):
+        self.name = name
+        self.module = module                # dotted module path, imported on first call
+        self.attribute = attribute          # function or class name in the module
+        self.kind = kind                    # "function" or "class"
+        self.description = description
+        self.example = example
+        self.call = call or {}
+        self.action_type = action_type
+        self.requires_confirmation = requires_confirmation
+        self.hidden = hidden
+        self.params = params or []          # [{"name", "type", "required"}]
+        self.accepts_any = accepts_any      # takes **kwargs
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    def prompt_line(self) -> str:
+        """This tool's entry in the SUPPORTED ACTIONS section of the system prompt."""
+        # action_type first and target always present, as the output schema requires.
+        intent = {"action_type": self.action_type, "intent": self.name, "target": None}
+        intent.update(self.call)
+        if self.requires_confirmation:
+            intent["requires_confirmation"] = True
+        example = f'"{self.example}" → ' if self.example else ""
+        return f"- {self.name}: {example}{json.dumps(intent, ensure_ascii=False)}"
+
+
+def _is_tool_decorator(node) -> bool:
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    return (isinstance(func, ast.Name) and func.id == "tool") or (isinstance(func, ast.Attribute) and func.attr == "tool")
+
+
+def _params_of(function: ast.FunctionDef, skip_self: bool) -> tuple[list, bool]:
+    args = function.args
+    positional = args.posonlyargs + args.args
+    if skip_self and positional:
+        positional = positional[1:]
+    required_from = len(positional) - len(args.defaults)
+    params = [
+        {"name": arg.arg, "type": ast.unparse(arg.annotation) if arg.annotation else None, "required": i < required_from}
+        for i, arg in enumerate(positional)
+    ]
+    params += [
+        {"name": arg.arg, "type": ast.unparse(arg.annotation) if arg.annotation else None, "required": default is None}
+        for arg, default in zip(args.kwonlyargs, args.kw_defaults)
+    ]
+    return params, args.kwarg is not None
+
+
+def scan_source(source: str, module: str) -> list[dict]:
+    """Finds the @tool-decorated functions and classes in a module's source, without running it."""
+    specs = []
+    for node in ast.parse(source).body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        decorator = next((d for d in node.decorator_list if _is_tool_decorator(d)), None)
+        if decorator is None:
+            continue
+        options = {key.arg: ast.literal_eval(key.value) for key in decorator.keywords}
+        if decorator.args:
+            options["name"] = ast.literal_eval(decorator.args[0])
+        if isinstance(node, ast.ClassDef):
+            run = next((n for n in node.body if isinstance(n, ast.FunctionDef) and n.name in ("_run", "run")), None)
+            params, accepts_any = _params_of(run, skip_self=True) if run else ([], True)
+            kind = "class"
+        else:
+            params, accepts_any = _params_of(node, skip_self=False)
+            kind = "function"
+        docstring = ast.get_docstring(node) or ""
+        specs.append(ToolSpec(
+            module=module, attribute=node.name, kind=kind,
+            description=docstring.strip().split("\n", 1)[0],
+            params=params, accepts_any=accepts_any, **options,
+        ).as_dict())
+    return specs
+
+
+class ToolRegistry:
+    """
+    Discovers tools from source files and imports each one only when it's first called.
+
+    Every .py file in the tool directories is scanned once with `ast` for @tool
+    declarations; the results are kept in a manifest keyed by each file's size
+    and modification time, so later startups only stat the files and re-scan
+    the ones that changed. Nothing is imported until a tool is called, and
+    dispatching after that is a dictionary lookup.
+    """
+
+    def __init__(self, directories: list[str] = TOOL_DIRECTORIES, manifest_path: str = TOOL_MANIFEST_PATH):
+        self.directories = directories
+        self.manifest_path = manifest_path
+        self.specs = {}         # intent -> ToolSpec
+        self._callables = {}    # intent -> loaded function
+        self._lock = threading.Lock()
+        self.load()
+
+    # --- Manifest ---
+
+    def load(self):
+        """Builds the tool list from the manifest, re-scanning only new or changed files."""
+        cached = self._read_manifest()
+        files = {}
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            for entry in os.scandir(directory):
+                if not entry.name.endswith(".py") or entry.name.startswith("_") or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                key = [stat.st_size, stat.st_mtime_ns]
+                known = cached.get(entry.path)
+                if known and known["key"] == key:
+                    files[entry.path] = known
+                    continue
+                module = os.path.splitext(os.path.relpath(entry.path))[0].replace(os.sep, ".")
+                # One bad file (a syntax error, or a @tool with no name or an unknown
+                # keyword, which ToolSpec rejects with TypeError) only loses its own tools.
+                try:
+                    with open(entry.path, encoding="utf-8") as f:
+                        tools = scan_source(f.read(), module)
+                except (SyntaxError, ValueError, UnicodeDecodeError, TypeError, KeyError) as e:
+                    print(f"⚠️ Warning: Skipping tools in '{entry.path}': {e}")
+                    tools = []
+                files[entry.path] = {"key": key, "tools": tools}
+
+        specs = {}
+        for path in sorted(files):
+            for data in files[path]["tools"]:
+                if data["name"] in specs:
+                    print(f"⚠️ Warning: Tool '{data['name']}' in '{path}' is already defined; ignoring it.")
+                    continue
+                specs[data["name"]] = ToolSpec(**data)
+        with self._lock:
+            self.specs = specs
+            self._callables = {name: fn for name, fn in self._callables.items() if name in specs}
+        if files != cached:
+            self._write_manifest(files)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest.get("files", {}) if manifest.get("version") == MANIFEST_VERSION else {}
+
+    def _write_manifest(self, files: dict):
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            temp_path = self.manifest_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": files}, f)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not save the tool manifest: {e}")
+
+    # --- Lookup and dispatch ---
+
+    def get(self, name: str) -> ToolSpec | None:
+        return self.specs.get(name)
+
+    def resolve(self, name: str):
+        """Returns the callable for a tool, importing its module the first time."""
+        function = self._callables.get(name)
+        if function is not None:
+            return function
+        spec = self.specs[name]
+        with self._lock:
+            if name not in self._callables:
+                obj = getattr(importlib.import_module(spec.module), spec.attribute)
+                if inspect.isclass(obj):
+                    instance = obj()
+                    obj = getattr(instance, "run", None) or getattr(instance, "_run", None) or instance
+                self._callables[name] = obj
+            return self._callables[name]
+
+    def call(self, name: str, arguments: dict):
+        """
+        Calls a tool with the arguments it accepts.
+
+        Arguments the tool doesn't take (models sometimes add extras) are dropped
+        instead of failing the call.
+        """
+        spec = self.specs[name]
+        if not spec.accepts_any:
+            accepted = {param["name"] for param in spec.params}
+            arguments = {key: value for key, value in arguments.items() if key in accepted}
+        return self.resolve(name)(**arguments)
+
+    # --- Prompt ---
+
+    def supported_actions(self) -> str:
+        """The SUPPORTED ACTIONS section of the system prompt, generated from the manifest."""
+        lines = [self.specs[name].prompt_line() for name in sorted(self.specs) if not self.specs[name].hidden]
+        return "### SUPPORTED ACTIONS (plus a `message`)\n" + "\n".join(lines)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Returns the shared tool registry, building it (from the cached manifest) on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ToolRegistry()
+    return _registry
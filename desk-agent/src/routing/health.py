@@ -0,0 +1,124 @@
+# src/routing/health.py
+
+import time
+from collections import deque
+
+
+class LatencyStats:
+    """Rolling time-to-first-token and total latency of one model over its last `window` calls."""
+
+    def __init__(self, window: int, expected_ttft_s: float, losses_to_demote: int = 3):
+        self.expected_ttft_s = expected_ttft_s
+        self.losses_to_demote = losses_to_demote
+        self.ttft = deque(maxlen=window)
+        self.total = deque(maxlen=window)
+        self.last_sample_at = None
+        self.consecutive_losses = 0
+        self.demoted_at = None
+
+    def add(self, ttft_s: float | None, total_s: float):
+        self.ttft.append(total_s if ttft_s is None else ttft_s)
+        self.total.append(total_s)
+        self.last_sample_at = time.monotonic()
+        self.consecutive_losses = 0
+        self.demoted_at = None
+
+    def add_abandoned(self, elapsed_s: float):
+        """
+        Records a call that lost a hedged race (it took at least elapsed_s to start answering).
+
+        A loser is cancelled before its real latency is known, so losing several
+        races in a row is what marks it as slow.
+        """
+        self.ttft.append(elapsed_s)
+        self.last_sample_at = time.monotonic()
+        self.consecutive_losses += 1
+        if self.consecutive_losses >= self.losses_to_demote:
+            self.demoted_at = time.monotonic()
+
+    def is_slow(self, budget_s: float | None, retry_after_s: float) -> bool:
+        """
+        Whether the model is currently too slow to be tried first.
+
+        That's when its median time to first token is over budget_s, or it keeps
+        losing hedged races. Both expire after retry_after_s without new samples,
+        so a model that has sped up again gets another chance.
+        """
+        now = time.monotonic()
+        if self.demoted_at is not None and now - self.demoted_at < retry_after_s:
+            return True
+        if budget_s is None or self.last_sample_at is None or now - self.last_sample_at >= retry_after_s:
+            return False
+        return self.ttft_p50() > budget_s
+
+    @staticmethod
+    def _percentile(values, p: float) -> float | None:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+    def ttft_p50(self) -> float:
+        """The median time to first token, or the registry's estimate before any calls."""
+        value = self._percentile(self.ttft, 0.5)
+        return self.expected_ttft_s if value is None else value
+
+    def ttft_p95(self) -> float:
+        value = self._percentile(self.ttft, 0.95)
+        return self.expected_ttft_s * 2 if value is None else value
+
+    def total_p50(self) -> float | None:
+        return self._percentile(self.total, 0.5)
+
+    def total_p95(self) -> float | None:
+        return self._percentile(self.total, 0.95)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a model that keeps failing.
+
+    After `failure_threshold` failures in a row the circuit opens and the model
+    is skipped. Once `reset_after_s` has passed, one trial request is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_after_s: float):
+        self.failure_threshold = failure_threshold
+        self.reset_after_s = reset_after_s
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after_s:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now. In the half-open state only one trial is allowed at a time."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_abandoned(self):
+        """A request that was cancelled before it finished says nothing about the model's health."""
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_running = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
@@ -1,31 +1,548 @@
 # src/routing/model_router.py
 
-import litellm
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
 
-# Configure LiteLLM to be less verbose in the console
-litellm.set_verbose=False
+from config import (
+    OLLAMA_BASE_URL,
+    OLLAMA_KEEP_ALIVE,
+    PROVIDER_MAX_CONCURRENCY,
+    LLM_REQUEST_TIMEOUT_S,
+    MODEL_REGISTRY,
+    MODEL_ROUTES,
+    ROUTE_TTFT_BUDGET_S,
+    HEDGE_LOSSES_TO_DEMOTE,
+    ROUTE_RETRY_SLOW_S,
+    HEDGE_MIN_DELAY_S,
+    HEDGE_MAX_DELAY_S,
+    LATENCY_WINDOW,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_S,
+)
+from src.routing.health import CircuitBreaker, LatencyStats
+from src.utils import tracing
 
-async def get_llm_response(messages: list, model_name: str) -> str | None:
+# Heavy clients are imported/constructed on first use (or by the startup prewarm),
+# so importing this module doesn't delay the window.
+_litellm = None
+_client_lock = threading.Lock()
+
+def get_litellm():
+    """Imports and configures LiteLLM on first use."""
+    global _litellm
+    if _litellm is None:
+        with _client_lock:
+            if _litellm is None:
+                import litellm
+                # Configure LiteLLM to be less verbose in the console
+                litellm.set_verbose=False
+                _litellm = litellm
+    return _litellm
+
+class OutputTruncated(Exception):
+    """A completion with a max_tokens cap stopped at the cap, so its output is incomplete."""
+
+
+class CallTiming:
+    """Where the time of one model call went."""
+
+    def __init__(self, model_name: str):
+        self.model = model_name
+        self.queue_s = 0.0        # waiting for a free slot for this provider
+        self.connect_s = 0.0      # TCP/TLS setup; 0 when a pooled connection was reused
+        self.ttft_s = None        # time to first token
+        self.total_s = None
+        self.ok = False
+        self.stats = {}           # provider-specific extras (e.g. Ollama eval counts)
+
+    def as_dict(self) -> dict:
+        return {
+            "model": self.model,
+            "queue_ms": self.queue_s * 1000,
+            "connect_ms": self.connect_s * 1000,
+            "ttft_ms": None if self.ttft_s is None else self.ttft_s * 1000,
+            "total_ms": None if self.total_s is None else self.total_s * 1000,
+            "ok": self.ok,
+            **self.stats,
+        }
+
+    def __str__(self) -> str:
+        ttft = "-" if self.ttft_s is None else f"{self.ttft_s * 1000:.0f}"
+        total = "-" if self.total_s is None else f"{self.total_s * 1000:.0f}"
+        text = (f"{self.model}: queue {self.queue_s * 1000:.0f} ms, connect {self.connect_s * 1000:.0f} ms, "
+                f"ttft {ttft} ms, total {total} ms")
+        if "prompt_tokens" in self.stats:
+            prefill = self.stats.get("prefill_ms")
+            text += (f" | prompt {self.stats['prompt_tokens']} tok, cached ~{self.stats['cached_tokens']} tok"
+                     + (f", prefill {prefill:.0f} ms" if prefill is not None else ""))
+        if "output_tokens" in self.stats:
+            text += f", output {self.stats['output_tokens']} tok"
+        return text
+
+
+class ModelRouter:
+    """
+    Owns the HTTP connections to model providers and decides which model answers a request.
+
+    Ollama is called directly over one pooled, keep-alive httpx client, so
+    connections are reused across calls and every request asks Ollama to keep
+    the model resident (`keep_alive`). Other providers go through LiteLLM,
+    which is given its own shared client session. Each call is timed as
+    queue / connect / time-to-first-token / total, and reports its prompt
+    tokens, how many of them were likely served from the prompt cache, and
+    the prefill time.
+
+    route() serves a request class ("intent", "chat", "crew") from the models
+    listed for it in MODEL_ROUTES. Each model keeps rolling latency stats and a
+    circuit breaker: models that keep failing are skipped, models that are
+    currently slower than the class's budget are tried after faster ones, and a
+    model that hasn't started answering by its usual p95 time to first token
+    gets the next model started alongside it (the first to answer wins).
+    """
+
+    def __init__(self, ollama_base_url: str = OLLAMA_BASE_URL, keep_alive: str = OLLAMA_KEEP_ALIVE,
+                 max_concurrency: int = PROVIDER_MAX_CONCURRENCY, timeout_s: float = LLM_REQUEST_TIMEOUT_S,
+                 registry: dict = MODEL_REGISTRY, routes: dict = MODEL_ROUTES):
+        self.ollama_base_url = ollama_base_url.rstrip("/")
+        self.keep_alive = keep_alive
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+        self.timings = deque(maxlen=500)
+        self._clients = {}
+        self._semaphores = {}
+        self._keep_warm_tasks = {}
+        self._last_prompt = {}
+        self.registry = registry
+        self.routes = routes
+        self.latency = {}       # model -> LatencyStats
+        self.breakers = {}      # model -> CircuitBreaker
+
+    # --- Connections ---
+
+    @staticmethod
+    def provider_of(model_name: str) -> str:
+        return model_name.split("/", 1)[0] if "/" in model_name else "openai"
+
+    def client_for(self, provider: str):
+        """Returns the pooled async HTTP client for a provider, creating it on first use."""
+        client = self._clients.get(provider)
+        if client is None:
+            import httpx
+            limits = httpx.Limits(max_connections=self.max_concurrency * 2,
+                                  max_keepalive_connections=self.max_concurrency,
+                                  keepalive_expiry=300)
+            base_url = self.ollama_base_url if provider == "ollama" else ""
+            client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=self.timeout_s)
+            self._clients[provider] = client
+            if provider != "ollama":
+                # LiteLLM reuses this session instead of opening a new one per call.
+                get_litellm().aclient_session = client
+        return client
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[provider]
+
+    async def aclose(self):
+        for task in self._keep_warm_tasks.values():
+            task.cancel()
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    # --- Calls ---
+
+    async def stream(self, messages: list, model_name: str, **options):
+        """
+        Streams a completion, chunk by chunk, recording a CallTiming for it.
+
+        Args:
+            messages: A list of message dictionaries.
+            model_name: A LiteLLM-style model name, e.g. "ollama/phi3:3.8b".
+            **options: Extra provider options (e.g. max_tokens). json_schema constrains
+                the output to that JSON Schema (Ollama's `format`, LiteLLM's `response_format`).
+
+        Yields:
+            Text deltas as they arrive. Errors are raised to the caller.
+
+        Raises:
+            OutputTruncated: After the last chunk, if max_tokens was given and the model stopped there.
+        """
+        timing = CallTiming(model_name)
+        # Started, not entered: a context variable set in a generator leaks into its caller.
+        span = tracing.start_span("llm.call", model=model_name)
+        failure = None
+        provider = self.provider_of(model_name)
+        prompt_text = "".join(f"{m['role']}:{m['content']}" for m in messages)
+        # The model server can only reuse the KV cache for the part of the prompt
+        # that is identical to the previous request to this model.
+        shared_chars = len(os.path.commonprefix([prompt_text, self._last_prompt.get(model_name, "")]))
+        self._last_prompt[model_name] = prompt_text
+        start = time.perf_counter()
+        try:
+            async with self._semaphore(provider):
+                timing.queue_s = time.perf_counter() - start
+                if provider == "ollama":
+                    chunks = self._stream_ollama(messages, model_name, timing, start, options)
+                else:
+                    chunks = self._stream_litellm(messages, model_name, timing, start, options)
+                async for chunk in chunks:
+                    yield chunk
+            timing.ok = True
+            self._record_prompt_usage(timing, prompt_text, shared_chars)
+        except Exception as e:
+            self.breaker_for(model_name).record_failure()
+            failure = e
+            raise
+        finally:
+            timing.total_s = time.perf_counter() - start
+            self.timings.append(timing)
+            if timing.ok:
+                self.breaker_for(model_name).record_success()
+                self.latency_for(model_name).add(timing.ttft_s, timing.total_s)
+                cost = self.registry.get(model_name, {}).get("cost_per_mtok")
+                if cost and "output_tokens" in timing.stats:
+                    timing.stats["cost_usd"] = timing.stats["output_tokens"] * cost / 1e6
+            span.end(error=failure, **timing.as_dict())
+            print(f"⏱️ {timing}")
+        # Not a model failure (the call succeeded), but the caller must not treat the output as complete.
+        if options.get("max_tokens") and timing.stats.get("finish_reason") == "length":
+            raise OutputTruncated(f"{model_name} stopped at the {options['max_tokens']}-token cap")
+
+    async def complete(self, messages: list, model_name: str, **options) -> str:
+        """Returns the full completion text (streamed internally so TTFT is still measured)."""
+        return "".join([chunk async for chunk in self.stream(messages, model_name, **options)])
+
+    @staticmethod
+    def _record_prompt_usage(timing: CallTiming, prompt_text: str, shared_chars: int):
+        stats = timing.stats
+        # Provider-reported token counts when available, else roughly 4 characters per token.
+        prompt_tokens = stats.get("prompt_eval_count") or stats.get("usage_prompt_tokens") or len(prompt_text) // 4
+        cached_tokens = stats.get("usage_cached_tokens")
+        if cached_tokens is None:
+            cached_tokens = prompt_tokens * shared_chars // max(len(prompt_text), 1)
+        stats["prompt_tokens"] = prompt_tokens
+        stats["cached_tokens"] = cached_tokens
+        output_tokens = stats.get("eval_count") or stats.get("usage_completion_tokens")
+        if output_tokens is not None:
+            stats["output_tokens"] = output_tokens
+        if "prompt_eval_duration" in stats:
+            stats["prefill_ms"] = stats["prompt_eval_duration"] / 1e6
+
+    async def _stream_ollama(self, messages, model_name, timing, start, options):
+        client = self.client_for("ollama")
+
+        async def trace(event_name, info):
+            # httpcore reports connection setup; nothing fires when a pooled connection is reused.
+            if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+                trace.started = time.perf_counter()
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                timing.connect_s += time.perf_counter() - trace.started
+
+        payload = {
+            "model": model_name.split("/", 1)[1],
+            "messages": messages,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        if options.get("max_tokens"):
+            payload.setdefault("options", {})["num_predict"] = options["max_tokens"]
+        if options.get("json_schema"):
+            # Ollama turns the schema into a grammar, so only matching tokens can be sampled.
+            payload["format"] = options["json_schema"]
+        async with client.stream("POST", "/api/chat", json=payload, extensions={"trace": trace}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                content = (data.get("message") or {}).get("content")
+                if content:
+                    if timing.ttft_s is None:
+                        timing.ttft_s = time.perf_counter() - start
+                    yield content
+                if data.get("done"):
+                    # "length" when num_predict cut the answer off.
+                    if data.get("done_reason"):
+                        timing.stats["finish_reason"] = data["done_reason"]
+                    # Keep reading to the end of the body so the connection goes back to the pool.
+                    for key in ("prompt_eval_count", "prompt_eval_duration", "eval_count", "load_duration"):
+                        if key in data:
+                            timing.stats[key] = data[key]
+
+    async def _stream_litellm(self, messages, model_name, timing, start, options):
+        provider = self.provider_of(model_name)
+        self.client_for(provider)
+        if provider == "anthropic":
+            # Anthropic only caches prompt prefixes that are explicitly marked (OpenAI and Gemini do it automatically).
+            messages = [
+                {**m, "content": [{"type": "text", "text": m["content"], "cache_control": {"type": "ephemeral"}}]}
+                if m["role"] == "system" else m
+                for m in messages
+            ]
+        options = dict(options)
+        api_key_env = self.registry.get(model_name, {}).get("api_key_env")
+        if api_key_env and "api_key" not in options:
+            options["api_key"] = os.getenv(api_key_env)
+        json_schema = options.pop("json_schema", None)
+        if json_schema:
+            options["response_format"] = {"type": "json_schema", "json_schema": {"name": "response", "schema": json_schema}}
+        response = await get_litellm().acompletion(model=model_name, messages=messages, stream=True,
+                                                   stream_options={"include_usage": True}, **options)
+        async for chunk in response:
+            usage = getattr(chunk, "usage", None)
+            if usage:
+                timing.stats["usage_prompt_tokens"] = usage.prompt_tokens
+                timing.stats["usage_completion_tokens"] = usage.completion_tokens
+                details = getattr(usage, "prompt_tokens_details", None)
+                if details and getattr(details, "cached_tokens", None) is not None:
+                    timing.stats["usage_cached_tokens"] = details.cached_tokens
+            if not chunk.choices:
+                continue
+            if chunk.choices[0].finish_reason:
+                timing.stats["finish_reason"] = chunk.choices[0].finish_reason
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if timing.ttft_s is None:
+                    timing.ttft_s = time.perf_counter() - start
+                yield delta
+
+    # --- Routing ---
+
+    def latency_for(self, model_name: str) -> LatencyStats:
+        if model_name not in self.latency:
+            expected = self.registry.get(model_name, {}).get("expected_ttft_s", 1.0)
+            self.latency[model_name] = LatencyStats(LATENCY_WINDOW, expected, HEDGE_LOSSES_TO_DEMOTE)
+        return self.latency[model_name]
+
+    def breaker_for(self, model_name: str) -> CircuitBreaker:
+        if model_name not in self.breakers:
+            self.breakers[model_name] = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_S)
+        return self.breakers[model_name]
+
+    def candidates(self, request_class: str) -> list[str]:
+        """
+        The models to try for a request class, in order.
+
+        Models with an open circuit are left out. Models that are currently slow
+        (see LatencyStats.is_slow) move behind the others; otherwise the
+        MODEL_ROUTES order (the preference) is kept.
+        """
+        if request_class not in self.routes:
+            raise ValueError(f"Unknown request class '{request_class}'")
+        models = [m for m in self.routes[request_class] if self.breaker_for(m).state != "open"]
+        budget = ROUTE_TTFT_BUDGET_S.get(request_class)
+        models.sort(key=lambda m: self.latency_for(m).is_slow(budget, ROUTE_RETRY_SLOW_S))
+        return models
+
+    def select(self, request_class: str) -> str:
+        """The model route() would try first, for callers that make the call themselves (e.g. crews)."""
+        models = self.candidates(request_class)
+        return models[0] if models else self.routes[request_class][-1]
+
+    def _hedge_delay(self, model_name: str) -> float:
+        return min(max(self.latency_for(model_name).ttft_p95(), HEDGE_MIN_DELAY_S), HEDGE_MAX_DELAY_S)
+
+    async def route(self, request_class: str, messages: list, **options):
+        """
+        Streams a completion from the best available model for a request class.
+
+        A model that fails before its first token is replaced by the next
+        candidate; one that is slow to start gets the next candidate raced
+        against it. Once a model has started answering it is committed to, and
+        a later error is raised to the caller.
+
+        Args:
+            request_class: A key of MODEL_ROUTES, e.g. "intent" or "chat".
+            messages: A list of message dictionaries.
+            **options: Extra provider options, passed to whichever model answers.
+
+        Yields:
+            Text deltas as they arrive.
+        """
+        remaining = iter(self.candidates(request_class))
+        attempts = {}   # first-chunk task -> (model, stream, started)
+        errors = []
+
+        def launch() -> bool:
+            for model_name in remaining:
+                if self.breaker_for(model_name).allow():
+                    chunks = self.stream(messages, model_name, **options)
+                    attempts[asyncio.ensure_future(chunks.__anext__())] = (model_name, chunks, time.perf_counter())
+                    return True
+            return False
+
+        winner = None
+        launch()
+        try:
+            while attempts and winner is None:
+                newest_model, _, newest_start = max(attempts.values(), key=lambda attempt: attempt[2])
+                wait_s = self._hedge_delay(newest_model) - (time.perf_counter() - newest_start)
+                done, _ = await asyncio.wait(attempts, timeout=max(wait_s, 0), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if launch():
+                        print(f"🐢 {newest_model} is slow to answer; also trying the next model.")
+                        continue
+                    done, _ = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    model_name, chunks, _ = attempts.pop(task)
+                    try:
+                        first = task.result()
+                    except StopAsyncIteration:
+                        first = ""
+                    except Exception as e:
+                        errors.append(f"{model_name}: {e}")
+                        print(f"⚠️ Warning: {model_name} failed ({e}); falling back.")
+                        launch()
+                        continue
+                    winner = (model_name, chunks, first)
+                    break
+        finally:
+            # Stop the models that lost the race; they count as at least this slow.
+            for task, (model_name, chunks, started) in attempts.items():
+                task.cancel()
+                self.latency_for(model_name).add_abandoned(time.perf_counter() - started)
+                self.breaker_for(model_name).record_abandoned()
+            for task, (model_name, chunks, _) in attempts.items():
+                try:
+                    await task
+                except BaseException:
+                    pass
+                await chunks.aclose()
+
+        if winner is None:
+            raise RuntimeError(f"No model could serve the '{request_class}' request: " + ("; ".join(errors) or "all circuits are open"))
+        model_name, chunks, first = winner
+        try:
+            if first:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    def health(self) -> list[dict]:
+        """Latency percentiles and circuit state of every model that has been used."""
+        report = []
+        for model_name in sorted(set(self.latency) | set(self.breakers)):
+            stats = self.latency_for(model_name)
+            report.append({
+                "model": model_name,
+                "ttft_p50_ms": stats.ttft_p50() * 1000,
+                "ttft_p95_ms": stats.ttft_p95() * 1000,
+                "total_p95_ms": None if stats.total_p95() is None else stats.total_p95() * 1000,
+                "calls": len(stats.total),
+                "slow": stats.is_slow(None, ROUTE_RETRY_SLOW_S),
+                "circuit": self.breaker_for(model_name).state,
+            })
+        return report
+
+    # --- Warm-up ---
+
+    async def warm_up(self, model_name: str) -> float | None:
+        """
+        Loads a local model into memory ahead of the first real request.
+
+        Returns:
+            Seconds the warm-up took, or None if the model isn't an Ollama model or the call failed.
+        """
+        if self.provider_of(model_name) != "ollama":
+            return None
+        start = time.perf_counter()
+        try:
+            # A generate request without a prompt only loads the model (and resets its keep_alive timer).
+            response = await self.client_for("ollama").post(
+                "/api/generate",
+                json={"model": model_name.split("/", 1)[1], "keep_alive": self.keep_alive},
+            )
+            response.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ Warning: Could not warm up {model_name}: {e}")
+            return None
+        elapsed = time.perf_counter() - start
+        print(f"🔥 Warmed up {model_name} in {elapsed:.2f}s.")
+        return elapsed
+
+    def start_keep_warm(self, model_name: str, interval_s: float):
+        """Warms the model now and then every interval_s seconds, so it never gets unloaded while idle."""
+        async def keep_warm():
+            while True:
+                await self.warm_up(model_name)
+                await asyncio.sleep(interval_s)
+
+        if model_name not in self._keep_warm_tasks:
+            self._keep_warm_tasks[model_name] = asyncio.ensure_future(keep_warm())
+
+
+_router = None
+
+def get_router() -> ModelRouter:
+    """Returns the process-wide model router. Must be used from the asyncio thread."""
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
+
+def _open_stream(messages: list, model_name: str | None, request_class: str | None, options: dict):
+    router = get_router()
+    if request_class is not None:
+        return router.route(request_class, messages, **options)
+    return router.stream(messages, model_name, **options)
+
+async def get_llm_response(messages: list, model_name: str | None = None, request_class: str | None = None,
+                           **options) -> str | None:
     """
-    Gets a response from a specified model via LiteLLM.
+    Gets a response through the shared ModelRouter, from one model or routed by request class.
 
     Args:
         messages: A list of message dictionaries (e.g., [{"role": "user", ...}]).
         model_name: The name of the model to use (from config.py).
+        request_class: Instead of model_name, a MODEL_ROUTES key (e.g. "intent") to route with fallback.
+        **options: Extra provider options (e.g. max_tokens, json_schema; see ModelRouter.stream).
 
     Returns:
         The text content of the response, or None if an error occurs.
+
+    Raises:
+        OutputTruncated: The output hit max_tokens, so the caller can retry with a larger cap.
     """
     try:
-        # Asynchronously call the model
-        response = await litellm.acompletion(
-            model=model_name,
-            messages=messages,
-        )
-        # Extract the content from the first choice in the response
-        return response.choices[0].message.content
+        return "".join([chunk async for chunk in _open_stream(messages, model_name, request_class, options)])
+    except OutputTruncated:
+        raise
     except Exception as e:
         # Handle potential exceptions, like connection errors to Ollama
-        print(f"❌ Error: LiteLLM failed to get a response from the model.")
+        print(f"❌ Error: Failed to get a response from the model.")
+        print(f"   Reason: {e}")
+        return None
+
+async def stream_llm_response(messages: list, model_name: str | None = None, request_class: str | None = None,
+                              **options):
+    """
+    Streams a response through the shared ModelRouter, chunk by chunk.
+
+    Args:
+        messages: A list of message dictionaries (e.g., [{"role": "user", ...}]).
+        model_name: The name of the model to use (from config.py).
+        request_class: Instead of model_name, a MODEL_ROUTES key (e.g. "chat") to route with fallback.
+        **options: Extra provider options (e.g. max_tokens, json_schema; see ModelRouter.stream).
+
+    Yields:
+        Text deltas as they arrive. Stops early (without raising) if an error occurs.
+
+    Raises:
+        OutputTruncated: After the last chunk, if the output hit max_tokens.
+    """
+    try:
+        async for chunk in _open_stream(messages, model_name, request_class, options):
+            yield chunk
+    except OutputTruncated:
+        raise
+    except Exception as e:
+        print(f"❌ Error: Failed while streaming a response from the model.")
         print(f"   Reason: {e}")
-        return None
\ No newline at end of file
@@ -0,0 +1,85 @@
+# src/search/backends.py
+
+import threading
+from collections import namedtuple
+from contextlib import closing
+from itertools import islice
+
+from config import SEARCH_BACKEND
+
+# size is in bytes and date_modified is a Unix timestamp; both are None unless requested.
+SearchResult = namedtuple("SearchResult", ["path", "size", "date_modified"])
+
+
+class SearchBackend:
+    """
+    Interface for file-name search engines behind search_everything().
+
+    Backends yield full paths sorted by file name (ascending), and apply
+    offset/limit themselves so they can stop scanning early. Results are
+    produced lazily, so callers that only need the first hit never pay for the rest.
+    """
+
+    name = "base"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether this backend can run on this machine."""
+        return True
+
+    def iter_results(self, query: str, offset: int = 0, limit: int | None = None,
+                     request_size: bool = False, request_date_modified: bool = False):
+        """
+        Finds files whose name contains the query (or matches it, for wildcard queries).
+
+        Args:
+            query: The search term, or a glob pattern using * and ?.
+            offset: How many matching results to skip first.
+            limit: The maximum number of results to yield, or None for all of them.
+            request_size: Also fetch each file's size.
+            request_date_modified: Also fetch each file's modification time.
+
+        Yields:
+            SearchResult tuples, sorted by file name.
+        """
+        raise NotImplementedError
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> list[str]:
+        """Returns one page of matching full paths."""
+        with closing(self.iter_results(query, offset, limit)) as results:
+            return [result.path for result in islice(results, limit)]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _create_backend(name: str) -> SearchBackend:
+    # Imported here so that only the backend actually in use gets loaded.
+    if name == "everything":
+        from src.search.everything_search import EverythingBackend
+        return EverythingBackend()
+    if name == "local":
+        from src.search.local_index import LocalFileIndex
+        return LocalFileIndex.from_config()
+    raise ValueError(f"Unknown search backend '{name}'.")
+
+
+def get_backend() -> SearchBackend:
+    """
+    Returns the configured search backend, creating it on first use.
+
+    With SEARCH_BACKEND = "auto", Everything is used when its DLL is available
+    (Windows) and the local file index everywhere else.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = SEARCH_BACKEND
+                if name == "auto":
+                    from src.search.everything_search import EverythingBackend
+                    name = "everything" if EverythingBackend.is_available() else "local"
+                _backend = _create_backend(name)
+                print(f"🔎 Using '{_backend.name}' search backend.")
+    return _backend
@@ -2,38 +2,136 @@
 
 import ctypes
 import os
-from config import EVERYTHING_DLL_PATH
+import sys
+import threading
+from config import EVERYTHING_DLL_PATH, EVERYTHING_PAGE_SIZE
+from src.search.backends import SearchBackend, SearchResult, get_backend
 
 # --- Everything SDK Integration using ctypes ---
 
-# Check if the DLL path from config exists
-if not os.path.exists(EVERYTHING_DLL_PATH):
-    raise FileNotFoundError(f"Everything DLL not found at path: {EVERYTHING_DLL_PATH}")
+# Define helper constants
+EVERYTHING_SORT_NAME_ASCENDING = 1
+EVERYTHING_REQUEST_FILE_NAME = 0x00000001
+EVERYTHING_REQUEST_PATH = 0x00000002
+EVERYTHING_REQUEST_SIZE = 0x00000010
+EVERYTHING_REQUEST_DATE_MODIFIED = 0x00000040
+# FILETIME counts 100 ns ticks since 1601; Unix time counts seconds since 1970.
+FILETIME_UNIX_EPOCH = 116444736000000000
 
-# Load the DLL from the path specified in config.py
-try:
-    everything_dll = ctypes.WinDLL(EVERYTHING_DLL_PATH)
-except OSError as e:
-    raise OSError(f"Failed to load Everything DLL. Ensure it is a valid 64-bit DLL. Error: {e}")
+_everything_dll = None
+_dll_lock = threading.Lock()
 
 
-# Define function prototypes for type safety and clarity
-everything_dll.Everything_SetSearchW.argtypes = [ctypes.c_wchar_p]
-everything_dll.Everything_SetRequestFlags.argtypes = [ctypes.c_uint]
-everything_dll.Everything_SetSort.argtypes = [ctypes.c_uint]
-everything_dll.Everything_QueryW.argtypes = [ctypes.c_bool]
-everything_dll.Everything_GetNumResults.restype = ctypes.c_int
-everything_dll.Everything_GetResultFullPathNameW.argtypes = [ctypes.c_int, ctypes.c_wchar_p, ctypes.c_int]
+def load_everything_dll():
+    """
+    Loads the Everything DLL on first use (not at import time, so other platforms can import this module).
 
+    Returns:
+        The loaded ctypes library.
+    """
+    global _everything_dll
+    with _dll_lock:
+        if _everything_dll is not None:
+            return _everything_dll
+
+        # Check if the DLL path from config exists
+        if not os.path.exists(EVERYTHING_DLL_PATH):
+            raise FileNotFoundError(f"Everything DLL not found at path: {EVERYTHING_DLL_PATH}")
+
+        # Load the DLL from the path specified in config.py
+        try:
+            everything_dll = ctypes.WinDLL(EVERYTHING_DLL_PATH)
+        except OSError as e:
+            raise OSError(f"Failed to load Everything DLL. Ensure it is a valid 64-bit DLL. Error: {e}")
+
+        # Define function prototypes for type safety and clarity
+        everything_dll.Everything_SetSearchW.argtypes = [ctypes.c_wchar_p]
+        everything_dll.Everything_SetRequestFlags.argtypes = [ctypes.c_uint]
+        everything_dll.Everything_SetSort.argtypes = [ctypes.c_uint]
+        everything_dll.Everything_SetOffset.argtypes = [ctypes.c_uint]
+        everything_dll.Everything_SetMax.argtypes = [ctypes.c_uint]
+        everything_dll.Everything_QueryW.argtypes = [ctypes.c_bool]
+        everything_dll.Everything_GetNumResults.restype = ctypes.c_int
+        everything_dll.Everything_GetResultFullPathNameW.argtypes = [ctypes.c_uint, ctypes.c_wchar_p, ctypes.c_uint]
+        everything_dll.Everything_GetResultFullPathNameW.restype = ctypes.c_uint
+        everything_dll.Everything_GetResultSize.argtypes = [ctypes.c_uint, ctypes.POINTER(ctypes.c_longlong)]
+        everything_dll.Everything_GetResultSize.restype = ctypes.c_bool
+        everything_dll.Everything_GetResultDateModified.argtypes = [ctypes.c_uint, ctypes.POINTER(ctypes.c_ulonglong)]
+        everything_dll.Everything_GetResultDateModified.restype = ctypes.c_bool
+
+        _everything_dll = everything_dll
+        return _everything_dll
+
+
+class EverythingBackend(SearchBackend):
+    """Searches through the Everything service on Windows."""
+
+    name = "everything"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return sys.platform == "win32" and os.path.exists(EVERYTHING_DLL_PATH)
+
+    @staticmethod
+    def _result_path(everything_dll, index: int) -> str:
+        # Ask for the length first: long paths can exceed MAX_PATH.
+        length = everything_dll.Everything_GetResultFullPathNameW(index, None, 0)
+        buf = ctypes.create_unicode_buffer(length + 1)
+        everything_dll.Everything_GetResultFullPathNameW(index, buf, len(buf))
+        return buf.value
+
+    def _query_page(self, everything_dll, query: str, request_flags: int, offset: int, count: int) -> list[SearchResult]:
+        """Runs one page of the query and copies its results out. Must be called with _dll_lock held."""
+        everything_dll.Everything_SetSearchW(query)
+        everything_dll.Everything_SetRequestFlags(request_flags)
+        everything_dll.Everything_SetSort(EVERYTHING_SORT_NAME_ASCENDING)
+        # Let Everything apply the paging so only the requested results come back.
+        everything_dll.Everything_SetOffset(offset)
+        everything_dll.Everything_SetMax(count)
+
+        # Execute the query: one IPC round trip fetches names, paths and any extra columns.
+        everything_dll.Everything_QueryW(True)
+
+        size = ctypes.c_longlong()
+        filetime = ctypes.c_ulonglong()
+        results = []
+        for i in range(everything_dll.Everything_GetNumResults()):
+            result_size = result_date = None
+            if request_flags & EVERYTHING_REQUEST_SIZE and everything_dll.Everything_GetResultSize(i, ctypes.byref(size)):
+                result_size = size.value
+            if (request_flags & EVERYTHING_REQUEST_DATE_MODIFIED
+                    and everything_dll.Everything_GetResultDateModified(i, ctypes.byref(filetime))):
+                result_date = (filetime.value - FILETIME_UNIX_EPOCH) / 10_000_000
+            results.append(SearchResult(self._result_path(everything_dll, i), result_size, result_date))
+        return results
+
+    def iter_results(self, query: str, offset: int = 0, limit: int | None = None,
+                     request_size: bool = False, request_date_modified: bool = False):
+        everything_dll = load_everything_dll()
+        request_flags = EVERYTHING_REQUEST_FILE_NAME | EVERYTHING_REQUEST_PATH
+        if request_size:
+            request_flags |= EVERYTHING_REQUEST_SIZE
+        if request_date_modified:
+            request_flags |= EVERYTHING_REQUEST_DATE_MODIFIED
+
+        remaining = limit
+        while remaining is None or remaining > 0:
+            count = EVERYTHING_PAGE_SIZE if remaining is None else min(remaining, EVERYTHING_PAGE_SIZE)
+            # The SDK keeps its query and results in globals, so each page is copied out under
+            # the lock and yielded after releasing it; a slow consumer never blocks other searches.
+            with _dll_lock:
+                page = self._query_page(everything_dll, query, request_flags, offset, count)
+            yield from page
+            if len(page) < count:
+                return
+            offset += count
+            if remaining is not None:
+                remaining -= count
 
-# Define helper constants
-EVERYTHING_SORT_NAME_ASCENDING = 1
-EVERYTHING_REQUEST_FILE_NAME = 0x00000001
-EVERYTHING_REQUEST_PATH = 0x00000002
 
 def search_everything(query: str, limit: int = 10) -> list[str]:
     """
-    Performs a search using the loaded Everything DLL.
+    Performs a file search using the configured backend (Everything or the local file index).
 
     Args:
         query: The search term.
@@ -42,35 +140,37 @@ def search_everything(query: str, limit: int = 10) -> list[str]:
     Returns:
         A list of full file paths matching the query.
     """
-    everything_dll.Everything_SetSearchW(query)
-    everything_dll.Everything_SetRequestFlags(EVERYTHING_REQUEST_FILE_NAME | EVERYTHING_REQUEST_PATH)
-    everything_dll.Everything_SetSort(EVERYTHING_SORT_NAME_ASCENDING)
-    
-    # Execute the query
-    everything_dll.Everything_QueryW(True)
-
-    num_results = everything_dll.Everything_GetNumResults()
-    # Respect the limit parameter
-    results_to_fetch = min(num_results, limit)
-
-    results = []
-    for i in range(results_to_fetch):
-        # Create a buffer to hold the full path
-        buf = ctypes.create_unicode_buffer(260)
-        everything_dll.Everything_GetResultFullPathNameW(i, buf, 260)
-        results.append(buf.value)
-
-    return results
+    return get_backend().search(query, limit)
+
+def iter_search_results(query: str, offset: int = 0, limit: int | None = None,
+                        request_size: bool = False, request_date_modified: bool = False):
+    """
+    Streams search results from the configured backend instead of building a list.
+
+    Close the generator (or use contextlib.closing) if you stop early, so the
+    backend can release its query state straight away.
+
+    Args:
+        query: The search term.
+        offset: How many results to skip.
+        limit: The maximum number of results, or None for all of them.
+        request_size: Also fetch file sizes in the same query.
+        request_date_modified: Also fetch modification times in the same query.
+
+    Yields:
+        SearchResult(path, size, date_modified) tuples.
+    """
+    yield from get_backend().iter_results(query, offset, limit, request_size, request_date_modified)
 
 # This block allows you to test this file directly by running `python src/search/everything_search.py`
 if __name__ == '__main__':
     print("Testing Everything search...")
     search_query = "main.py"  # Change this to test a file you know exists
     found_files = search_everything(search_query)
-    
+
     if found_files:
         print(f"Found {len(found_files)} result(s) for '{search_query}':")
         for file_path in found_files:
             print(file_path)
     else:
-        print(f"No results found for '{search_query}'. Is the Everything service running?")
\ No newline at end of file
+        print(f"No results found for '{search_query}'. Is the Everything service running?")
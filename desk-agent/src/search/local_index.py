@@ -0,0 +1,272 @@
+# src/search/local_index.py
+
+import json
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from itertools import islice
+
+from config import (
+    SEARCH_INDEX_PATH,
+    SEARCH_INDEX_ROOTS,
+    SEARCH_INDEX_EXCLUDES,
+    SEARCH_INDEX_REFRESH_S,
+)
+from src.search.backends import SearchBackend, SearchResult
+
+INDEX_VERSION = 1
+GLOB_CHARS = set("*?")
+
+
+def _glob_to_line_regex(pattern: str) -> re.Pattern:
+    """Turns a glob into a regex matching one whole line of the newline-separated blob."""
+    parts = []
+    for ch in pattern:
+        if ch == "*":
+            parts.append("[^\n]*")
+        elif ch == "?":
+            parts.append("[^\n]")
+        else:
+            parts.append(re.escape(ch))
+    return re.compile("^" + "".join(parts) + "$", re.MULTILINE)
+
+
+def _longest_literal(pattern: str) -> str:
+    """The longest run of plain characters in a glob, used to prefilter candidate lines."""
+    return max(re.split(r"[*?]", pattern), key=len)
+
+
+class _SearchTable:
+    """
+    An immutable, name-sorted snapshot of the index, laid out for fast scanning.
+
+    All lowercase names are joined into one newline-separated string, so a
+    substring query is a loop of str.find (C speed, no per-entry Python work).
+    A sorted array of line start offsets maps a hit back to its entry with a
+    bisect. Because entries are sorted by name, hits come out already sorted,
+    and the scan stops as soon as the caller has taken enough of them.
+    """
+
+    def __init__(self, paths: list[str]):
+        entries = sorted(paths, key=lambda path: (os.path.basename(path).lower(), path.lower()))
+        self.paths = entries
+        self.names_blob, self.name_starts = self._build_blob(os.path.basename(path).lower() for path in entries)
+        self._paths_blob = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build_blob(lines) -> tuple[str, array]:
+        starts = array("q")
+        chunks = []
+        offset = 0
+        for line in lines:
+            starts.append(offset)
+            chunks.append(line)
+            offset += len(line) + 1
+        return "\n".join(chunks) + "\n", starts
+
+    def paths_blob(self) -> tuple[str, array]:
+        # Only queries that contain a path separator need this, so it is built lazily.
+        with self._lock:
+            if self._paths_blob is None:
+                self._paths_blob = self._build_blob(path.lower() for path in self.paths)
+        return self._paths_blob
+
+    def iter_paths(self, query: str):
+        """Lazily yields matching paths in name order; the scan only advances as results are consumed."""
+        query = query.strip().lower()
+        if not query:
+            return
+        if "/" in query or "\\" in query:
+            blob, starts = self.paths_blob()
+        else:
+            blob, starts = self.names_blob, self.name_starts
+
+        is_glob = bool(GLOB_CHARS & set(query))
+        literal = _longest_literal(query) if is_glob else query
+        if is_glob and not literal:
+            # Nothing to prefilter on (e.g. "*"), so let the regex walk the blob.
+            for match in _glob_to_line_regex(query).finditer(blob):
+                yield self.paths[bisect_right(starts, match.start()) - 1]
+            return
+
+        line_regex = _glob_to_line_regex(query) if is_glob else None
+        pos = blob.find(literal)
+        while pos != -1:
+            index = bisect_right(starts, pos) - 1
+            # One hit per entry: continue from the start of the next line.
+            next_start = starts[index + 1] if index + 1 < len(starts) else len(blob)
+            if line_regex is None or line_regex.match(blob, starts[index], next_start - 1):
+                yield self.paths[index]
+            pos = blob.find(literal, next_start)
+
+
+class LocalFileIndex(SearchBackend):
+    """
+    A cross-platform, on-disk index of file names under a set of root folders.
+
+    The index stores each directory's listing together with its mtime. A
+    refresh stats every known directory but only re-lists the ones whose
+    mtime changed (a directory's mtime changes whenever entries are added,
+    removed or renamed), so keeping the index current is much cheaper than a
+    full os.walk. Refreshes run on a background thread every
+    SEARCH_INDEX_REFRESH_S seconds.
+    """
+
+    name = "local"
+
+    def __init__(self, roots: list[str], index_path: str | None, excludes: set[str], refresh_s: float | None = None):
+        self.roots = [os.path.abspath(os.path.expanduser(root)) for root in roots]
+        self.index_path = index_path
+        self.excludes = set(excludes)
+        self.refresh_s = refresh_s
+        self.dirs = {}  # dir path -> [mtime_ns, [file names], [subdir names]]
+        self.table = None
+        self._refresh_lock = threading.Lock()
+        self._refresher = None
+
+    @classmethod
+    def from_config(cls) -> "LocalFileIndex":
+        return cls(SEARCH_INDEX_ROOTS, SEARCH_INDEX_PATH, SEARCH_INDEX_EXCLUDES, SEARCH_INDEX_REFRESH_S)
+
+    @classmethod
+    def from_paths(cls, paths: list[str]) -> "LocalFileIndex":
+        """Builds an in-memory index over a fixed list of paths (used by the benchmark)."""
+        index = cls([], None, set())
+        index.table = _SearchTable(paths)
+        return index
+
+    # --- Persistence ---
+
+    def load(self) -> bool:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Warning: Ignoring unreadable file index ({e}).")
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("roots") != self.roots:
+            return False
+        self.dirs = data["dirs"]
+        self.table = _SearchTable(self._all_paths())
+        return True
+
+    def save(self):
+        if not self.index_path:
+            return
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "roots": self.roots, "dirs": self.dirs}, f)
+        os.replace(tmp_path, self.index_path)
+
+    # --- Indexing ---
+
+    def _all_paths(self) -> list[str]:
+        paths = []
+        for dir_path, (_, files, _) in self.dirs.items():
+            paths.extend(os.path.join(dir_path, name) for name in files)
+        return paths
+
+    def _list_dir(self, dir_path: str) -> tuple[list[str], list[str]]:
+        files, subdirs = [], []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.excludes:
+                                subdirs.append(entry.name)
+                        else:
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files, subdirs
+
+    def refresh(self) -> int:
+        """
+        Brings the index up to date, re-listing only directories whose mtime changed.
+
+        Returns:
+            The number of directories that had to be re-listed.
+        """
+        with self._refresh_lock:
+            start = time.perf_counter()
+            new_dirs = {}
+            relisted = 0
+            stack = [root for root in self.roots if os.path.isdir(root)]
+            while stack:
+                dir_path = stack.pop()
+                try:
+                    mtime = os.stat(dir_path).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self.dirs.get(dir_path)
+                if cached and cached[0] == mtime:
+                    files, subdirs = cached[1], cached[2]
+                else:
+                    files, subdirs = self._list_dir(dir_path)
+                    relisted += 1
+                new_dirs[dir_path] = [mtime, files, subdirs]
+                stack.extend(os.path.join(dir_path, name) for name in subdirs)
+
+            changed = relisted > 0 or len(new_dirs) != len(self.dirs)
+            self.dirs = new_dirs
+            if changed or self.table is None:
+                # Swapping in a new snapshot keeps concurrent searches consistent.
+                self.table = _SearchTable(self._all_paths())
+                self.save()
+            print(f"🗂️ File index refreshed: {len(new_dirs)} folders, {relisted} re-listed "
+                  f"in {time.perf_counter() - start:.2f}s.")
+            return relisted
+
+    def _refresh_forever(self, just_built: bool):
+        # Unless the index was just built, the first pass catches up on changes made since it was saved.
+        if just_built:
+            time.sleep(self.refresh_s)
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Warning: File index refresh failed: {e}")
+            time.sleep(self.refresh_s)
+
+    def ensure_ready(self):
+        """Loads (or builds) the index on first use and starts the background updater."""
+        just_built = False
+        if self.table is None:
+            with self._refresh_lock:
+                loaded = self.table is not None or self.load()
+            if not loaded:
+                self.refresh()
+                just_built = True
+        if self.refresh_s and self._refresher is None:
+            with self._refresh_lock:
+                if self._refresher is None:
+                    self._refresher = threading.Thread(target=self._refresh_forever, args=(just_built,),
+                                                       name="file-index-refresh", daemon=True)
+                    self._refresher.start()
+
+    # --- SearchBackend ---
+
+    def iter_results(self, query: str, offset: int = 0, limit: int | None = None,
+                     request_size: bool = False, request_date_modified: bool = False):
+        self.ensure_ready()
+        stop = None if limit is None else offset + limit
+        for path in islice(self.table.iter_paths(query), offset, stop):
+            size = date_modified = None
+            if request_size or request_date_modified:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Deleted since the last refresh.
+                size = stat.st_size if request_size else None
+                date_modified = stat.st_mtime if request_date_modified else None
+            yield SearchResult(path, size, date_modified)
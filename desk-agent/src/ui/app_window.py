@@ -1,24 +1,44 @@
 # src/ui/app_window.py
 
 import tkinter as tk
-from tkinter import scrolledtext, Entry, Button
+from tkinter import scrolledtext, Entry, Button, Label
 import asyncio
-from src.processing.intent_parser import parse_intent
-from src.processing.action_router import route_action
+import re
+import time
+from config import (
+    STREAMING_ENABLED,
+    TRANSCRIPT_LOG_PATH,
+    TRANSCRIPT_LOG_MAX_BYTES,
+    TRANSCRIPT_MAX_LINES,
+    TRANSCRIPT_PAGE_SIZE,
+)
+from src.memory.logs import AppendOnlyLog
+from src.processing.intent_parser import parse_intent, stream_intent
+from src.processing.action_router import route_action, StreamingDispatcher
+from src.processing.command_pipeline import CommandPipeline
+from src.processing.jobs import job_manager
+from src.ui.event_bridge import on_ui_thread
+from src.ui.transcript import TranscriptView
 
 class AppWindow(tk.Tk):
     def __init__(self, loop):
         super().__init__()
         self.loop = loop
+        # Set by main.py; forwards widget updates from the asyncio thread to Tk's thread.
+        self.bridge = None
         self.title("DeskAgent")
         self.geometry("700x500")
 
-        # This will store a command that is waiting for a 'yes' or 'no'.
-        self.pending_confirmation_command = None
+        # True while a streamed reply is being written into the conversation.
+        self.streaming_reply = False
 
         # --- UI Elements ---
         self.conversation_display = scrolledtext.ScrolledText(self, state='disabled', wrap=tk.WORD, font=("Helvetica", 11))
         self.conversation_display.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        # Keeps the widget small however long the session gets; older messages page in on scroll.
+        transcript_log = AppendOnlyLog(TRANSCRIPT_LOG_PATH)
+        transcript_log.trim_to_size(TRANSCRIPT_LOG_MAX_BYTES)
+        self.transcript = TranscriptView(self.conversation_display, transcript_log, TRANSCRIPT_MAX_LINES, TRANSCRIPT_PAGE_SIZE)
 
         self.input_frame = tk.Frame(self)
         self.input_frame.pack(padx=10, pady=(0, 10), fill=tk.X)
@@ -30,52 +50,187 @@ class AppWindow(tk.Tk):
         self.send_button = Button(self.input_frame, text="Send", command=self.on_submit)
         self.send_button.pack(side=tk.RIGHT, padx=(5, 0))
 
+        # Spoken commands go through the same path as typed ones.
+        self.voice = None
+        self.mic_button = Button(self.input_frame, text="🎤", command=self.toggle_voice)
+        self.mic_button.pack(side=tk.RIGHT, padx=(5, 0))
+
+        # Shows how many commands are parsing, waiting or running.
+        self.status_label = Label(self, anchor="w", fg="gray", font=("Helvetica", 9))
+        self.status_label.pack(padx=10, pady=(0, 5), fill=tk.X)
+
+        # Commands are parsed concurrently and executed in order; one awaiting confirmation holds the rest.
+        self.pipeline = CommandPipeline(
+            parse=self.parse_command,
+            execute=self.route_and_show,
+            notify=lambda message: self.add_message("System", message),
+            on_status=self.set_status,
+        )
+
         self.add_message("System", "Welcome to DeskAgent. I'm ready for your commands.")
 
+        # Background jobs (e.g. CrewAI runs) report progress and results from worker threads.
+        job_manager.add_listener(self.on_job_event)
+
+    def on_job_event(self, job, message: str):
+        self.add_message(f"Job #{job.id}", message)
+
+    @on_ui_thread
     def add_message(self, sender: str, message: str):
-        self.conversation_display.config(state='normal')
-        self.conversation_display.insert(tk.END, f"{sender}: {message}\n\n")
-        self.conversation_display.config(state='disabled')
-        self.conversation_display.yview(tk.END)
+        self.transcript.add(sender, message)
+
+    @on_ui_thread
+    def set_status(self, summary: str):
+        self.status_label.config(text=summary)
+
+    @on_ui_thread
+    def stream_token(self, token: str):
+        """Appends one token of a streamed reply, starting a new System message if needed."""
+        if not self.streaming_reply:
+            self.transcript.begin_stream("System")
+            self.streaming_reply = True
+        self.transcript.stream(token)
+
+    @on_ui_thread
+    def end_stream(self):
+        """Closes the streamed reply, if there was one."""
+        if self.streaming_reply:
+            self.transcript.end_stream()
+            self.streaming_reply = False
+
+    def toggle_voice(self):
+        if self.voice is None:
+            # NumPy and the audio stack are only loaded once voice input is actually used.
+            from src.audio.voice_input import VoiceInput
+            self.voice = VoiceInput(on_utterance=self.on_utterance, on_partial=self.on_partial_transcript,
+                                    on_error=self.on_voice_error)
+        if self.voice.listening:
+            self.voice.stop()
+            self.mic_button.config(relief=tk.RAISED)
+            self.set_status("")
+            return
+        try:
+            self.voice.start()
+        except Exception as e:
+            self.add_message("System", f"❌ Could not start voice input: {e}")
+            return
+        self.mic_button.config(relief=tk.SUNKEN)
+        self.set_status("🎤 Listening...")
+
+    @on_ui_thread
+    def on_voice_error(self, message: str):
+        # Listening has already stopped; show that instead of a mic that still looks on.
+        self.add_message("System", f"❌ Voice input stopped: {message}")
+        self.mic_button.config(relief=tk.RAISED)
+        self.set_status("")
+
+    def on_partial_transcript(self, utterance_id: int, text: str):
+        self.set_status(f"🎤 {text}...")
+
+    def on_utterance(self, utterance):
+        # Called on the transcriber's thread as soon as the utterance is transcribed.
+        asyncio.run_coroutine_threadsafe(self.process_voice(utterance), self.loop)
+
+    async def process_voice(self, utterance):
+        self.add_message("You (voice)", utterance.text)
+        self.set_status("🎤 Listening...")
+        # The trace starts when the user stopped talking, so it includes transcription.
+        command = await self.process_command(utterance.text, int(utterance.speech_end_time * 1e9))
+        if command is None:
+            return
+        await command.parse_task
+        intent_ms = (time.perf_counter() - utterance.speech_end_time) * 1000
+        print(f"🎤 End of speech → transcript {utterance.transcription_latency_s * 1000:.0f} ms "
+              f"(Whisper {utterance.inference_s * 1000:.0f} ms) → intent {intent_ms:.0f} ms")
+
+    def destroy(self):
+        if self.voice is not None:
+            self.voice.close()
+        super().destroy()
 
     def on_submit(self, event=None):
         user_input = self.input_entry.get()
         if not user_input.strip():
             return
         
+        submitted_ns = time.perf_counter_ns()
         self.add_message("You", user_input)
         self.input_entry.delete(0, tk.END)
 
-        # Schedule the async command processing
-        self.loop.create_task(self.process_command(user_input))
-
-    async def process_command(self, user_input: str):
-        # First, check if we are waiting for a confirmation.
-        if self.pending_confirmation_command:
-            if user_input.lower() in ["yes", "y"]:
-                # User confirmed. Route the stored command for execution.
-                command_to_execute = self.pending_confirmation_command
-                self.pending_confirmation_command = None # Clear state
-                result_message = await route_action(command_to_execute)
-                self.add_message("System", result_message)
-            else:
-                # User denied.
-                self.pending_confirmation_command = None # Clear state
-                self.add_message("System", "Action cancelled.")
-            return
+        # Schedule the async command processing on the asyncio thread
+        asyncio.run_coroutine_threadsafe(self.process_command(user_input, submitted_ns), self.loop)
 
-        # If not waiting for confirmation, this is a new command.
-        parsed_command = await parse_intent(user_input)
-        if not parsed_command:
-            self.add_message("System", "Sorry, I had trouble understanding that command.")
-            return
+    async def process_command(self, user_input: str, submitted_ns: int | None = None):
+        """
+        Handles one line of input; returns the queued PipelineCommand, if it became one.
+
+        Args:
+            user_input: The text the user typed or said.
+            submitted_ns: perf_counter_ns() when it was submitted; its trace starts there.
+        """
+        # Job control is handled locally; it must work while a crew is still running.
+        cancel_match = re.fullmatch(r"\s*(?:cancel|stop)\s+job\s+#?(\d+)\s*", user_input, re.IGNORECASE)
+        if cancel_match:
+            self.add_message("System", job_manager.cancel(int(cancel_match.group(1))))
+            return None
+        if user_input.strip().lower() in ("jobs", "list jobs", "show jobs"):
+            self.add_message("System", job_manager.describe_jobs())
+            return None
+
+        # Everything else (including yes/no replies) goes through the command pipeline.
+        return await self.pipeline.submit(user_input, submitted_ns)
+
+    async def parse_command(self, user_input: str, allow_early_dispatch: bool) -> dict | None | bool:
+        """Parses one command for the pipeline (see parse_streaming for the return values)."""
+        if STREAMING_ENABLED:
+            return await self.parse_streaming(user_input, allow_early_dispatch)
+        return await parse_intent(user_input)
+
+    async def route_and_show(self, command: dict):
+        """Routes a command and shows its result, streaming chat replies as they arrive."""
+        streamed = []
 
-        # Now, check the 'requires_confirmation' flag from the LLM's response.
-        if parsed_command.get("requires_confirmation"):
-            self.pending_confirmation_command = parsed_command
-            confirmation_prompt = parsed_command.get("message", "Are you sure?")
-            self.add_message("System", f"{confirmation_prompt} (yes/no)")
+        def on_token(token: str):
+            streamed.append(token)
+            self.stream_token(token)
+
+        result_message = await route_action(command, on_token=on_token)
+        if streamed:
+            self.end_stream()
         else:
-            # If no confirmation is needed, route it for execution immediately.
-            result_message = await route_action(parsed_command)
-            self.add_message("System", result_message)
\ No newline at end of file
+            self.add_message("System", result_message)
+
+    async def parse_streaming(self, user_input: str, allow_early_dispatch: bool = True) -> dict | None | bool:
+        """
+        Parses the command while it streams, running sequence steps as soon as each one is complete.
+
+        Args:
+            user_input: The raw text from the user.
+            allow_early_dispatch: False to only parse (e.g. while earlier commands haven't run yet).
+
+        Returns:
+            The command still left to route (only the steps that weren't dispatched early),
+            None if parsing failed, or False if everything was already executed.
+        """
+        dispatcher = StreamingDispatcher(held=not allow_early_dispatch)
+        parsed_command = None
+        async for kind, key, value in stream_intent(user_input):
+            if kind == "field":
+                dispatcher.on_field(key, value)
+            elif kind == "action":
+                dispatcher.on_action(key, value)
+            else:
+                parsed_command = value
+
+        early_results = await dispatcher.finish()
+        if not dispatcher.dispatched:
+            return parsed_command
+
+        self.add_message("System", "\n".join(early_results))
+        if dispatcher.failed or not parsed_command:
+            return False
+
+        remaining = parsed_command.get("actions", [])[dispatcher.dispatched:]
+        if not remaining:
+            return False
+        return dict(parsed_command, actions=remaining)
\ No newline at end of file
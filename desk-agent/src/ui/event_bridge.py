@@ -0,0 +1,115 @@
+# src/ui/event_bridge.py
+
+import asyncio
+import functools
+import queue
+import threading
+import tkinter as tk
+
+# How often Tk checks the UI queue when no wake-up event arrives. This is only a
+# safety net (e.g. for work queued before mainloop started), so it can be slow.
+HEARTBEAT_MS = 250
+
+
+class AsyncioTkBridge:
+    """
+    Runs the asyncio event loop on its own thread, next to Tk's mainloop.
+
+    Tk is not thread-safe, so UI work coming from the asyncio thread goes
+    through a queue. Queuing an item raises a virtual <<AsyncioWake>> event,
+    and Tk drains the queue with after_idle, so UI updates run on the next Tk
+    idle cycle with no fixed sleep in front of them. The only polling is a
+    HEARTBEAT_MS safety timer that catches wake-ups Tk could miss (e.g. work
+    queued before mainloop started); with nothing queued it returns at once,
+    so an idle agent uses almost no CPU.
+    """
+
+    def __init__(self, app: tk.Tk, loop: asyncio.AbstractEventLoop):
+        self.app = app
+        self.loop = loop
+        self.ui_thread = threading.current_thread()
+        self.ui_queue = queue.SimpleQueue()
+        self._wake_lock = threading.Lock()
+        self._wake_pending = False
+        self._thread = threading.Thread(target=self._run_loop, name="asyncio-loop", daemon=True)
+        app.bind("<<AsyncioWake>>", self._on_wake)
+
+    def start(self):
+        """Starts the asyncio thread and the Tk-side safety heartbeat."""
+        self._thread.start()
+        self.app.after(HEARTBEAT_MS, self._heartbeat)
+
+    def stop(self, timeout: float = 2.0):
+        """Stops the asyncio loop and waits briefly for its thread to exit."""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    # --- asyncio side ---
+
+    def submit(self, coro):
+        """Schedules a coroutine on the asyncio thread from any thread. Returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    # --- Tk side ---
+
+    def in_ui_thread(self) -> bool:
+        return threading.current_thread() is self.ui_thread
+
+    def call_in_ui(self, func, *args, **kwargs):
+        """Runs func on the Tk thread: immediately if already there, otherwise on the next idle cycle."""
+        if self.in_ui_thread():
+            func(*args, **kwargs)
+            return
+        self.ui_queue.put((func, args, kwargs))
+        with self._wake_lock:
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        try:
+            # Tcl marshals this onto the Tk thread, which wakes mainloop up.
+            self.app.event_generate("<<AsyncioWake>>", when="tail")
+        except (RuntimeError, tk.TclError):
+            # Mainloop isn't running (yet, or any more); the heartbeat will catch up.
+            pass
+
+    def _on_wake(self, event=None):
+        self.app.after_idle(self._drain)
+
+    def _drain(self):
+        with self._wake_lock:
+            self._wake_pending = False
+        while True:
+            try:
+                func, args, kwargs = self.ui_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                func(*args, **kwargs)
+            except tk.TclError:
+                # The widget went away (e.g. during shutdown).
+                pass
+
+    def _heartbeat(self):
+        self._drain()
+        self.app.after(HEARTBEAT_MS, self._heartbeat)
+
+
+def on_ui_thread(method):
+    """
+    Decorator for AppWindow methods that touch widgets.
+
+    Calls made from the asyncio thread are forwarded to the Tk thread through
+    the window's bridge; the forwarded call returns None.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        bridge = getattr(self, "bridge", None)
+        if bridge is None or bridge.in_ui_thread():
+            return method(self, *args, **kwargs)
+        bridge.call_in_ui(method, self, *args, **kwargs)
+    return wrapper
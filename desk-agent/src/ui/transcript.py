@@ -0,0 +1,185 @@
+# src/ui/transcript.py
+
+import time
+import tkinter as tk
+from collections import deque
+
+from src.memory.logs import AppendOnlyLog
+
+# Flushes are coalesced so the widget is touched at most once per frame.
+FRAME_MS = 16
+# Trim in bulk (once the widget is this much over its limit) rather than a line at a time.
+TRIM_SLACK = 1.1
+
+
+class _Block:
+    """One message as shown in the widget: its offset in the transcript log and its line count."""
+
+    __slots__ = ("offset", "lines", "shown")
+
+    def __init__(self, offset: int | None = None):
+        self.offset = offset
+        self.lines = 0
+        self.shown = False
+
+
+class TranscriptView:
+    """
+    Keeps a bounded window of the conversation in a Tk text widget.
+
+    Messages are queued and written in one insert per frame, so a burst of
+    job updates costs one widget update instead of dozens. The widget only
+    holds the newest `max_lines` lines: older messages are trimmed from the
+    top, but every message is also appended to the transcript log, and
+    scrolling to the top pages older ones back in from there. While you're
+    reading older messages the widget may grow to twice its limit; it is
+    trimmed back once you scroll to the bottom again.
+    """
+
+    def __init__(self, widget: tk.Text, log: AppendOnlyLog | None, max_lines: int, page_size: int):
+        self.widget = widget
+        self.log = log
+        self.max_lines = max_lines
+        self.page_size = page_size
+        self.blocks = deque()   # messages in the widget, oldest first
+        self.lines = 0
+        self.history_exhausted = log is None
+
+        self._pending = []      # (block, text) waiting for the next flush
+        self._unlogged = []     # (block, record) waiting to be written to the log
+        self._stream_block = None
+        self._stream_parts = None
+        self._stream_sender = None
+        self._flush_scheduled = False
+        self._last_flush = 0.0
+        self._paging = False
+
+        self._scrollbar_set = widget.cget("yscrollcommand")
+        widget.configure(yscrollcommand=self._on_scroll)
+
+    # --- Queuing ---
+
+    def add(self, sender: str, message: str):
+        """Queues a complete message."""
+        block = _Block()
+        self._pending.append((block, f"{sender}: {message}\n\n"))
+        self._unlogged.append((block, {"sender": sender, "message": message, "ts": time.time()}))
+        self._schedule_flush()
+
+    def begin_stream(self, sender: str):
+        """Starts a message whose text arrives in pieces through stream()."""
+        self._stream_block = _Block()
+        self._stream_parts = []
+        self._stream_sender = sender
+        self._pending.append((self._stream_block, f"{sender}: "))
+        self._schedule_flush()
+
+    def stream(self, text: str):
+        self._stream_parts.append(text)
+        self._pending.append((self._stream_block, text))
+        self._schedule_flush()
+
+    def end_stream(self):
+        """Finishes the streamed message and logs it as one record."""
+        block, message = self._stream_block, "".join(self._stream_parts)
+        self._pending.append((block, "\n\n"))
+        self._unlogged.append((block, {"sender": self._stream_sender, "message": message, "ts": time.time()}))
+        self._stream_block = self._stream_parts = None
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        # Flush on the next idle cycle, unless the last flush was less than a frame ago.
+        wait_ms = int(FRAME_MS - (time.perf_counter() - self._last_flush) * 1000)
+        if wait_ms > 0:
+            self.widget.after(wait_ms, self.flush)
+        else:
+            self.widget.after_idle(self.flush)
+
+    # --- Widget updates ---
+
+    def flush(self):
+        """Writes everything queued to the log and the widget in one go."""
+        self._flush_scheduled = False
+        self._last_flush = time.perf_counter()
+        if self._unlogged and self.log is not None:
+            offsets = self.log.extend([record for _, record in self._unlogged])
+            for (block, _), offset in zip(self._unlogged, offsets):
+                block.offset = offset
+        self._unlogged = []
+        if not self._pending:
+            return
+
+        text = []
+        for block, chunk in self._pending:
+            block.lines += chunk.count("\n")
+            self.lines += chunk.count("\n")
+            if not block.shown:
+                block.shown = True
+                self.blocks.append(block)
+            text.append(chunk)
+        self._pending = []
+
+        widget = self.widget
+        at_bottom = widget.yview()[1] >= 0.999
+        widget.config(state="normal")
+        widget.insert(tk.END, "".join(text))
+        # Keep everything while the user is reading older messages, up to twice the limit.
+        limit = self.max_lines if at_bottom else 2 * self.max_lines
+        if self.lines > limit * TRIM_SLACK:
+            self._trim_top(self.max_lines if at_bottom else limit)
+        widget.config(state="disabled")
+        if at_bottom:
+            widget.yview(tk.END)
+
+    def _trim_top(self, target_lines: int):
+        removed = 0
+        # Never trim the message that's still streaming in.
+        while self.lines - removed > target_lines and len(self.blocks) > 1:
+            removed += self.blocks.popleft().lines
+        if removed:
+            self.widget.delete("1.0", f"{removed + 1}.0")
+            self.lines -= removed
+            if self.log is not None:
+                self.history_exhausted = False
+
+    # --- Paging older messages back in ---
+
+    def _on_scroll(self, first: str, last: str):
+        if self._scrollbar_set:
+            self.widget.tk.call(self._scrollbar_set, first, last)
+        # Only when the user has scrolled to the top of a view that actually overflows.
+        if float(first) <= 0.0 and float(last) < 1.0 and not self._paging and not self.history_exhausted:
+            self._paging = True
+            self.widget.after_idle(self.page_older)
+
+    def page_older(self):
+        """Inserts the page of messages just before the oldest one shown, keeping the view in place."""
+        self._paging = False
+        if not self.blocks or self.blocks[0].offset is None or self.lines >= 2 * self.max_lines:
+            return
+        records = self.log.read_before(self.blocks[0].offset, self.page_size)
+        if not records:
+            self.history_exhausted = True
+            return
+
+        text = []
+        blocks = []
+        for offset, record in records:
+            chunk = f"{record['sender']}: {record['message']}\n\n"
+            block = _Block(offset)
+            block.lines = chunk.count("\n")
+            block.shown = True
+            blocks.append(block)
+            text.append(chunk)
+        added = sum(block.lines for block in blocks)
+        self.blocks.extendleft(reversed(blocks))
+        self.lines += added
+
+        self.widget.config(state="normal")
+        self.widget.insert("1.0", "".join(text))
+        self.widget.config(state="disabled")
+        # Keep the message that was at the top where it was on screen.
+        self.widget.yview(f"{added + 1}.0")
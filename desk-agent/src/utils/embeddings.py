@@ -0,0 +1,58 @@
+# src/utils/embeddings.py
+
+import threading
+
+from config import EMBEDDING_MODEL
+
+# The sentence-transformers model takes a few seconds to load, so it is only
+# built the first time something actually needs an embedding.
+_model = None
+_model_lock = threading.Lock()
+_unavailable = False
+
+
+def get_embedder():
+    """
+    Returns the shared sentence-transformers model, loading it on first use.
+
+    Returns:
+        The SentenceTransformer instance, or None if the library isn't installed.
+    """
+    global _model, _unavailable
+    if _model is not None or _unavailable:
+        return _model
+    with _model_lock:
+        if _model is None and not _unavailable:
+            try:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+            except ImportError as e:
+                print(f"⚠️ Warning: Embeddings disabled, sentence-transformers is unavailable ({e}).")
+                _unavailable = True
+    return _model
+
+
+def embed(texts: list[str], batch_size: int = 32):
+    """
+    Embeds a batch of texts into L2-normalized float32 vectors.
+
+    Normalized vectors let a FAISS inner-product index return cosine similarity.
+
+    Args:
+        texts: The texts to embed.
+        batch_size: How many texts the model encodes per forward pass.
+
+    Returns:
+        A (len(texts), dim) numpy array, or None if embeddings are unavailable.
+    """
+    model = get_embedder()
+    if model is None:
+        return None
+    vectors = model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return vectors.astype("float32")
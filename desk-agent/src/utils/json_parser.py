@@ -3,27 +3,590 @@
 import json
 import re
 
+_decoder = json.JSONDecoder()
+# The characters that matter when looking for the end of an object; everything else is skipped in C.
+_STRUCTURAL = re.compile(r'[{}"\\]')
+_STRING_END = re.compile(r'["\\]')
+_WORD = re.compile(r"[A-Za-z_][\w.\-]*")
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_VALUE_END = set('"}]') | set("0123456789") | set("el")  # ...or the end of true/false/null
+
+
+def find_json_object(text: str, start: int = 0) -> tuple[int, int | None] | None:
+    """
+    Finds the first object starting at or after `start`, in one pass over the text.
+
+    Only braces outside double-quoted strings count, so prose and markdown
+    around the object are skipped.
+
+    Returns:
+        (start, end) of the object, with end None if the text stops before the
+        object closes (a truncated response), or None if there is no '{' at all.
+    """
+    start = text.find("{", start)
+    if start == -1:
+        return None
+    depth = 0
+    pos = start
+    while True:
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            return start, None
+        ch = match.group()
+        pos = match.end()
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return start, pos
+        elif ch == '"':
+            # Jump to the closing quote, stepping over escapes.
+            while True:
+                match = _STRING_END.search(text, pos)
+                if match is None:
+                    return start, None
+                pos = match.end()
+                if match.group() == '"':
+                    break
+                pos += 1  # the escaped character
+        else:
+            pos += 1  # a stray backslash outside a string
+
+
+def repair_json(text: str) -> str:
+    """
+    Fixes the JSON mistakes language models commonly make, in a single pass.
+
+    Handles trailing commas, missing commas between members, // # and /* */
+    comments, single-quoted strings, raw newlines inside strings, unquoted
+    keys, Python literals (True/False/None), and a missing closing brace on
+    the top-level object.
+
+    A response that was cut off anywhere else is not completed: closing a
+    string would turn "report_fin" into a file name, and closing an action
+    (or the actions list) would run part of a plan.
+
+    Args:
+        text: JSON-like text starting at its opening '{'.
+
+    Returns:
+        Text that json.loads is much more likely to accept (not guaranteed).
+
+    Raises:
+        ValueError: The text ends inside a string or inside a nested object or list.
+    """
+    out = []
+    stack = []
+    last = ""       # the last significant character written
+    i, n = 0, len(text)
+
+    def value_start():
+        # Two values in a row inside a container means a comma went missing.
+        if stack and last in _VALUE_END:
+            out.append(",")
+
+    def drop_trailing_comma():
+        if last == ",":
+            for k in range(len(out) - 1, -1, -1):
+                if out[k] == ",":
+                    del out[k]
+                    break
+
+    while i < n:
+        ch = text[i]
+        if ch in "\"'":
+            value_start()
+            quote = ch
+            chars = ['"']
+            i += 1
+            while i < n and text[i] != quote:
+                c = text[i]
+                if c == "\\" and i + 1 < n:
+                    chars.append(text[i:i + 2] if text[i + 1] != "'" else "'")
+                    i += 2
+                    continue
+                chars.append({'"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"}.get(c, c))
+                i += 1
+            if i >= n:
+                raise ValueError("the response ends inside a string")
+            chars.append('"')
+            out.append("".join(chars))
+            last = '"'
+            i += 1
+            continue
+        if ch == "#" or text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch in "{[":
+            value_start()
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+            last = ch
+        elif ch in "}]":
+            drop_trailing_comma()
+            if stack:
+                out.append(stack.pop())
+            last = "}"
+            if not stack:
+                break
+        elif ch == ",":
+            if last not in ",{[":
+                out.append(ch)
+                last = ch
+        elif ch == ":":
+            out.append(ch)
+            last = ch
+        elif ch.isalpha() or ch == "_":
+            word = _WORD.match(text, i).group()
+            i += len(word)
+            value_start()
+            word = _PYTHON_LITERALS.get(word, word)
+            if word in ("true", "false", "null") and not text[i:].lstrip().startswith(":"):
+                out.append(word)
+                last = word[-1]
+            else:
+                out.append(json.dumps(word))  # an unquoted key (or bare word value)
+                last = '"'
+            continue
+        elif ch in "-+." or ch.isdigit():
+            number = _NUMBER.match(text, i)
+            if number:
+                value_start()
+                out.append(number.group().lstrip("+"))
+                last = "0"
+                i = number.end()
+                continue
+        elif not ch.isspace():
+            pass  # stray punctuation (e.g. an ellipsis) is dropped
+        else:
+            out.append(ch)
+        i += 1
+
+    if len(stack) > 1:
+        raise ValueError("the response ends inside a nested object or list")
+    drop_trailing_comma()
+    if last == ":":
+        out.append("null")
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _loads_lenient(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(repair_json(text))
+    except ValueError:  # including json.JSONDecodeError
+        return _INVALID
+
+
 def extract_json_from_response(text: str) -> dict | None:
     """
-    Finds and parses a JSON object from a string, even if it's embedded in other text.
-    
+    Finds and parses the first JSON object in a model response, even if it's embedded in other text.
+
+    Well-formed JSON is decoded directly (prose or a markdown fence around it
+    is fine). Otherwise the first complete object is located with a single
+    scan and common defects (trailing commas, comments, single quotes,
+    a missing final brace, ...) are repaired instead of giving up.
+
     Args:
         text: The string potentially containing a JSON object.
 
     Returns:
         A dictionary if JSON is found and parsed, otherwise None.
     """
-    # Look for a JSON block within markdown ```json ... ```
-    match = re.search(r"```json\s*(\{.*?\})\s*```", text, re.DOTALL)
-    if match:
-        json_str = match.group(1)
-    else:
-        # If no markdown block, assume the whole string might be JSON or contain it
-        json_str = text
+    start = text.find("{")
+    if start != -1:
+        try:
+            # raw_decode stops at the end of the object, so trailing prose doesn't matter.
+            obj, _ = _decoder.raw_decode(text, start)
+            if isinstance(obj, dict):
+                return obj
+        except json.JSONDecodeError:
+            pass
 
-    try:
-        # Attempt to parse the extracted string as JSON
-        return json.loads(json_str)
-    except json.JSONDecodeError:
-        print(f"⚠️ Warning: Could not decode JSON from the model's response.")
-        return None
\ No newline at end of file
+    position = 0
+    while True:
+        found = find_json_object(text, position)
+        if found is None:
+            break
+        start, end = found
+        obj = _loads_lenient(text[start:end])
+        if isinstance(obj, dict):
+            return obj
+        if end is None:
+            break
+        position = end  # e.g. "{braces}" in prose before the real object
+
+    print(f"⚠️ Warning: Could not decode JSON from the model's response.")
+    return None
+
+
+# --- Intent schema ---
+
+_JSON_TYPES = {
+    "string": str,
+    "number": (int, float),
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+    "null": type(None),
+}
+
+
+def _compile_type(type_names) -> tuple[list[str], tuple]:
+    names = type_names if isinstance(type_names, list) else [type_names]
+    types = []
+    for name in names:
+        python_type = _JSON_TYPES[name]
+        types.extend(python_type if isinstance(python_type, tuple) else (python_type,))
+    return names, tuple(types)
+
+
+def compile_schema(schema: dict):
+    """
+    Turns a JSON-Schema-like dict (type, properties, required, items, enum) into a validator function.
+
+    The schema is walked once here; validating is then just a chain of closures.
+
+    Returns:
+        validate(value, path="$") -> a list of problems (empty if valid).
+    """
+    checks = []
+    if "type" in schema:
+        names, types = _compile_type(schema["type"])
+
+        def check_type(value, path="$"):
+            # bool is an int in Python, but not a JSON number.
+            if not isinstance(value, types) or (isinstance(value, bool) and "boolean" not in names):
+                return [f"{path} should be {' or '.join(names)}"]
+            return []
+        checks.append(check_type)
+    if "enum" in schema:
+        allowed = set(schema["enum"])
+        checks.append(lambda value, path="$": [] if value in allowed else [f"{path} should be one of {sorted(allowed)}"])
+    if "properties" in schema or "required" in schema:
+        # Properties that only constrain the type are checked inline; the rest get their own validator.
+        typed = [(key, *_compile_type(sub["type"])) for key, sub in schema.get("properties", {}).items() if set(sub) == {"type"}]
+        nested = [(key, compile_schema(sub)) for key, sub in schema.get("properties", {}).items() if set(sub) != {"type"}]
+        required = schema.get("required", [])
+
+        def check_object(value, path="$"):
+            if not isinstance(value, dict):
+                return []
+            problems = [f"{path}.{key} is required" for key in required if key not in value]
+            for key, names, types in typed:
+                if key in value:
+                    item = value[key]
+                    if not isinstance(item, types) or (isinstance(item, bool) and "boolean" not in names):
+                        problems.append(f"{path}.{key} should be {' or '.join(names)}")
+            for key, validate in nested:
+                if key in value:
+                    problems.extend(validate(value[key], f"{path}.{key}"))
+            return problems
+        checks.append(check_object)
+    if "items" in schema:
+        validate_item = compile_schema(schema["items"])
+        checks.append(lambda value, path="$": [p for i, item in enumerate(value) for p in validate_item(item, f"{path}[{i}]")]
+                      if isinstance(value, list) else [])
+
+    if len(checks) == 1:
+        return checks[0]
+
+    def validate(value, path: str = "$") -> list[str]:
+        for check in checks:
+            problems = check(value, path)
+            if problems:
+                return problems
+        return []
+    return validate
+
+
+_ACTION_PROPERTIES = {
+    "type": {"type": "string"},
+    "intent": {"type": "string"},
+    "action_type": {"type": "string"},
+    "target": {"type": ["string", "null"]},
+    "params": {"type": "object"},
+    "arguments": {"type": "object"},
+    "confidence": {"type": "number"},
+    "requires_confirmation": {"type": "boolean"},
+    "is_multi_step": {"type": "boolean"},
+    "message": {"type": "string"},
+}
+
+ACTION_SCHEMA = {"type": "object", "properties": _ACTION_PROPERTIES, "required": ["intent"]}
+
+INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **_ACTION_PROPERTIES,
+        "actions": {"type": "array", "items": ACTION_SCHEMA},
+    },
+    "required": ["action_type", "message"],
+}
+
+validate_intent_schema = compile_schema(INTENT_SCHEMA)
+validate_action_schema = compile_schema(ACTION_SCHEMA)
+
+# Keys models use instead of "target" (the old prompt showed "app_name").
+_TARGET_ALIASES = ("app_name", "application", "app", "file", "filename", "file_name", "path", "folder")
+_ROUTABLE_TYPES = ("os", "git", "sequence", "chat", "crew")
+
+# The fields the intent model has to produce when its output is constrained to a
+# schema (see build_output_schema). "type" and "is_multi_step" are left out: nothing
+# reads them, and every field the model writes is generation time.
+_OUTPUT_FIELDS = ("action_type", "intent", "target", "params", "arguments", "requires_confirmation", "confidence", "message")
+
+
+def build_output_schema(action_types=_ROUTABLE_TYPES) -> dict:
+    """
+    Derives the JSON Schema the intent model's output is constrained to from the intent schema.
+
+    Unlike INTENT_SCHEMA, which accepts whatever models tend to write, this one
+    is strict: action_type comes first (so streamed steps are routed early) and
+    must be a type route_action handles, and no other keys are allowed.
+
+    Args:
+        action_types: The action types the model may choose from.
+
+    Returns:
+        A JSON Schema for Ollama's `format` or LiteLLM's `response_format`.
+    """
+    def command(allowed_types):
+        properties = {key: dict(_ACTION_PROPERTIES[key]) for key in _OUTPUT_FIELDS}
+        properties["action_type"] = {"type": "string", "enum": list(allowed_types)}
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": ["action_type", "intent", "target", "message"],
+            "additionalProperties": False,
+        }
+
+    schema = command(action_types)
+    schema["properties"]["actions"] = {"type": "array", "items": command([t for t in action_types if t != "sequence"])}
+    return schema
+
+
+INTENT_OUTPUT_SCHEMA = build_output_schema()
+
+
+def _repair_command(command: dict, problems: list[str], path: str):
+    """Coerces the fields of one intent or action in place, recording what was fixed."""
+    if not command.get("target"):
+        for alias in _TARGET_ALIASES:
+            if isinstance(command.get(alias), str):
+                command["target"] = command.pop(alias)
+                problems.append(f"{path}: used '{alias}' as target")
+                break
+    if "target" in command and command["target"] is not None and not isinstance(command["target"], str):
+        command["target"] = str(command["target"])
+    for key in ("params", "arguments"):
+        if key in command and not isinstance(command[key], dict):
+            problems.append(f"{path}: dropped non-object {key}")
+            del command[key]
+    if "confidence" in command:
+        try:
+            command["confidence"] = min(max(float(command["confidence"]), 0.0), 1.0)
+        except (TypeError, ValueError):
+            problems.append(f"{path}: dropped unreadable confidence")
+            del command["confidence"]
+    for key in ("requires_confirmation", "is_multi_step"):
+        if isinstance(command.get(key), str):
+            command[key] = command[key].strip().lower() in ("true", "yes", "1")
+    if not command.get("action_type") and command.get("type") in _ROUTABLE_TYPES:
+        command["action_type"] = command["type"]
+
+
+def _repair_action(action: dict, problems: list[str], path: str):
+    _repair_command(action, problems, path)
+    action.setdefault("action_type", "os")
+
+
+def validate_action(action, path: str = "$.actions[0]") -> dict | None:
+    """
+    Checks and repairs one action of a sequence on its own, the way validate_intent does for each step.
+
+    For streamed actions, which are dispatched before the rest of the command
+    (and its validate_intent) has arrived.
+
+    Args:
+        action: One complete action object.
+        path: Where it is in the command, for messages.
+
+    Returns:
+        The (repaired) action, or None if it can't be used.
+    """
+    if not isinstance(action, dict) or not action.get("intent"):
+        return None
+    fixed = []
+    _repair_action(action, fixed, path)
+    problems = validate_action_schema(action, path)
+    if fixed:
+        print(f"🩹 Repaired action: {'; '.join(fixed)}")
+    if problems:
+        print(f"⚠️ Warning: Action doesn't match the schema: {'; '.join(problems)}")
+        return None
+    return action
+
+
+def validate_intent(obj) -> dict | None:
+    """
+    Checks a parsed response against the intent schema, repairing what can be repaired.
+
+    Fixable problems (a missing action_type that follows from `type` or
+    `actions`, "app_name" instead of "target", a confidence given as a string,
+    a missing message, ...) are fixed in place, so the model doesn't have to
+    be asked again.
+
+    Args:
+        obj: The output of extract_json_from_response.
+
+    Returns:
+        The (repaired) intent dictionary, or None if it can't be used.
+    """
+    if not isinstance(obj, dict):
+        return None
+    fixed = []
+    _repair_command(obj, fixed, "$")
+
+    actions = obj.get("actions")
+    if isinstance(actions, list):
+        kept = []
+        for i, action in enumerate(actions):
+            if isinstance(action, dict) and action.get("intent"):
+                _repair_action(action, fixed, f"$.actions[{i}]")
+                kept.append(action)
+            else:
+                fixed.append(f"$.actions[{i}]: dropped (no intent)")
+        obj["actions"] = kept
+        if kept and (obj.get("type") == "sequence" or not obj.get("intent")):
+            # The router dispatches on action_type, which models often fill with a category instead.
+            obj["action_type"] = "sequence"
+    elif actions is not None:
+        fixed.append("$.actions: dropped non-list actions")
+        del obj["actions"]
+
+    if not obj.get("action_type") and obj.get("intent"):
+        obj["action_type"] = "os"
+    if not obj.get("message"):
+        obj["message"] = f"Running {obj.get('intent') or 'your request'}."
+
+    problems = validate_intent_schema(obj)
+    if not obj.get("intent") and not obj.get("actions"):
+        problems.append("$ has neither an intent nor any actions")
+    if fixed:
+        print(f"🩹 Repaired intent: {'; '.join(fixed)}")
+    if problems:
+        print(f"⚠️ Warning: Intent doesn't match the schema: {'; '.join(problems)}")
+        return None
+    return obj
+
+
+def parse_intent_response(text: str) -> dict | None:
+    """Extracts, repairs and validates the intent in a model response."""
+    return validate_intent(extract_json_from_response(text))
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object as it streams in, reporting pieces as soon as they are complete.
+
+    Feed it text chunks from the model. It skips anything before the first '{'
+    (prose, markdown fences) and emits:
+        ("field", key, value)   when a top-level field's value is complete,
+        ("action", index, dict) when an element of the top-level "actions" list is complete,
+        ("done", None, None)    when the top-level object closes.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.stack = []          # open containers: '{' or '['
+        self.in_string = False
+        self.escaped = False
+        self.done = False
+        self.key = None          # the current top-level key
+        self.key_start = None
+        self.value_start = None
+        self.action_start = None
+        self.action_index = 0
+
+    def feed(self, chunk: str) -> list[tuple]:
+        """
+        Consumes the next chunk of text.
+
+        Args:
+            chunk: The next piece of the model's response.
+
+        Returns:
+            The events completed by this chunk, in order.
+        """
+        self.buffer += chunk
+        events = []
+        buf = self.buffer
+        while self.pos < len(buf) and not self.done:
+            ch = buf[self.pos]
+            depth = len(self.stack)
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+                    if depth == 1 and self.value_start is None:
+                        self.key = self._loads(buf[self.key_start:self.pos + 1])
+            elif depth == 0:
+                if ch == "{":
+                    self.stack.append(ch)
+            elif ch == '"':
+                self.in_string = True
+                if depth == 1 and self.value_start is None:
+                    self.key_start = self.pos
+            elif depth == 1 and ch == ":":
+                self.value_start = self.pos + 1
+            elif depth == 1 and ch in ",}":
+                if self.value_start is not None:
+                    value = self._loads(buf[self.value_start:self.pos])
+                    if self.key is not None and value is not _INVALID:
+                        events.append(("field", self.key, value))
+                self.key, self.value_start = None, None
+                if ch == "}":
+                    self.stack.pop()
+                    self.done = True
+                    events.append(("done", None, None))
+            elif ch in "{[":
+                self.stack.append(ch)
+                if ch == "{" and depth == 2 and self.key == "actions" and self.stack[1] == "[":
+                    self.action_start = self.pos
+            elif ch in "}]":
+                self.stack.pop()
+                if ch == "}" and self.action_start is not None and len(self.stack) == 2:
+                    action = _loads_lenient(buf[self.action_start:self.pos + 1])
+                    if isinstance(action, dict):
+                        events.append(("action", self.action_index, action))
+                    self.action_index += 1
+                    self.action_start = None
+            self.pos += 1
+        return events
+
+    @staticmethod
+    def _loads(text: str):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return _INVALID
+
+
+# Marks a fragment the incremental parser couldn't decode; the final full parse still runs.
+_INVALID = object()
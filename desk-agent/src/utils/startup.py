@@ -0,0 +1,102 @@
+# src/utils/startup.py
+
+import importlib
+import re
+import subprocess
+import sys
+import threading
+import time
+
+# Captured as early as possible: main.py imports this module first.
+PROCESS_START = time.perf_counter()
+
+# Heavy modules and clients that the first command would otherwise pay for.
+PREWARM_MODULES = ["litellm", "langchain_google_genai", "src.agents.crew_setup"]
+
+_marks = {}
+
+
+def mark(label: str):
+    """Records how long after process start a startup milestone was reached."""
+    _marks[label] = time.perf_counter() - PROCESS_START
+
+
+def get_mark(label: str) -> float | None:
+    return _marks.get(label)
+
+
+def _prewarm():
+    start = time.perf_counter()
+    for module in PREWARM_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not prewarm '{module}': {e}")
+    try:
+        from src.routing.model_router import get_litellm
+        from src.utils.embeddings import get_embedder
+        from src.memory.conversation_history import get_memory
+        get_litellm()
+        get_embedder()
+        get_memory()
+    except Exception as e:
+        print(f"⚠️ Warning: Could not prewarm model clients: {e}")
+    mark("prewarm_done")
+    print(f"🔥 Prewarm finished in {time.perf_counter() - start:.2f}s.")
+
+
+def start_prewarm() -> threading.Thread:
+    """Loads heavy frameworks and LLM clients on a background thread, after the window is up."""
+    thread = threading.Thread(target=_prewarm, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def measure_import_costs(module: str, top: int = 15) -> list[tuple[str, float]]:
+    """
+    Measures per-module import cost in a fresh interpreter using `python -X importtime`.
+
+    Args:
+        module: The module to import (e.g. "src.ui.app_window").
+        top: How many of the most expensive modules to return.
+
+    Returns:
+        (module name, cumulative seconds) pairs, most expensive first.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    costs = {}
+    for line in completed.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)", line)
+        if match:
+            cumulative_us, name = match.groups()
+            # Report third-party/stdlib packages as a whole, and our own modules individually.
+            if "." not in name or name.startswith("src."):
+                costs[name] = max(costs.get(name, 0.0), int(cumulative_us) / 1e6)
+    return sorted(costs.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def print_startup_report(budget_s: float) -> bool:
+    """
+    Prints time-to-window and the most expensive imports.
+
+    Args:
+        budget_s: The time-to-window budget in seconds.
+
+    Returns:
+        True if the window appeared within budget.
+    """
+    time_to_window = get_mark("window_shown")
+    print("--- Startup report ---")
+    for label, seconds in sorted(_marks.items(), key=lambda item: item[1]):
+        print(f"   {label:<20} {seconds * 1000:8.1f} ms")
+    print("   Most expensive imports for the UI (fresh interpreter):")
+    for name, seconds in measure_import_costs("src.ui.app_window"):
+        print(f"     {name:<40} {seconds * 1000:8.1f} ms")
+    within_budget = time_to_window is not None and time_to_window <= budget_s
+    verdict = "✅ within" if within_budget else "❌ over"
+    shown = f"{time_to_window:.2f}s" if time_to_window is not None else "never"
+    print(f"   Time to window: {shown} ({verdict} the {budget_s:.2f}s budget)")
+    return within_budget
@@ -0,0 +1,225 @@
+# src/utils/tracing.py
+
+import contextvars
+import functools
+import inspect
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from config import TRACING_ENABLED
+
+# The span the running code belongs to. asyncio tasks and asyncio.to_thread copy it;
+# plain thread pools need wrap_context() (see JobManager).
+_current = contextvars.ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+_exporter = None
+_pending = {}       # trace id -> finished span records, until the root span ends
+_lock = threading.Lock()
+
+
+class Span:
+    """
+    One timed step of a command, e.g. "parse" or "tool".
+
+    Timestamps come from time.perf_counter_ns(), which is monotonic and shared
+    by every thread, so spans from the UI thread, the asyncio loop and worker
+    threads line up. A span with no parent starts a trace; its spans are
+    exported together when it ends.
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "trace_start_ns", "start_ns", "end_ns",
+                 "attributes", "error")
+
+    def __init__(self, name: str, parent: "Span | None", attributes: dict, start_ns: int | None = None):
+        self.name = name
+        self.span_id = next(_span_ids)
+        self.start_ns = time.perf_counter_ns() if start_ns is None else start_ns
+        if parent is None:
+            self.trace_id = os.urandom(8).hex()
+            self.parent_id = None
+            self.trace_start_ns = self.start_ns
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.trace_start_ns = parent.trace_start_ns
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    @property
+    def duration_ms(self) -> float | None:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes):
+        """Adds attributes, e.g. the model that answered or whether a cache hit."""
+        self.attributes.update(attributes)
+
+    def end(self, error: BaseException | None = None, **attributes):
+        """Finishes the span (only the first call counts) and hands it to the exporter."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.perf_counter_ns()
+        self.attributes.update(attributes)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        _finish(self)
+
+    def as_dict(self) -> dict:
+        record = {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start_ms": (self.start_ns - self.trace_start_ns) / 1e6,
+            "duration_ms": self.duration_ms,
+            "thread": threading.current_thread().name,
+        }
+        if self.parent_id is None:
+            # Wall-clock time only for the root, to find a trace by when it happened.
+            record["time"] = time.time() - (time.perf_counter_ns() - self.start_ns) / 1e9
+        if self.attributes:
+            record["attrs"] = self.attributes
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class _NoSpan:
+    """Stands in for Span while tracing is off, so call sites don't need to check."""
+
+    trace_id = span_id = None
+    duration_ms = None
+
+    def set(self, **attributes):
+        pass
+
+    def end(self, error=None, **attributes):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def set_exporter(exporter):
+    """
+    Sets where finished traces go: any object with export(records), e.g. a SpanExporter.
+
+    Returns:
+        The previous exporter.
+    """
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    return previous
+
+
+def _get_exporter():
+    global _exporter
+    if _exporter is None:
+        from src.memory.logs import get_span_exporter
+        _exporter = get_span_exporter()
+    return _exporter
+
+
+def _finish(span: Span):
+    record = span.as_dict()
+    with _lock:
+        if span.parent_id is None:
+            records = _pending.pop(span.trace_id, [])
+            records.append(record)
+        elif span.trace_id in _pending:
+            _pending[span.trace_id].append(record)
+            return
+        else:
+            # The trace is already exported (e.g. a crew job outliving its command): write it on its own.
+            records = [record]
+    _get_exporter().export(records)
+
+
+def current_span() -> Span:
+    """The span the running code belongs to (a no-op stand-in if there is none), e.g. to set() attributes on it."""
+    return _current.get() or _NO_SPAN
+
+
+def start_span(name: str, start_ns: int | None = None, **attributes) -> Span:
+    """
+    Starts a span under the current one without making it current; call end() when done.
+
+    Use this where a `with` block can't be: spans that outlive the function that
+    starts them, or async generators (a context variable set inside one would
+    leak into whoever iterates it).
+
+    Args:
+        name: The step being timed.
+        start_ns: perf_counter_ns() when the step really began, if earlier than now.
+        **attributes: Extra fields for the exported record.
+    """
+    if not TRACING_ENABLED:
+        return _NO_SPAN
+    span = Span(name, _current.get(), attributes, start_ns)
+    if span.parent_id is None:
+        with _lock:
+            _pending[span.trace_id] = []
+    return span
+
+
+@contextmanager
+def activate(span: Span):
+    """Makes an existing span the current one for the block, e.g. a command's root span in a later task."""
+    if span is _NO_SPAN or span is None:
+        yield span
+        return
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Times a block as a child of the current span; spans started inside it become its children.
+
+    Exceptions are recorded on the span and re-raised.
+    """
+    current = start_span(name, **attributes)
+    if current is _NO_SPAN:
+        yield current
+        return
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+def traced(name: str | None = None):
+    """Decorator form of span() for plain and async functions."""
+    def decorate(function):
+        span_name = name or function.__qualname__
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def wrap_context(function):
+    """Binds a function to the caller's context, so spans it starts on another thread keep their parent."""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, function)
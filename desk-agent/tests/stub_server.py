@@ -0,0 +1,184 @@
+# tests/stub_server.py
+
+import asyncio
+import json
+import time
+
+# A canned intent, so the intent parser has something valid to parse.
+DEFAULT_REPLY = json.dumps({
+    "type": "os",
+    "intent": "open_application",
+    "action_type": "os",
+    "target": "notepad",
+    "confidence": 0.95,
+    "requires_confirmation": False,
+    "message": "Opening notepad.",
+})
+
+
+class StubLLMServer:
+    """
+    A tiny local server that speaks enough of Ollama's HTTP API for tests and benchmarks.
+
+    It serves POST /api/chat (streamed NDJSON or a single JSON body) and
+    POST /api/generate (model load), over keep-alive HTTP/1.1 connections.
+    Replies come from `responder(payload) -> str`, and the server can simulate
+    model latency with a delay before the first token and between tokens.
+    Each chunk counts as one token, so options.num_predict cuts the reply short.
+    To exercise routing, individual models can be made slow (model_ttft_delay_s)
+    or made to fail with a 500 (failing_models); both can be changed while running.
+
+    Run it standalone and point OLLAMA_BASE_URL at it:
+        python -m tests.stub_server 11435
+    """
+
+    def __init__(self, responder=None, ttft_delay_s: float = 0.0, token_delay_s: float = 0.0,
+                 chunk_chars: int = 4, host: str = "127.0.0.1", port: int = 0):
+        self.responder = responder or (lambda payload: DEFAULT_REPLY)
+        self.ttft_delay_s = ttft_delay_s
+        self.token_delay_s = token_delay_s
+        self.chunk_chars = chunk_chars
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.requests = 0
+        self.payloads = []              # /api/chat request bodies
+        self.warm_ups = []              # /api/generate (model load) request bodies
+        self.model_ttft_delay_s = {}    # model -> delay before its first token, overriding ttft_delay_s
+        self.failing_models = set()
+        self._server = None
+        self._handlers = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "StubLLMServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise keep their handlers waiting.
+            for writer in self._handlers.values():
+                writer.close()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    # --- HTTP handling ---
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._handlers[asyncio.current_task()] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.requests += 1
+                await self._route(method, path, json.loads(body) if body else {}, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._handlers.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _route(self, method: str, path: str, payload: dict, writer: asyncio.StreamWriter):
+        if method == "POST" and path == "/api/generate":
+            self.warm_ups.append(payload)
+            await self._send_json(writer, {"model": payload.get("model"), "response": "", "done": True})
+        elif method == "POST" and path == "/api/chat":
+            self.payloads.append(payload)
+            if payload.get("model") in self.failing_models:
+                await self._send_json(writer, {"error": "model failed"}, status="500 Internal Server Error")
+                return
+            await self._chat(payload, writer)
+        else:
+            await self._send_json(writer, {"error": f"{method} {path} not found"}, status="404 Not Found")
+
+    async def _chat(self, payload: dict, writer: asyncio.StreamWriter):
+        start = time.perf_counter()
+        reply = self.responder(payload)
+        prompt_chars = sum(len(m.get("content", "")) for m in payload.get("messages", []))
+        chunks = [reply[i:i + self.chunk_chars] for i in range(0, len(reply), self.chunk_chars)]
+        num_predict = (payload.get("options") or {}).get("num_predict")
+        done_reason = "stop"
+        if num_predict and len(chunks) > num_predict:
+            chunks = chunks[:num_predict]  # one chunk stands for one token
+            done_reason = "length"
+        ttft_delay_s = self.model_ttft_delay_s.get(payload.get("model"), self.ttft_delay_s)
+        await asyncio.sleep(ttft_delay_s)
+        done = {
+            "model": payload.get("model"),
+            "done": True,
+            "done_reason": done_reason,
+            "prompt_eval_count": prompt_chars // 4,
+            "prompt_eval_duration": int(ttft_delay_s * 1e9),
+            "eval_count": len(chunks),
+        }
+
+        if not payload.get("stream", True):
+            await asyncio.sleep(self.token_delay_s * len(chunks))
+            done["message"] = {"role": "assistant", "content": reply}
+            done["total_duration"] = int((time.perf_counter() - start) * 1e9)
+            await self._send_json(writer, done)
+            return
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n")
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(self.token_delay_s)
+            line = {"model": payload.get("model"), "message": {"role": "assistant", "content": chunk}, "done": False}
+            self._write_chunk(writer, json.dumps(line) + "\n")
+            await writer.drain()
+        done["message"] = {"role": "assistant", "content": ""}
+        done["total_duration"] = int((time.perf_counter() - start) * 1e9)
+        self._write_chunk(writer, json.dumps(done) + "\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, text: str):
+        data = text.encode("utf-8")
+        writer.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    @staticmethod
+    async def _send_json(writer: asyncio.StreamWriter, body: dict, status: str = "200 OK"):
+        data = json.dumps(body).encode("utf-8")
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(data)}\r\n\r\n".encode("ascii") + data)
+        await writer.drain()
+
+
+if __name__ == "__main__":
+    import sys
+
+    async def serve_forever(port: int):
+        server = await StubLLMServer(ttft_delay_s=0.05, token_delay_s=0.005, port=port).start()
+        print(f"Stub LLM server listening on {server.base_url} (Ctrl+C to stop)")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve_forever(int(sys.argv[1]) if len(sys.argv) > 1 else 11435))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,125 @@
+# tests/test_command_pipeline.py
+#
+# CommandPipeline ordering: parses overlap, execution follows submission order
+# (also when a later command parses first), a command awaiting confirmation holds
+# the ones behind it, and the pending limit turns new commands away.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import asyncio
+
+from src.processing.command_pipeline import CommandPipeline
+
+# Parse delay per command text; anything else parses immediately.
+PARSE_DELAYS = {"slow": 0.1, "medium": 0.05}
+
+
+class Harness:
+    def __init__(self, max_pending: int = 5):
+        self.executed = []
+        self.messages = []
+        self.pipeline = CommandPipeline(self.parse, self.execute, self.messages.append, max_pending=max_pending)
+
+    async def parse(self, text: str, allow_early_dispatch: bool):
+        await asyncio.sleep(PARSE_DELAYS.get(text.split()[0], 0))
+        if text.startswith("unknown"):
+            return None
+        intent = {"action_type": "os", "intent": "create_file", "target": text, "message": f"Run {text}?"}
+        if text.startswith("risky"):
+            intent["requires_confirmation"] = True
+        return intent
+
+    async def execute(self, intent: dict):
+        self.executed.append(intent["target"])
+
+    async def idle(self):
+        while self.pipeline.queue:
+            await asyncio.sleep(0.01)
+
+
+def test_execution_follows_submission_order_not_parse_order():
+    async def scenario():
+        harness = Harness()
+        for text in ("slow one", "medium two", "fast three"):
+            await harness.pipeline.submit(text)
+        await harness.idle()
+        return harness
+
+    harness = asyncio.run(scenario())
+    assert harness.executed == ["slow one", "medium two", "fast three"]
+
+
+def test_confirmation_holds_later_commands_until_answered():
+    async def scenario():
+        harness = Harness()
+        await harness.pipeline.submit("risky delete")
+        await asyncio.sleep(0.05)
+        await harness.pipeline.submit("fast after")
+        await asyncio.sleep(0.05)
+        held = list(harness.executed)
+        await harness.pipeline.submit("yes")
+        await harness.idle()
+        return harness, held
+
+    harness, held = asyncio.run(scenario())
+    assert held == []
+    assert harness.executed == ["risky delete", "fast after"]
+    assert any(message.startswith("Run risky delete?") and message.endswith("(yes/no)") for message in harness.messages)
+    assert any("#1 is waiting for your yes/no" in message for message in harness.messages)
+
+
+def test_declined_command_is_cancelled_and_the_queue_moves_on():
+    async def scenario():
+        harness = Harness()
+        await harness.pipeline.submit("risky delete")
+        await harness.pipeline.submit("fast after")
+        await asyncio.sleep(0.05)
+        await harness.pipeline.submit("no 1")
+        await harness.idle()
+        return harness
+
+    harness = asyncio.run(scenario())
+    assert harness.executed == ["fast after"]
+    assert "Action cancelled (#1)." in harness.messages
+    assert not harness.pipeline.awaiting
+
+
+def test_unknown_reply_id_is_reported():
+    async def scenario():
+        harness = Harness()
+        await harness.pipeline.submit("risky delete")
+        await asyncio.sleep(0.05)
+        await harness.pipeline.submit("yes 7")
+        await harness.pipeline.submit("yes")
+        await harness.idle()
+        return harness
+
+    harness = asyncio.run(scenario())
+    assert "No command #7 is waiting for confirmation." in harness.messages
+    assert harness.executed == ["risky delete"]
+
+
+def test_unparsed_command_fails_without_blocking_the_rest():
+    async def scenario():
+        harness = Harness()
+        await harness.pipeline.submit("unknown thing")
+        await harness.pipeline.submit("fast after")
+        await harness.idle()
+        return harness
+
+    harness = asyncio.run(scenario())
+    assert harness.executed == ["fast after"]
+    assert "Sorry, I had trouble understanding that command." in harness.messages
+
+
+def test_pending_limit_turns_new_commands_away():
+    async def scenario():
+        harness = Harness(max_pending=2)
+        accepted = [await harness.pipeline.submit(f"slow {i}") is not None for i in range(3)]
+        await harness.idle()
+        return harness, accepted
+
+    harness, accepted = asyncio.run(scenario())
+    assert accepted == [True, True, False]
+    assert harness.executed == ["slow 0", "slow 1"]
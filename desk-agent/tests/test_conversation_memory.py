@@ -0,0 +1,68 @@
+# tests/test_conversation_memory.py
+#
+# ConversationMemory's turn window: only the newest max_turns turns stay indexed,
+# across restarts, without scanning the store on every turn. Embeddings are
+# replaced by a deterministic hash so no model is needed.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import hashlib
+
+import numpy as np
+import pytest
+
+from src.memory.conversation_history import ConversationMemory
+from src.utils import embeddings
+
+DIM = 32
+
+
+def _hash_embed(texts, batch_size: int = 32):
+    vectors = np.array([np.frombuffer(hashlib.sha256(text.encode()).digest(), dtype=np.uint8)[:DIM] for text in texts],
+                       dtype="float32") + 1.0
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(autouse=True)
+def hash_embeddings(monkeypatch):
+    monkeypatch.setattr(embeddings, "embed", _hash_embed)
+
+
+def _memory(tmp_path, max_turns: int) -> ConversationMemory:
+    knowledge = tmp_path / "knowledge"
+    knowledge.mkdir(exist_ok=True)
+    return ConversationMemory(str(tmp_path / "history.jsonl"), str(tmp_path / "index"), str(knowledge), max_turns)
+
+
+def _indexed_turns(memory: ConversationMemory) -> list[str]:
+    return [entry["text"] for entry in memory.store.entries.values() if entry.get("kind") == "turn"]
+
+
+def test_only_the_newest_turns_stay_indexed(tmp_path):
+    memory = _memory(tmp_path, max_turns=5)
+    for i in range(12):
+        memory.record_turn(f"open app {i}", {"intent": "open_application", "target": f"app{i}"})
+
+    assert len(memory.turn_ids) == 5
+    assert list(memory.turn_ids) == list(memory.store.entries)
+    assert _indexed_turns(memory) == [f'User said "open app {i}" → open_application (app{i})' for i in range(7, 12)]
+
+
+def test_turn_window_survives_a_restart(tmp_path):
+    memory = _memory(tmp_path, max_turns=3)
+    for i in range(4):
+        memory.record_turn(f"create file {i}", {"intent": "create_file", "target": f"f{i}.txt"})
+
+    reloaded = _memory(tmp_path, max_turns=3)
+    assert list(reloaded.turn_ids) == list(memory.turn_ids)
+    reloaded.record_turn("create file 4", {"intent": "create_file", "target": "f4.txt"})
+    assert [text.split('"')[1] for text in _indexed_turns(reloaded)] == ["create file 2", "create file 3", "create file 4"]
+
+
+def test_recall_finds_a_recorded_turn(tmp_path):
+    memory = _memory(tmp_path, max_turns=5)
+    memory.record_turn("open chrome", {"intent": "open_application", "target": "chrome"})
+    text = 'User said "open chrome" → open_application (chrome)'
+    # The hash embedder only matches identical text.
+    assert memory.recall(text, min_score=0.99) == [text]
@@ -0,0 +1,75 @@
+# tests/test_fast_path.py
+#
+# The deterministic fast path: what it matches, what it extracts, and the
+# commands it must leave to the intent model.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import pytest
+
+from src.processing.fast_path import match_fast_path
+
+
+@pytest.mark.parametrize("text, intent, target", [
+    ("create file notes.txt", "create_file", "notes.txt"),
+    ("Make a new file called todo.md please", "create_file", "todo.md"),
+    ("touch src/main.py", "create_file", "src/main.py"),
+    ("delete the file old.log", "delete_file", "old.log"),
+    ("rm report.pdf.", "delete_file", "report.pdf"),
+    ("open chrome", "open_application", "chrome"),
+    ("Please launch the Spotify app", "open_application", "Spotify"),
+    ("git init", "git_init", "."),
+    ("initialize a new git repository in projects/demo", "git_init", "projects/demo"),
+    ("start a new git repo here", "git_init", "."),
+])
+def test_matches_simple_commands(text, intent, target):
+    command = match_fast_path(text)
+    assert command is not None
+    assert command["intent"] == intent
+    assert command["target"] == target
+    assert command["message"]
+
+
+@pytest.mark.parametrize("text", [
+    "make coffee",                                # no "file" and no extension
+    "open it",
+    "open the folder",
+    "run tests",                                  # "run" and "start" aren't apps
+    "start over",
+    "create a folder called src and add main.py to it",
+    "delete notes.txt then empty the trash",
+    "what's the weather like?",
+    "",
+])
+def test_leaves_everything_else_to_the_model(text):
+    assert match_fast_path(text) is None
+
+
+def test_delete_needs_confirmation_and_create_does_not():
+    assert match_fast_path("delete notes.txt")["requires_confirmation"] is True
+    assert match_fast_path("create notes.txt")["requires_confirmation"] is False
+
+
+def test_file_word_without_extension_is_less_confident():
+    assert match_fast_path("create file Makefile")["confidence"] < match_fast_path("create file notes.txt")["confidence"]
+
+
+@pytest.mark.parametrize("text, message, all_changes", [
+    ("commit with message 'fix parser'", "fix parser", False),
+    ('git commit -m "add tests, and docs"', "add tests, and docs", False),
+    ("commit changes with message 'wip'", "wip", False),
+    ("commit everything with message 'Initial commit'", "Initial commit", True),
+    ("commit all with the message 'release'", "release", True),
+    ("git commit -a -m 'bump version'", "bump version", True),
+])
+def test_commit_message_and_scope(text, message, all_changes):
+    command = match_fast_path(text)
+    assert command["intent"] == "git_commit"
+    assert command["action_type"] == "git"
+    assert command["params"]["message"] == message
+    assert command["params"].get("all_changes", False) is all_changes
+
+
+def test_commit_without_a_quoted_message_goes_to_the_model():
+    assert match_fast_path("commit my work") is None
@@ -0,0 +1,143 @@
+# tests/test_git_tools.py
+#
+# The git tools against throwaway repositories: init/add/commit/status, empty
+# commits, "commit everything" with new files, HEAD read from the git directory,
+# and git_batch staging a whole sequence of adds with one git process.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import subprocess
+
+import pytest
+
+from src.agents.tools import git_tools
+from src.agents.tools.git_tools import git_add, git_batch, git_commit, git_init, git_status
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    # Commits must not depend on the global git config of whoever runs the tests.
+    for variable in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{variable}_NAME", "Tests")
+        monkeypatch.setenv(f"GIT_{variable}_EMAIL", "tests@example.com")
+
+
+def _git(repo, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True, check=True).stdout
+
+
+def _write(path, text: str = "VALUE = 1\n"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _committed(repo) -> list[str]:
+    return sorted(_git(repo, "ls-tree", "-r", "--name-only", "HEAD").splitlines())
+
+
+def test_init_add_commit_and_status(tmp_path):
+    assert git_init(str(tmp_path)).startswith("✅")
+    _write(tmp_path / "main.py")
+    _write(tmp_path / "src" / "util.py")
+
+    assert git_status(str(tmp_path)).endswith("0 staged, 0 modified, 2 untracked")
+    assert git_add(str(tmp_path / "main.py")) == f"✅ Staged 1 path(s) in {tmp_path}"
+    assert git_status(str(tmp_path)).endswith("1 staged, 0 modified, 1 untracked")
+
+    result = git_commit("Add main", str(tmp_path))
+    head = _git(tmp_path, "rev-parse", "HEAD").strip()
+    assert result == f"✅ Committed {head[:7]}: Add main"
+    assert _committed(tmp_path) == ["main.py"]
+
+    _write(tmp_path / "main.py", "VALUE = 2\n")
+    assert git_status(str(tmp_path)).endswith("0 staged, 1 modified, 1 untracked")
+
+
+def test_commit_with_nothing_staged_is_not_an_error(tmp_path):
+    git_init(str(tmp_path))
+    _write(tmp_path / "main.py")
+    git_add(str(tmp_path / "main.py"))
+    git_commit("First", str(tmp_path))
+
+    assert git_commit("Again", str(tmp_path)) == f"ℹ️ Nothing to commit in {tmp_path} (working tree clean)."
+    # Only new files, and all_changes not asked for: git says "nothing added to commit".
+    _write(tmp_path / "notes.txt")
+    assert git_commit("Notes", str(tmp_path)).startswith("ℹ️ Nothing to commit")
+
+
+def test_commit_everything_includes_new_files(tmp_path):
+    # create files → git_init → "commit everything": nothing is tracked yet.
+    _write(tmp_path / "main.py")
+    _write(tmp_path / "src" / "util.py")
+    git_init(str(tmp_path))
+
+    result = git_commit("Initial commit", str(tmp_path), all_changes=True)
+
+    assert result.startswith("✅ Committed"), result
+    assert _committed(tmp_path) == ["main.py", "src/util.py"]
+    assert git_status(str(tmp_path)).endswith("working tree clean")
+
+
+def test_commit_everything_includes_modified_and_deleted_files(tmp_path):
+    git_init(str(tmp_path))
+    _write(tmp_path / "main.py")
+    _write(tmp_path / "old.py")
+    git_commit("First", str(tmp_path), all_changes=True)
+    _write(tmp_path / "main.py", "VALUE = 2\n")
+    (tmp_path / "old.py").unlink()
+
+    assert git_commit("Second", str(tmp_path), all_changes=True).startswith("✅ Committed")
+    assert _committed(tmp_path) == ["main.py"]
+    assert (tmp_path / "main.py").read_text(encoding="utf-8") == _git(tmp_path, "show", "HEAD:main.py")
+
+
+def test_head_is_read_from_loose_and_packed_refs(tmp_path):
+    git_init(str(tmp_path))
+    session = git_tools.get_session(str(tmp_path))
+    assert session.head() is None
+
+    _write(tmp_path / "main.py")
+    git_commit("First", str(tmp_path), all_changes=True)
+    expected = _git(tmp_path, "rev-parse", "HEAD").strip()
+    assert session.head() == expected
+
+    _git(tmp_path, "pack-refs", "--all")
+    assert session.head() == expected
+
+
+def test_batch_stages_all_adds_with_one_git_process(tmp_path):
+    git_init(str(tmp_path))
+    paths = [str(_write(tmp_path / "src" / f"module_{i:03d}.py", f"VALUE = {i}\n")) for i in range(50)]
+    steps = [{"intent": "git_add", "target": path} for path in paths]
+    steps.append({"intent": "git_commit", "target": str(tmp_path), "params": {"message": "Add modules"}})
+    steps.append({"intent": "git_status", "target": str(tmp_path)})
+    session = git_tools.get_session(str(tmp_path))
+    before = session.processes
+
+    result = git_batch(steps)
+
+    assert "❌" not in result, result
+    assert result.splitlines()[-1].endswith("working tree clean")
+    assert len(_committed(tmp_path)) == 50
+    # One add for all 50 paths, the commit, and the status.
+    assert session.processes - before == 3
+
+
+def test_batch_stops_at_the_first_error(tmp_path):
+    git_init(str(tmp_path))
+    _write(tmp_path / "main.py")
+    steps = [
+        {"intent": "git_add", "target": str(tmp_path / "main.py")},
+        {"intent": "git_commit", "target": str(tmp_path), "params": {}},
+        {"intent": "git_status", "target": str(tmp_path)},
+    ]
+
+    lines = git_batch(steps).splitlines()
+
+    assert lines[-2] == "❌ Error: git_commit needs a commit message."
+    assert not any(line.startswith("📋") for line in lines)
+    # The queued add is still staged.
+    assert lines[-1] == "✅ Staged 1 path(s)"
+    assert _git(tmp_path, "diff", "--cached", "--name-only").split() == ["main.py"]
@@ -0,0 +1,122 @@
+# tests/test_intent_cache.py
+#
+# IntentCache: exact and near-duplicate hits, the slot check that keeps a cached
+# intent from answering a request with different targets, utterances that refer
+# to the conversation, TTL/LRU eviction and invalidation when the system prompt
+# changes. Embeddings are a bag-of-words hash, so no model is needed.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import zlib
+
+import numpy as np
+import pytest
+
+from src.processing.intent_cache import IntentCache, normalize_utterance
+from src.utils import embeddings
+
+DIM = 256
+PROMPT = "You are DeskAgent."
+
+
+def _bag_of_words(texts, batch_size: int = 32):
+    vectors = np.zeros((len(texts), DIM), dtype="float32")
+    for row, text in enumerate(texts):
+        for word in text.split():
+            vectors[row, zlib.crc32(word.encode()) % DIM] += 1.0
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-6)
+
+
+@pytest.fixture(autouse=True)
+def word_embeddings(monkeypatch):
+    monkeypatch.setattr(embeddings, "embed", _bag_of_words)
+
+
+def _cache(tmp_path, prompt: str = PROMPT, **options) -> IntentCache:
+    settings = {"threshold": 0.75, "max_entries": 100, "ttl_s": 3600, **options}
+    return IntentCache(str(tmp_path / "intent_cache.json"), prompt, **settings)
+
+
+def _intent(intent: str, target: str, **params) -> dict:
+    return {"action_type": "os", "intent": intent, "target": target, "params": params, "message": "ok"}
+
+
+def test_normalization_drops_case_punctuation_and_filler():
+    assert normalize_utterance("Could you please OPEN YouTube, now!") == "open youtube"
+    assert normalize_utterance("create file notes.txt.") == "create file notes.txt"
+
+
+def test_exact_hit_returns_a_copy(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("open youtube", _intent("open_application", "youtube"), llm_latency=1.2)
+
+    hit = cache.lookup("Please open YouTube!")
+    hit["target"] = "changed"
+
+    assert cache.lookup("open youtube")["target"] == "youtube"
+    assert cache.exact_hits == 2
+
+
+def test_near_duplicate_is_a_semantic_hit(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("open youtube in browser", _intent("open_application", "youtube"), llm_latency=1.0)
+
+    assert cache.lookup("open youtube in the browser")["target"] == "youtube"
+    assert cache.semantic_hits == 1
+
+
+def test_different_slot_values_never_hit(tmp_path):
+    cache = _cache(tmp_path, threshold=0.5)
+    cache.store("create file a.txt", _intent("create_file", "a.txt"), llm_latency=1.0)
+
+    # Similar enough to pass the threshold, but the cached target isn't in the new request.
+    assert cache.lookup("create file b.txt") is None
+    # "a.txt" inside "data.txt" isn't the same slot value either.
+    assert cache.lookup("create file data.txt") is None
+    assert cache.semantic_hits == 0
+
+
+def test_slot_values_in_params_are_checked_too(tmp_path):
+    cache = _cache(tmp_path, threshold=0.5)
+    cache.store("commit with message fix parser", _intent("git_commit", ".", message="fix parser"), llm_latency=1.0)
+
+    assert cache.lookup("commit with message fix lexer") is None
+
+
+def test_utterances_that_refer_to_the_conversation_are_not_cached(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("open it", _intent("open_application", "chrome"), llm_latency=1.0)
+    cache.store("open chrome", _intent("open_application", "chrome"), llm_latency=1.0)
+
+    assert "open it" not in cache.entries
+    assert cache.lookup("open that") is None
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = _cache(tmp_path, ttl_s=60)
+    cache.store("open chrome", _intent("open_application", "chrome"), llm_latency=1.0)
+    cache.entries["open chrome"]["created"] -= 120
+
+    assert cache.lookup("open chrome") is None
+    assert not cache.entries
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.store("open chrome", _intent("open_application", "chrome"), llm_latency=1.0)
+    cache.store("open slack", _intent("open_application", "slack"), llm_latency=1.0)
+    cache.lookup("open chrome")
+    cache.store("open spotify", _intent("open_application", "spotify"), llm_latency=1.0)
+
+    assert list(cache.entries) == ["open chrome", "open spotify"]
+
+
+def test_entries_persist_until_the_prompt_changes(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("open chrome", _intent("open_application", "chrome"), llm_latency=1.0)
+
+    assert _cache(tmp_path).lookup("open chrome")["target"] == "chrome"
+    changed = _cache(tmp_path, prompt=PROMPT + " Be brief.")
+    assert not changed.entries
+    assert changed.lookup("open chrome") is None
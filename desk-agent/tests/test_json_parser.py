@@ -0,0 +1,137 @@
+# tests/test_json_parser.py
+#
+# JSON extraction for intent responses: every case in the benchmark corpus
+# (benchmarks/data/intent_responses.jsonl), the repairs repair_json makes and the
+# truncations it must refuse, intent repair/validation, and IncrementalJSONParser
+# giving the same events however the response is chunked.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import json
+import os
+
+import pytest
+
+from src.utils.json_parser import (
+    IncrementalJSONParser,
+    parse_intent_response,
+    repair_json,
+    validate_action,
+    validate_intent,
+)
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "data", "intent_responses.jsonl")
+with open(CORPUS_PATH, encoding="utf-8") as f:
+    CORPUS = [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["case"] for case in CORPUS])
+def test_corpus_response(case):
+    result = parse_intent_response(case["response"])
+    expected = case["expected_intent"]
+    if expected is None:
+        assert result is None
+    elif expected == "sequence":
+        assert result["action_type"] == "sequence" and result["actions"]
+    else:
+        assert result["intent"] == expected and result["action_type"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1,}', {"a": 1}),
+    ('{"a": [1, 2,],}', {"a": [1, 2]}),
+    ("{'a': 'b'}", {"a": "b"}),
+    ('{a: "b"}', {"a": "b"}),
+    ('{"a": True, "b": None}', {"a": True, "b": None}),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": 1 // note\n}', {"a": 1}),
+    ('{"a": "x"', {"a": "x"}),                  # only the final brace is missing
+])
+def test_repair_json_fixes_common_defects(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+@pytest.mark.parametrize("text", [
+    '{"intent": "create_file", "target": "notes_for_mee',
+    '{"actions": [{"intent": "create_folder", "target": "a"}, {"intent": "delete_file"',
+])
+def test_repair_json_refuses_truncated_output(text):
+    with pytest.raises(ValueError):
+        repair_json(text)
+
+
+def test_validate_intent_repairs_what_models_get_wrong():
+    intent = validate_intent({"type": "os", "intent": "open_application", "app_name": "chrome",
+                              "confidence": "0.9", "requires_confirmation": "false", "params": "none"})
+    assert intent["target"] == "chrome" and "app_name" not in intent
+    assert intent["action_type"] == "os"
+    assert intent["confidence"] == 0.9
+    assert intent["requires_confirmation"] is False
+    assert "params" not in intent
+    assert intent["message"]
+
+
+def test_validate_intent_makes_a_sequence_of_actions():
+    intent = validate_intent({"type": "sequence", "action_type": "os", "actions": [
+        {"intent": "create_folder", "target": "demo"},
+        {"note": "no intent, dropped"},
+    ]})
+    assert intent["action_type"] == "sequence"
+    assert [action["intent"] for action in intent["actions"]] == ["create_folder"]
+    assert intent["actions"][0]["action_type"] == "os"
+
+
+@pytest.mark.parametrize("value", [None, [], {"message": "What would you like?"}, {"intent": 5}])
+def test_validate_intent_rejects_unusable_output(value):
+    assert validate_intent(value) is None
+
+
+def test_validate_action_checks_one_step():
+    assert validate_action({"intent": "create_file", "file": "a.txt"})["target"] == "a.txt"
+    assert validate_action({"target": "a.txt"}) is None
+    assert validate_action({"intent": "create_file", "message": 3}) is None
+
+
+RESPONSE = (
+    'Here you go:\n```json\n{"action_type": "sequence", "message": "Setting up {demo}.", "actions": ['
+    '{"action_type": "os", "intent": "create_folder", "target": "demo"}, '
+    '{"action_type": "os", "intent": "create_file", "target": "demo/say \\"hi\\".txt", "params": {"n": [1, 2]}}'
+    '], "confidence": 0.9}\n```'
+)
+
+
+def _events(chunks) -> list[tuple]:
+    parser = IncrementalJSONParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return events
+
+
+def test_incremental_parser_reports_fields_and_actions():
+    events = _events([RESPONSE])
+    assert events == [
+        ("field", "action_type", "sequence"),
+        ("field", "message", "Setting up {demo}."),
+        ("action", 0, {"action_type": "os", "intent": "create_folder", "target": "demo"}),
+        ("action", 1, {"action_type": "os", "intent": "create_file", "target": 'demo/say "hi".txt', "params": {"n": [1, 2]}}),
+        ("field", "actions", json.loads(RESPONSE[RESPONSE.index("{"):RESPONSE.rindex("}") + 1])["actions"]),
+        ("field", "confidence", 0.9),
+        ("done", None, None),
+    ]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64])
+def test_incremental_parser_is_independent_of_chunking(size):
+    chunks = [RESPONSE[i:i + size] for i in range(0, len(RESPONSE), size)]
+    assert _events(chunks) == _events([RESPONSE])
+
+
+def test_incremental_parser_only_reports_complete_actions():
+    cut = RESPONSE.index('"create_file"')
+    events = _events([RESPONSE[:cut]])
+    assert [event for event in events if event[0] == "action"] == [
+        ("action", 0, {"action_type": "os", "intent": "create_folder", "target": "demo"}),
+    ]
+    assert ("done", None, None) not in events
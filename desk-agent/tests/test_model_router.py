@@ -0,0 +1,100 @@
+# tests/test_model_router.py
+#
+# ModelRouter's connection handling against the local stub server: pooled keep-alive
+# connections, Ollama keep_alive and warm-up, and the per-call latency breakdown.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import asyncio
+
+from src.routing.model_router import ModelRouter
+from tests.stub_server import StubLLMServer
+
+MODEL = "ollama/stub-model"
+MESSAGES = [{"role": "user", "content": "open notepad"}]
+
+
+def test_calls_reuse_one_pooled_connection():
+    async def scenario():
+        async with StubLLMServer() as server:
+            router = ModelRouter(ollama_base_url=server.base_url)
+            try:
+                for _ in range(5):
+                    await router.complete(MESSAGES, MODEL)
+            finally:
+                await router.aclose()
+            return server, list(router.timings)
+
+    server, timings = asyncio.run(scenario())
+    assert server.requests == 5
+    assert server.connections == 1
+    assert timings[0].connect_s > 0
+    assert all(timing.connect_s == 0 for timing in timings[1:])
+
+
+def test_requests_ask_ollama_to_keep_the_model_loaded():
+    async def scenario():
+        async with StubLLMServer() as server:
+            router = ModelRouter(ollama_base_url=server.base_url, keep_alive="45m")
+            try:
+                elapsed = await router.warm_up(MODEL)
+                await router.complete(MESSAGES, MODEL)
+            finally:
+                await router.aclose()
+            return server, elapsed
+
+    server, elapsed = asyncio.run(scenario())
+    assert elapsed is not None
+    assert server.warm_ups == [{"model": "stub-model", "keep_alive": "45m"}]
+    assert server.payloads[0]["keep_alive"] == "45m"
+
+
+def test_warm_up_skips_models_not_served_by_ollama():
+    async def scenario():
+        router = ModelRouter(ollama_base_url="http://127.0.0.1:9")
+        try:
+            return await router.warm_up("gemini/gemini-1.5-flash")
+        finally:
+            await router.aclose()
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_keep_warm_reloads_the_model_on_a_schedule():
+    async def scenario():
+        async with StubLLMServer() as server:
+            router = ModelRouter(ollama_base_url=server.base_url)
+            try:
+                router.start_keep_warm(MODEL, interval_s=0.05)
+                router.start_keep_warm(MODEL, interval_s=0.05)  # already running: no second loop
+                await asyncio.sleep(0.18)
+            finally:
+                await router.aclose()
+            return server
+
+    server = asyncio.run(scenario())
+    assert 3 <= len(server.warm_ups) <= 5
+
+
+def test_timing_splits_queue_connect_ttft_and_total():
+    async def scenario():
+        async with StubLLMServer(ttft_delay_s=0.05, token_delay_s=0.002) as server:
+            # One slot, so the second of two concurrent calls has to queue behind the first.
+            router = ModelRouter(ollama_base_url=server.base_url, max_concurrency=1)
+            try:
+                replies = await asyncio.gather(router.complete(MESSAGES, MODEL), router.complete(MESSAGES, MODEL))
+            finally:
+                await router.aclose()
+            return replies, list(router.timings)
+
+    replies, timings = asyncio.run(scenario())
+    assert all(reply.startswith("{") for reply in replies)
+    first, second = sorted(timings, key=lambda timing: timing.queue_s)
+    for timing in timings:
+        assert timing.ok
+        # Each is measured from the start of the call, so they nest.
+        assert timing.queue_s + 0.05 <= timing.ttft_s <= timing.total_s
+        assert {"queue_ms", "connect_ms", "ttft_ms", "total_ms"} <= set(timing.as_dict())
+    assert first.queue_s < 0.01
+    assert second.queue_s > first.ttft_s
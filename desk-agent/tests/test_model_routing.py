@@ -0,0 +1,148 @@
+# tests/test_model_routing.py
+#
+# ModelRouter.route() against the local stub server, with a preferred model and a
+# fallback for the "intent" request class: fallback, circuit breaking, hedging and
+# demotion of a model that keeps losing hedged races.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import asyncio
+import time
+
+from config import CIRCUIT_FAILURE_THRESHOLD, HEDGE_LOSSES_TO_DEMOTE
+from src.routing.model_router import ModelRouter
+from tests.stub_server import StubLLMServer
+
+PRIMARY = "ollama/primary"
+FALLBACK = "ollama/fallback"
+REGISTRY = {
+    PRIMARY: {"cost_per_mtok": 0.0, "expected_ttft_s": 0.05},
+    FALLBACK: {"cost_per_mtok": 0.0, "expected_ttft_s": 0.05},
+}
+ROUTES = {"intent": [PRIMARY, FALLBACK]}
+MESSAGES = [{"role": "user", "content": "open notepad"}]
+REPLY = '{"action_type": "os", "intent": "open_application", "target": "notepad", "message": "Opening notepad."}'
+
+
+def _on_server(model_name: str) -> str:
+    # The stub sees model names without the provider prefix.
+    return model_name.split("/", 1)[1]
+
+
+async def _route(router: ModelRouter) -> tuple[str, str]:
+    """Runs one routed call; returns the reply and the model that served it."""
+    reply = "".join([chunk async for chunk in router.route("intent", MESSAGES)])
+    return reply, next(timing.model for timing in reversed(router.timings) if timing.ok)
+
+
+def _sent_to(server: StubLLMServer, model_name: str) -> int:
+    return sum(1 for payload in server.payloads if payload["model"] == _on_server(model_name))
+
+
+async def _with_router(scenario):
+    async with StubLLMServer(lambda payload: REPLY) as server:
+        router = ModelRouter(ollama_base_url=server.base_url, registry=REGISTRY, routes=ROUTES)
+        try:
+            return await scenario(router, server)
+        finally:
+            await router.aclose()
+
+
+def test_falls_back_when_the_primary_fails():
+    async def scenario(router, server):
+        server.failing_models.add(_on_server(PRIMARY))
+        return await _route(router), _sent_to(server, PRIMARY)
+
+    (reply, served_by), primary_requests = asyncio.run(_with_router(scenario))
+    assert served_by == FALLBACK
+    assert reply == REPLY
+    assert primary_requests == 1
+
+
+def test_circuit_opens_after_repeated_failures_and_closes_after_a_good_trial():
+    async def scenario(router, server):
+        breaker = router.breaker_for(PRIMARY)
+        breaker.reset_after_s = 0.2
+        server.failing_models.add(_on_server(PRIMARY))
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            assert (await _route(router))[1] == FALLBACK
+        states = [breaker.state]
+
+        # While open, the primary isn't even tried.
+        sent = _sent_to(server, PRIMARY)
+        assert (await _route(router))[1] == FALLBACK
+        skipped = _sent_to(server, PRIMARY) == sent
+
+        server.failing_models.clear()
+        await asyncio.sleep(0.2)
+        states.append(breaker.state)
+        served_by_after_reset = (await _route(router))[1]
+        states.append(breaker.state)
+        return states, skipped, served_by_after_reset
+
+    states, skipped, served_by = asyncio.run(_with_router(scenario))
+    assert states == ["open", "half-open", "closed"]
+    assert skipped
+    assert served_by == PRIMARY
+
+
+def test_failed_half_open_trial_reopens_the_circuit():
+    async def scenario(router, server):
+        breaker = router.breaker_for(PRIMARY)
+        breaker.reset_after_s = 0.2
+        server.failing_models.add(_on_server(PRIMARY))
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            await _route(router)
+        await asyncio.sleep(0.2)
+        sent = _sent_to(server, PRIMARY)
+        served_by = (await _route(router))[1]
+        return served_by, _sent_to(server, PRIMARY) - sent, breaker.state
+
+    served_by, trials, state = asyncio.run(_with_router(scenario))
+    assert served_by == FALLBACK
+    assert trials == 1
+    assert state == "open"
+
+
+def test_slow_primary_is_hedged_and_the_loser_cancelled():
+    async def scenario(router, server):
+        server.model_ttft_delay_s[_on_server(PRIMARY)] = 1.5
+        start = time.perf_counter()
+        reply, served_by = await _route(router)
+        elapsed = time.perf_counter() - start
+        primary_timing = next(timing for timing in router.timings if timing.model == PRIMARY)
+        return reply, served_by, elapsed, primary_timing, router
+
+    reply, served_by, elapsed, primary_timing, router = asyncio.run(_with_router(scenario))
+    assert served_by == FALLBACK
+    assert reply == REPLY
+    # The primary's 1.5 s answer was not waited for: its stream was cancelled and closed.
+    assert elapsed < 1.2
+    assert not primary_timing.ok
+    assert primary_timing.ttft_s is None
+    # A lost race counts as slow, not as a failure.
+    assert router.latency_for(PRIMARY).consecutive_losses == 1
+    assert router.breaker_for(PRIMARY).state == "closed"
+
+
+def test_primary_is_demoted_after_losing_enough_hedged_races():
+    async def scenario(router, server):
+        server.model_ttft_delay_s[_on_server(PRIMARY)] = 1.5
+        order_before = router.candidates("intent")
+        for _ in range(HEDGE_LOSSES_TO_DEMOTE):
+            assert (await _route(router))[1] == FALLBACK
+        order_after = router.candidates("intent")
+
+        # Now the fallback is tried first, so the slow primary isn't asked at all.
+        sent = _sent_to(server, PRIMARY)
+        start = time.perf_counter()
+        served_by = (await _route(router))[1]
+        return order_before, order_after, served_by, _sent_to(server, PRIMARY) - sent, time.perf_counter() - start
+
+    order_before, order_after, served_by, primary_requests, elapsed = asyncio.run(_with_router(scenario))
+    assert order_before == [PRIMARY, FALLBACK]
+    assert order_after == [FALLBACK, PRIMARY]
+    assert served_by == FALLBACK
+    assert primary_requests == 0
+    assert elapsed < 0.5
@@ -0,0 +1,119 @@
+# tests/test_sequence_executor.py
+#
+# SequenceExecutor: which steps depend on which (overlapping paths, nested paths,
+# steps with no target), dependent steps staying ordered while independent ones
+# overlap, and what happens to the other steps once one fails.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from src.processing import sequence_executor
+from src.processing.jobs import JobManager
+from src.processing.sequence_executor import SequenceExecutor, depends_on
+
+
+def _step(intent: str, target: str | None = None, **params) -> dict:
+    action = {"action_type": "os", "intent": intent, "params": params}
+    if target is not None:
+        action["target"] = target
+    return action
+
+
+@pytest.mark.parametrize("later, earlier, expected", [
+    (_step("create_file", "demo/a.txt"), _step("create_folder", "demo"), True),
+    (_step("create_folder", "demo"), _step("create_file", "demo/a.txt"), True),
+    (_step("delete_file", "a.txt"), _step("create_file", "a.txt"), True),
+    (_step("create_file", "demo2/a.txt"), _step("create_folder", "demo"), False),   # a prefix, not a parent
+    (_step("create_file", "b.txt"), _step("create_file", "a.txt"), False),
+    (_step("move_file", "c.txt", destination="demo/c.txt"), _step("create_folder", "demo"), True),
+    (_step("git_commit", message="wip"), _step("create_file", "a.txt"), True),       # no target: waits for everything
+    (_step("create_file", "a.txt"), _step("git_commit", message="wip"), True),
+])
+def test_depends_on(later, earlier, expected):
+    assert depends_on(later, earlier) is expected
+
+
+class Recorder:
+    """A run_step that logs when each step starts and ends; "slow" targets take longer, "bad" ones fail."""
+
+    def __init__(self):
+        self.log = []
+        self.lock = threading.Lock()
+
+    def __call__(self, action: dict) -> str:
+        target = action.get("target", "")
+        with self.lock:
+            self.log.append(("start", target))
+        time.sleep(0.2 if "slow" in target else 0.02)
+        with self.lock:
+            self.log.append(("end", target))
+        if "bad" in target:
+            return f"❌ Error: could not create {target}"
+        return f"✅ Created {target}"
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Swaps in a job manager with a given number of tool workers."""
+    def use(count: int):
+        monkeypatch.setattr(sequence_executor, "job_manager", JobManager(tool_workers=count, max_crews=1))
+    use(4)
+    return use
+
+
+def _run(recorder, actions) -> str:
+    return asyncio.run(SequenceExecutor(recorder).run(actions))
+
+
+def test_dependent_steps_run_in_order_and_independent_ones_overlap(workers, tmp_path):
+    recorder = Recorder()
+    folder = str(tmp_path / "slow_folder")
+    report = _run(recorder, [
+        _step("create_folder", folder),
+        _step("create_file", os.path.join(folder, "a.txt")),
+        _step("create_file", str(tmp_path / "other.txt")),
+    ])
+
+    log = recorder.log
+    assert log.index(("end", folder)) < log.index(("start", os.path.join(folder, "a.txt")))
+    # The unrelated file didn't wait for the slow folder.
+    assert log.index(("end", str(tmp_path / "other.txt"))) < log.index(("end", folder))
+    lines = report.splitlines()
+    assert [line.split(" (")[0] for line in lines[:3]] == [
+        f"✅ Created {folder}", f"✅ Created {os.path.join(folder, 'a.txt')}", f"✅ Created {tmp_path / 'other.txt'}",
+    ]
+    assert lines[3].startswith("⏱️ 3 step(s)")
+
+
+def test_step_without_target_waits_for_everything_before_it(workers, tmp_path):
+    recorder = Recorder()
+    _run(recorder, [_step("create_file", str(tmp_path / "slow.txt")), _step("git_commit", message="wip")])
+    assert recorder.log[1] == ("end", str(tmp_path / "slow.txt"))
+
+
+def test_failure_skips_the_steps_that_depend_on_it(workers, tmp_path):
+    recorder = Recorder()
+    folder = str(tmp_path / "bad_folder")
+    report = _run(recorder, [_step("create_folder", folder), _step("create_file", os.path.join(folder, "a.txt"))])
+
+    assert ("start", os.path.join(folder, "a.txt")) not in recorder.log
+    assert "Sequence stopped due to an error. 1 step(s) were not run." in report
+
+
+def test_failure_cancels_queued_steps_and_reports_running_ones(workers, tmp_path):
+    workers(2)
+    recorder = Recorder()
+    bad, running, queued = (str(tmp_path / name) for name in ("bad.txt", "slow.txt", "queued.txt"))
+    report = _run(recorder, [_step("create_file", bad), _step("create_file", running), _step("create_file", queued)])
+
+    # The slow step had already started and finishes; the queued one never starts.
+    assert ("end", running) in recorder.log
+    assert ("start", queued) not in recorder.log
+    assert "Step(s) 2 were already running and still completed. 1 step(s) were not run." in report
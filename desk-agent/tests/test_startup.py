@@ -0,0 +1,52 @@
+# tests/test_startup.py
+#
+# Startup regression checks: fail when time-to-window goes over STARTUP_BUDGET_S,
+# or when a heavy framework creeps back into the imports the window waits for.
+# Each check runs in a fresh interpreter, so modules already imported by the
+# test session don't hide the cost.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from config import STARTUP_BUDGET_S
+from src.utils.startup import PREWARM_MODULES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _has_display() -> bool:
+    if sys.platform != "linux":
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def test_ui_imports_fit_the_budget_and_skip_heavy_frameworks():
+    # Everything main.py imports before it can create the window.
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed, [m for m in {PREWARM_MODULES!r} if m in sys.modules]]))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    seconds, loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert seconds <= STARTUP_BUDGET_S
+    assert loaded == [], f"imported before the window: {loaded}"
+
+
+@pytest.mark.skipif(not _has_display(), reason="needs a display to open the window")
+def test_window_appears_within_budget():
+    completed = subprocess.run([sys.executable, "main.py", "--startup-report"], cwd=ROOT,
+                               capture_output=True, text=True, encoding="utf-8", timeout=120)
+    assert "Time to window" in completed.stdout, completed.stderr
+    assert completed.returncode == 0, completed.stdout
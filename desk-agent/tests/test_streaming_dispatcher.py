@@ -0,0 +1,63 @@
+# tests/test_streaming_dispatcher.py
+#
+# Early dispatch of streamed sequence steps: each step is repaired and checked
+# like the full parse would, before it runs or is judged for confirmation.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import asyncio
+
+from src.processing.action_router import StreamingDispatcher
+
+
+def _stream(actions: list) -> tuple[StreamingDispatcher, list[str]]:
+    async def scenario():
+        dispatcher = StreamingDispatcher()
+        dispatcher.on_field("action_type", "sequence")
+        for index, action in enumerate(actions):
+            dispatcher.on_action(index, action)
+        return dispatcher, await dispatcher.finish()
+
+    return asyncio.run(scenario())
+
+
+def test_streamed_step_is_repaired_before_it_runs(tmp_path):
+    folder = tmp_path / "demo"
+    action = {"type": "os", "intent": "create_folder", "path": str(folder)}
+
+    dispatcher, results = _stream([action])
+
+    assert dispatcher.dispatched == 1
+    assert action["target"] == str(folder) and action["action_type"] == "os"
+    assert folder.is_dir()
+    assert results[0].startswith("✅")
+
+
+def test_string_requires_confirmation_holds_dispatch(tmp_path):
+    actions = [
+        {"intent": "create_folder", "target": str(tmp_path / "a")},
+        {"intent": "create_file", "target": str(tmp_path / "b.txt"), "requires_confirmation": "yes"},
+        {"intent": "create_folder", "target": str(tmp_path / "c")},
+    ]
+
+    dispatcher, _ = _stream(actions)
+
+    assert dispatcher.dispatched == 1
+    assert dispatcher.held
+    assert actions[1]["requires_confirmation"] is True
+    assert not (tmp_path / "b.txt").exists() and not (tmp_path / "c").exists()
+
+
+def test_invalid_step_is_left_for_the_full_parse(tmp_path):
+    actions = [
+        {"intent": "create_folder", "target": str(tmp_path / "a"), "message": ["not", "a", "string"]},
+        {"intent": "create_folder", "target": str(tmp_path / "b")},
+    ]
+
+    dispatcher, results = _stream(actions)
+
+    assert dispatcher.dispatched == 0
+    assert dispatcher.held
+    assert results == []
+    assert not (tmp_path / "a").exists()
@@ -0,0 +1,158 @@
+# tests/test_tool_registry.py
+#
+# ToolRegistry: what the AST scan finds in @tool declarations, the manifest that
+# lets later startups skip unchanged files, files with bad declarations being
+# skipped on their own, and tools being imported only when first called.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import json
+import os
+import sys
+
+import pytest
+
+from src.processing.tool_registry import ToolRegistry, ToolSpec, scan_source
+
+SOURCE = '''
+from src.processing.tool_registry import tool
+
+CALLS = []
+
+
+@tool("make_note", example="Make a note saying hi", call={"target": "hi"})
+def make_note(target: str, folder: str = ".", *, pinned: bool = False):
+    """Writes a note.
+
+    More detail that isn't part of the description.
+    """
+    CALLS.append((target, folder, pinned))
+    return f"noted {target}"
+
+
+@tool(name="wipe_notes", requires_confirmation=True)
+class WipeNotes:
+    """Deletes every note."""
+
+    def run(self, target, **extra):
+        return "wiped"
+
+
+@tool("note_batch", hidden=True)
+def note_batch(steps: list):
+    return "batched"
+
+
+def helper():
+    return "not a tool"
+'''
+
+
+def _write(path, source: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+
+
+def test_scan_finds_functions_and_classes():
+    specs = {spec["name"]: spec for spec in scan_source(SOURCE, "notes")}
+
+    assert set(specs) == {"make_note", "wipe_notes", "note_batch"}
+    note = specs["make_note"]
+    assert (note["module"], note["attribute"], note["kind"]) == ("notes", "make_note", "function")
+    assert note["description"] == "Writes a note."
+    assert note["params"] == [
+        {"name": "target", "type": "str", "required": True},
+        {"name": "folder", "type": "str", "required": False},
+        {"name": "pinned", "type": "bool", "required": False},
+    ]
+    assert note["accepts_any"] is False
+
+    wipe = specs["wipe_notes"]
+    assert wipe["kind"] == "class" and wipe["requires_confirmation"] is True
+    assert wipe["params"] == [{"name": "target", "type": None, "required": True}]
+    assert wipe["accepts_any"] is True
+    assert specs["note_batch"]["hidden"] is True
+
+
+def test_prompt_line_shows_the_example_call():
+    spec = ToolSpec(**scan_source(SOURCE, "notes")[0])
+    assert spec.prompt_line() == (
+        '- make_note: "Make a note saying hi" → '
+        '{"action_type": "os", "intent": "make_note", "target": "hi"}'
+    )
+
+
+@pytest.fixture
+def tool_dir(tmp_path, monkeypatch):
+    """An importable tools folder, with module names relative to tmp_path like the app's."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    directory = tmp_path / "note_tools"
+    directory.mkdir()
+    yield directory
+    for name in [name for name in sys.modules if name.startswith("note_tools")]:
+        del sys.modules[name]
+
+
+def _registry(tool_dir) -> ToolRegistry:
+    return ToolRegistry(directories=[str(tool_dir)], manifest_path=str(tool_dir.parent / "manifest.json"))
+
+
+def test_tools_are_imported_on_first_call(tool_dir):
+    _write(tool_dir / "notes.py", SOURCE)
+    registry = _registry(tool_dir)
+
+    assert "note_tools.notes" not in sys.modules
+    # Arguments the tool doesn't take are dropped.
+    assert registry.call("make_note", {"target": "hi", "colour": "red"}) == "noted hi"
+    assert sys.modules["note_tools.notes"].CALLS == [("hi", ".", False)]
+    assert registry.call("wipe_notes", {"target": "all", "anything": 1}) == "wiped"
+    prompt = registry.supported_actions()
+    assert "make_note" in prompt and "wipe_notes" in prompt and "note_batch" not in prompt
+
+
+def test_manifest_is_reused_until_a_file_changes(tool_dir, monkeypatch):
+    path = tool_dir / "notes.py"
+    _write(path, SOURCE)
+    _registry(tool_dir)
+    with open(tool_dir.parent / "manifest.json", encoding="utf-8") as f:
+        assert list(json.load(f)["files"]) == [str(path)]
+
+    scanned = []
+    original = scan_source
+    monkeypatch.setattr("src.processing.tool_registry.scan_source", lambda *a: scanned.append(a[1]) or original(*a))
+    assert set(_registry(tool_dir).specs) == {"make_note", "wipe_notes", "note_batch"}
+    assert scanned == []
+
+    _write(path, SOURCE.replace('"make_note"', '"jot_note"'))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    registry = _registry(tool_dir)
+    assert scanned == ["note_tools.notes"]
+    assert "jot_note" in registry.specs and "make_note" not in registry.specs
+
+
+@pytest.mark.parametrize("bad_source", [
+    "def broken(:\n    pass\n",                                      # syntax error
+    "from x import tool\n@tool()\ndef nameless():\n    pass\n",       # no name
+    "from x import tool\n@tool('odd', colour='red')\ndef odd():\n    pass\n",   # unknown keyword
+    "from x import tool\n@tool(NAME)\ndef dynamic():\n    pass\n",    # not a literal
+])
+def test_bad_file_only_loses_its_own_tools(tool_dir, bad_source, capsys):
+    _write(tool_dir / "notes.py", SOURCE)
+    _write(tool_dir / "broken.py", bad_source)
+
+    registry = _registry(tool_dir)
+
+    assert set(registry.specs) == {"make_note", "wipe_notes", "note_batch"}
+    assert "Skipping tools in" in capsys.readouterr().out
+
+
+def test_duplicate_names_keep_the_first_file(tool_dir, capsys):
+    _write(tool_dir / "a_notes.py", SOURCE)
+    _write(tool_dir / "b_notes.py", SOURCE)
+
+    registry = _registry(tool_dir)
+
+    assert registry.get("make_note").module == "note_tools.a_notes"
+    assert "'make_note' in" in capsys.readouterr().out
@@ -0,0 +1,80 @@
+# tests/test_vector_store.py
+#
+# VectorStore persistence: rows and vectors stay paired across reloads and
+# compaction, including a compaction interrupted before it was switched in.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import numpy as np
+import pytest
+
+from src.memory.vector_store import VectorStore
+
+DIM = 16
+
+
+def _store(directory) -> VectorStore:
+    return VectorStore(str(directory), ivf_min_entries=10_000, nprobe=4)
+
+
+def _basis(i: int) -> np.ndarray:
+    vector = np.zeros((1, DIM), dtype="float32")
+    vector[0, i] = 1.0
+    return vector
+
+
+def _fill(store: VectorStore) -> list[int]:
+    vectors = np.concatenate([_basis(i) for i in range(DIM)])
+    return store.add_vectors(vectors, [f"text {i}" for i in range(DIM)], [{"kind": "turn"}] * DIM)
+
+
+def _assert_paired(store: VectorStore, removed: set[int]):
+    """Every live entry is found by its own vector."""
+    for i in range(DIM):
+        results = store.search_vector(_basis(i), k=1)
+        if i in removed:
+            assert not results or results[0][1]["text"] != f"text {i}"
+        else:
+            assert results[0][1]["text"] == f"text {i}"
+            assert results[0][0] == pytest.approx(1.0)
+
+
+def test_compaction_keeps_rows_and_vectors_paired(tmp_path):
+    store = _store(tmp_path)
+    ids = _fill(store)
+    removed = {0, 3, 7}
+    store.remove([ids[i] for i in removed])
+
+    store.compact()
+
+    assert store.dead_rows() == 0
+    _assert_paired(store, removed)
+    reloaded = _store(tmp_path)
+    assert len(reloaded) == DIM - len(removed)
+    _assert_paired(reloaded, removed)
+    # The previous generation's files are gone.
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["meta.json", "rows.1.jsonl", "vectors.1.f32"]
+
+
+def test_interrupted_compaction_leaves_the_old_generation(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    ids = _fill(store)
+    removed = {1, 2}
+    store.remove([ids[i] for i in removed])
+
+    def crash(self):
+        raise OSError("crashed before switching generations")
+
+    # The new files are written, but meta.json is never switched to them.
+    monkeypatch.setattr(VectorStore, "_write_meta", crash)
+    with pytest.raises(OSError):
+        store.compact()
+    monkeypatch.undo()
+
+    reloaded = _store(tmp_path)
+    assert reloaded.generation == 0
+    _assert_paired(reloaded, removed)
+    # Compacting again afterwards still works.
+    reloaded.compact()
+    _assert_paired(_store(tmp_path), removed)
@@ -0,0 +1,116 @@
+# tests/test_voice.py
+#
+# The voice path without a microphone or Whisper: a synthetic WAV
+# (silence - tone - silence) through read_wav + replay into the SpeechSegmenter,
+# and a failing transcription worker turning listening off.
+#
+# Run from the desk-agent directory:
+#     python -m pytest tests
+
+import queue
+import sys
+import threading
+import types
+import wave
+
+import numpy as np
+import pytest
+
+from config import VOICE_CHUNK_PAUSE_MS, VOICE_FRAME_MS, VOICE_PRE_ROLL_MS, VOICE_SAMPLE_RATE
+from src.audio import voice_transcriber
+from src.audio.voice_input import VoiceInput
+from src.audio.voice_recorder import SpeechSegmenter, read_wav, replay
+
+FRAME = VOICE_SAMPLE_RATE * VOICE_FRAME_MS // 1000
+
+
+def _write_wav(path, audio: np.ndarray, sample_rate: int):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((audio * 32767).astype("<i2").tobytes())
+
+
+def _silence_tone_silence(sample_rate: int, before_s: float, tone_s: float, after_s: float) -> np.ndarray:
+    t = np.arange(int(tone_s * sample_rate)) / sample_rate
+    tone = 0.3 * np.sin(2 * np.pi * 440 * t)
+    return np.concatenate([np.zeros(int(before_s * sample_rate)), tone, np.zeros(int(after_s * sample_rate))])
+
+
+@pytest.mark.parametrize("file_rate", [VOICE_SAMPLE_RATE, 44_100])
+def test_tone_in_a_wav_file_is_one_segment(tmp_path, file_rate):
+    # Whole frames of silence and tone, so the expected bounds are exact at 16 kHz.
+    before_s, tone_s = 16 * FRAME / VOICE_SAMPLE_RATE, 32 * FRAME / VOICE_SAMPLE_RATE
+    path = tmp_path / "command.wav"
+    _write_wav(path, _silence_tone_silence(file_rate, before_s, tone_s, 1.0), file_rate)
+
+    audio = read_wav(str(path))
+    segments = []
+    replay(audio, SpeechSegmenter(segments.append), realtime=False)
+
+    spoken = [segment for segment in segments if segment.audio is not None]
+    assert len(spoken) == 1
+    assert len({segment.utterance_id for segment in segments}) == 1
+    assert segments[-1].is_final
+    # Starts VOICE_PRE_ROLL_MS before the tone and ends about VOICE_CHUNK_PAUSE_MS after it.
+    shortest = tone_s + VOICE_PRE_ROLL_MS / 1000 + VOICE_CHUNK_PAUSE_MS / 1000
+    assert shortest - 0.01 <= spoken[0].duration_s <= shortest + 2 * FRAME / VOICE_SAMPLE_RATE
+    tone = audio[int(before_s * VOICE_SAMPLE_RATE):int((before_s + tone_s) * VOICE_SAMPLE_RATE)]
+    assert np.dot(spoken[0].audio, spoken[0].audio) == pytest.approx(np.dot(tone, tone), rel=0.02)
+
+
+def test_silence_is_not_an_utterance(tmp_path):
+    path = tmp_path / "silence.wav"
+    _write_wav(path, np.zeros(2 * VOICE_SAMPLE_RATE), VOICE_SAMPLE_RATE)
+    segments = []
+    replay(read_wav(str(path)), SpeechSegmenter(segments.append), realtime=False)
+    assert segments == []
+
+
+def test_worker_reports_a_model_that_fails_to_load(monkeypatch):
+    def pipeline(*args, **kwargs):
+        raise OSError("no such model")
+
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(pipeline=pipeline))
+    results = queue.Queue()
+    voice_transcriber._transcription_worker("missing/model", queue.Queue(), results)
+    assert results.get_nowait() == ("error", None, "OSError: no such model", None)
+
+
+class _Recorder:
+    stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+def test_worker_error_stops_listening():
+    errors = []
+    voice = VoiceInput(on_utterance=lambda utterance: None, on_error=errors.append)
+    recorder = voice.recorder = _Recorder()
+    voice.transcriber._results = queue.Queue()
+    voice.transcriber._results.put(("error", None, "OSError: no such model", None))
+
+    voice.transcriber._collect()
+
+    assert recorder.stopped
+    assert not voice.listening
+    assert errors == ["OSError: no such model"]
+    assert voice.transcriber.error == "OSError: no such model"
+
+
+def test_start_refuses_a_dead_worker():
+    voice = VoiceInput(on_utterance=lambda utterance: None)
+    transcriber = voice.transcriber
+    transcriber._process = types.SimpleNamespace(is_alive=lambda: False, exitcode=-9, join=lambda timeout=None: None)
+    transcriber._thread = threading.Thread(target=lambda: None)
+    transcriber._thread.start()
+    transcriber.error = "the worker exited (code -9)"
+
+    with pytest.raises(RuntimeError, match="code -9"):
+        voice.start()
+
+    assert not voice.listening
+    # Reset, so the next start() spawns a new worker.
+    assert transcriber._process is None